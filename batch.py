@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from scrap.login import login
+from scrap.scheduler import SchedulingAdapter
+from scrap.cache import ResponseCache
+from scrap.turma_registry import TurmaRegistry
+from scrap.get_disciplinas_aprovadas import get_disciplinas_aprovadas
+from scrap.get_turmas_matricula_data import get_turmas_matricula_data
+from scrap.get_turmas_disponiveis_data import get_turmas_disponiveis_data, MAX_WORKERS
+from scrap.turma_model import Turma, carregar_turmas
+from transform.transform_data import run_transformation_stream, _carregar_json
+from transform.generate_ics import generate_ics
+
+# Requisições simultâneas ao portal, somando todas as contas
+MAX_CONCURRENCY = 16
+# Contas processadas ao mesmo tempo (login + nota + quadro de horário)
+MAX_CONTAS = 4
+DATA_DIR = "data"
+OUTPUT_DIR = "output"
+
+def carregar_credenciais(path: str) -> list[dict[str:str]]:
+    """
+    Lê o arquivo de credenciais: uma lista JSON de objetos com "user" e "password".
+    """
+    with open(path, "r") as f:
+        contas = json.load(f)
+    if not isinstance(contas, list) or not all(isinstance(c, dict) and c.get("user") and c.get("password") for c in contas):
+        raise ValueError(f"{path} deve ser uma lista de objetos com \"user\" e \"password\"")
+    return contas
+
+def _raspar_aluno(conta: dict[str:str], adapter: SchedulingAdapter, registry: TurmaRegistry, logado: Future | None = None):
+    """
+    Login e raspagem das páginas próprias do aluno (nota e quadro de horário).
+    Os dados ficam em data/<matricula>/.
+
+    `logado` recebe (sessão, matrícula) da primeira conta que logar, para a raspagem das turmas disponíveis.
+    """
+    user_data, session = login(user=conta["user"], password=conta["password"], adapter=adapter)
+    matricula = user_data["matricula"]
+    if logado is not None:
+        try:
+            logado.set_result((session, matricula))
+        except InvalidStateError:
+            # Outra conta logou antes
+            pass
+    data_dir = os.path.join(DATA_DIR, matricula)
+    os.makedirs(data_dir, exist_ok=True)
+
+    get_disciplinas_aprovadas(
+        session=session, matricula=matricula,
+        save_path=os.path.join(data_dir, "disciplinas_aprovadas.json"),
+    )
+    turmas_matricula_data = get_turmas_matricula_data(
+        session=session, matricula=matricula, registry=registry,
+        save_path=os.path.join(data_dir, "turmas_matricula_data.json"),
+    )
+    return matricula, session, turmas_matricula_data
+
+def _gerar_saidas(matricula: str, turmas_matricula_data: dict[str:dict[str:str]], turmas_disponiveis: dict[str, Turma]):
+    """
+    Gera output/<matricula>/matricula_data.json e agenda.ics a partir dos dados do aluno
+    e das turmas disponíveis (comuns a todos, lidas uma vez só).
+    """
+    data_dir = os.path.join(DATA_DIR, matricula)
+    output_dir = os.path.join(OUTPUT_DIR, matricula)
+    run_transformation_stream(
+        turmas_disponiveis.items(),
+        turmas_matricula_data=turmas_matricula_data,
+        disciplinas_aprovadas=_carregar_json(os.path.join(data_dir, "disciplinas_aprovadas.json"), []),
+        output_path=os.path.join(output_dir, "matricula_data.json"),
+    )
+    generate_ics(turmas_data=turmas_matricula_data, output_path=os.path.join(output_dir, "agenda.ics"))
+
+def batch(credentials_path: str, workers: int = MAX_WORKERS, max_concurrency: int = MAX_CONCURRENCY, max_contas: int = MAX_CONTAS) -> dict[str:str]:
+    """
+    Roda o scraper para várias contas (ex.: uma turma inteira de alunos).
+
+    - Cada conta tem sua própria sessão, mas todas usam o mesmo pool de conexões, com no
+      máximo `max_concurrency` requisições ao portal ao mesmo tempo.
+    - As páginas de turma são iguais para todos os alunos: passam por um TurmaRegistry (e um
+      ResponseCache) compartilhado, então cada turma é buscada uma vez só.
+    - As turmas disponíveis são raspadas uma vez, com a sessão da primeira conta que logar, em
+      paralelo às contas; só nota e quadro de horário são buscados por conta.
+    - As turmas disponíveis ficam em memória como registros compactos (scrap.turma_model) e
+      são transformadas a partir deles para cada conta, sem reler o JSON.
+
+    Retorna {user: matrícula} das contas processadas; contas que falharam são avisadas e puladas.
+    """
+    contas = carregar_credenciais(credentials_path)
+    print(f"=== Iniciando CEFET Scraper (batch, {len(contas)} contas) ===")
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    adapter = SchedulingAdapter(max_concurrency)
+    cache = ResponseCache()
+    registry = TurmaRegistry(cache=cache)
+
+    # Turmas disponíveis: uma vez, com a sessão da primeira conta que logar. Roda na sua própria thread,
+    # já enfileirada antes das contas, para não esperar uma vaga entre elas; as turmas matriculadas de
+    # cada conta que também estão na oferta esperam a busca em andamento no registry
+    logado = Future()
+
+    def raspar_disponiveis():
+        session, matricula = logado.result()
+        print("\nRaspando turmas disponíveis (isso pode demorar)...")
+        return get_turmas_disponiveis_data(session=session, matricula=matricula, workers=workers, registry=registry)
+
+    alunos = {}
+    with ThreadPoolExecutor(max_workers=1) as executor_disponiveis:
+        disponiveis = executor_disponiveis.submit(raspar_disponiveis)
+
+        with ThreadPoolExecutor(max_workers=max_contas) as executor:
+            futures = {conta["user"]: executor.submit(_raspar_aluno, conta, adapter, registry, logado) for conta in contas}
+
+            for user, future in futures.items():
+                try:
+                    matricula, session, turmas_matricula_data = future.result()
+                except PermissionError:
+                    print(f"Erro: usuário ou senha inválidos para {user}")
+                    continue
+                except Exception as e:
+                    print(f"Erro ao raspar {user}: {e}")
+                    continue
+                alunos[user] = (matricula, turmas_matricula_data)
+
+        if not logado.done():
+            logado.set_exception(RuntimeError("Nenhuma conta logou"))
+            print("\nNenhuma conta logou; nada a fazer")
+            return {}
+        turmas_disponiveis = carregar_turmas(disponiveis.result() or {})
+
+    print(registry.summary())
+    print(cache.summary())
+    print(adapter.summary())
+    print("\n=== Raspagem finalizada com sucesso! ===")
+
+    processadas = {}
+    for user, (matricula, turmas_matricula_data) in alunos.items():
+        print(f"\nGerando saídas de {matricula}...")
+        try:
+            _gerar_saidas(matricula, turmas_matricula_data, turmas_disponiveis)
+        except Exception as e:
+            print(f"Erro ao gerar saídas de {matricula}: {e}")
+            continue
+        processadas[user] = matricula
+
+    return processadas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CEFET Scraper para várias contas")
+    parser.add_argument("credenciais", help="Arquivo JSON com a lista de contas: [{\"user\": ..., \"password\": ...}]")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Threads para as turmas disponíveis")
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY, help="Limite global de requisições simultâneas")
+    parser.add_argument("--max-contas", type=int, default=MAX_CONTAS, help="Contas processadas ao mesmo tempo")
+    args = parser.parse_args()
+    batch(args.credenciais, workers=args.workers, max_concurrency=args.max_concurrency, max_contas=args.max_contas)
@@ -0,0 +1,74 @@
+"""
+Compara a vazão (turmas/s) do pool de threads (requests) com o backend asyncio (aiohttp)
+buscando páginas de turma de um servidor local.
+
+As duas versões rodam nas mesmas condições: sem limite de taxa (CEFET_RATE_LIMIT=0) e com
+`--workers` requisições simultâneas desde o início (o SchedulingAdapter das threads começa no
+limite, sem a subida do AIMD; o aiohttp usa o mesmo número de conexões por host). Tudo roda em
+uma pasta temporária, para o login não gravar data/session.json na pasta atual.
+
+Uso:
+    python -m bench.bench_async --turmas 2000 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.mock_portal import start_server, PRIMEIRO_TURMA_ID
+
+def _bench_threads(turma_ids: list[str], workers: int) -> float:
+    from scrap.login import login
+    from scrap.scheduler import SchedulingAdapter, AIMDLimiter
+    from scrap.get_turma_data import get_turma_data
+
+    # Concorrência fixa em `workers`, como o limit_per_host do aiohttp
+    adapter = SchedulingAdapter(max_concurrency=workers, rate=0)
+    adapter.limiter = AIMDLimiter(initial=workers, maximum=workers)
+    _, session = login(reuse=False, adapter=adapter)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda turma_id: get_turma_data(session, turma_id), turma_ids))
+    return time.perf_counter() - inicio
+
+def _bench_async(turma_ids: list[str], limit_per_host: int) -> float:
+    from scrap.aio import login_async, get_turma_data_async
+
+    async def run():
+        _, session = await login_async(limit_per_host=limit_per_host)
+        async with session:
+            inicio = time.perf_counter()
+            await asyncio.gather(*(get_turma_data_async(session, turma_id) for turma_id in turma_ids))
+            return time.perf_counter() - inicio
+
+    return asyncio.run(run())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turmas", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Atraso por requisição no servidor, em segundos")
+    parser.add_argument("--workers", type=int, default=16, help="Threads do pool / conexões por host do aiohttp")
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, cursos=1, turmas=args.turmas)
+    # Precisa ser definido antes de importar os módulos do scrap (as URLs são montadas a partir dele)
+    os.environ["CEFET_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["user"] = os.environ["password"] = "bench"
+    os.environ["CEFET_RATE_LIMIT"] = "0"
+
+    turma_ids = [str(PRIMEIRO_TURMA_ID + i) for i in range(args.turmas)]
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="cefet-bench-async-")
+    try:
+        os.chdir(workdir)
+        for nome, bench in [("threads", _bench_threads), ("asyncio", _bench_async)]:
+            duracao = bench(turma_ids, args.workers)
+            print(f"{nome:8} {args.turmas} turmas em {duracao:.2f}s -> {args.turmas / duracao:.1f} turmas/s")
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,156 @@
+"""
+Benchmark ponta a ponta: roda main.main contra o servidor local (bench.mock_portal) e
+reporta turmas/s, latência das requisições (p50/p99) e pico de memória (RSS).
+
+O servidor roda em outro processo, para não entrar na medição de memória. Cada execução
+acontece em uma pasta temporária (data/, output/ e cache começam vazios); com --runs 2
+a segunda execução mostra o efeito do cache.
+
+Com --parse-workers, o parse roda em processos (scrap.parse_pool); o pico de memória mostrado
+é só o do processo principal.
+
+Uso:
+    python -m bench.bench_e2e --cursos 50 --turmas 5000 --latency 0.05 --error-rate 0.01
+    python -m bench.bench_e2e --parser html.parser --parse-workers 8
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _start_mock_server(args) -> tuple[subprocess.Popen, str]:
+    command = [
+        sys.executable, "-m", "bench.mock_portal", "--port", "0",
+        "--cursos", str(args.cursos), "--turmas", str(args.turmas),
+        "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+    ]
+    process = subprocess.Popen(command, cwd=REPO_DIR, stdout=subprocess.PIPE, text=True)
+    linha = process.stdout.readline()
+    if not linha:
+        process.kill()
+        raise RuntimeError("Servidor local não iniciou")
+    return process, linha.strip().split(" ")[-1]
+
+class _RequestTimer:
+    """
+    Mede a duração de cada requisição feita pelo requests (em qualquer sessão do processo).
+    """
+
+    def __init__(self):
+        from requests.adapters import HTTPAdapter
+        self._adapter = HTTPAdapter
+        self._send = HTTPAdapter.send
+        self._lock = threading.Lock()
+        self.durations = []
+        self.bytes = 0
+
+    def __enter__(self):
+        timer = self
+
+        def send(adapter, request, *args, **kwargs):
+            inicio = time.perf_counter()
+            response = timer._send(adapter, request, *args, **kwargs)
+            duracao = time.perf_counter() - inicio
+            with timer._lock:
+                timer.durations.append(duracao)
+                timer.bytes += len(response.content)
+            return response
+
+        self._adapter.send = send
+        return self
+
+    def __exit__(self, *exc):
+        self._adapter.send = self._send
+
+def _percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+def run_benchmark(args) -> list[dict]:
+    server, base_url = _start_mock_server(args)
+    # Precisa ser definido antes de importar os módulos do scrap (as URLs são montadas a partir dele)
+    os.environ["CEFET_BASE_URL"] = base_url
+    os.environ["user"] = os.environ["password"] = "bench"
+    os.environ["CEFET_RATE_LIMIT"] = str(args.rate)
+    if args.parser:
+        os.environ["CEFET_PARSER"] = args.parser
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="cefet-bench-")
+    os.makedirs(os.path.join(workdir, "curriculum"))
+    shutil.copy(os.path.join(REPO_DIR, "curriculum", "requisitos.json"), os.path.join(workdir, "curriculum"))
+    sys.path.insert(0, REPO_DIR)
+
+    resultados = []
+    try:
+        os.chdir(workdir)
+        import main
+
+        for run in range(1, args.runs + 1):
+            with _RequestTimer() as timer:
+                inicio = time.perf_counter()
+                main.main(parse_workers=args.parse_workers)
+                duracao = time.perf_counter() - inicio
+
+            with open("data/turmas_disponiveis_data.json", "r") as f:
+                turmas = len(json.load(f))
+            resultados.append({
+                "run": run,
+                "turmas": turmas,
+                "segundos": round(duracao, 3),
+                "turmas_por_segundo": round(turmas / duracao, 1),
+                "requisicoes": len(timer.durations),
+                "bytes": timer.bytes,
+                "latencia_p50_ms": round(_percentil(timer.durations, 50) * 1000, 2),
+                "latencia_p99_ms": round(_percentil(timer.durations, 99) * 1000, 2),
+                "latencia_media_ms": round(statistics.fmean(timer.durations) * 1000, 2) if timer.durations else 0.0,
+                # ru_maxrss é em KiB no Linux
+                "pico_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            })
+    finally:
+        os.chdir(cwd)
+        server.terminate()
+        server.wait()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+        else:
+            print(f"Arquivos da execução mantidos em {workdir}")
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cursos", type=int, default=50)
+    parser.add_argument("--turmas", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Atraso médio por requisição no servidor, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500 do servidor")
+    parser.add_argument("--rate", type=float, default=0, help="Limite de requisições/s do scraper (0 = sem limite)")
+    parser.add_argument("--parser", choices=["stream", "lxml", "html.parser"], help="Parser da página da turma (padrão: CEFET_PARSER)")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Processos de parse (0 = parse nas threads)")
+    parser.add_argument("--runs", type=int, default=1, help="Execuções seguidas na mesma pasta (a partir da 2ª, com cache)")
+    parser.add_argument("--json", metavar="ARQUIVO", help="Salva os resultados em JSON")
+    parser.add_argument("--keep", action="store_true", help="Mantém a pasta temporária da execução")
+    args = parser.parse_args()
+
+    resultados = run_benchmark(args)
+
+    print("\n=== Resultado ===")
+    for r in resultados:
+        print(
+            f"run {r['run']}: {r['turmas']} turmas em {r['segundos']}s ({r['turmas_por_segundo']} turmas/s) | "
+            f"{r['requisicoes']} requisições, p50 {r['latencia_p50_ms']} ms, p99 {r['latencia_p99_ms']} ms | "
+            f"pico RSS {r['pico_rss_mb']} MB"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent=4)
@@ -0,0 +1,288 @@
+"""
+Microbenchmarks dos parsers, da transformação e da geração do ICS, com comparação contra um baseline.
+
+As páginas vêm do catálogo sintético de bench.mock_portal ou, com --arquivo, de uma execução
+gravada em data/archive (ver scrap.archive). As etapas que crescem com a oferta (clean_str,
+transform_data, Turma.from_dict, transform_turma, run_transformation, generate_ics) rodam com 10 a 10.000 turmas; os parsers são
+medidos por página. Para cada caso: itens por segundo (melhor de --repeticoes) e pico de memória
+alocada em uma chamada (tracemalloc).
+
+Uso:
+    python -m bench.bench_micro --salvar-baseline          # grava data/bench_baseline.json
+    python -m bench.bench_micro                            # compara com o baseline gravado
+    python -m bench.bench_micro --arquivo latest --casos parse_turma_page,transform_data --tamanhos 100,1000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+from scrap.archive import ARCHIVE_DIR
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = "data/bench_baseline.json"
+TAMANHOS = [10, 100, 1000, 10000]
+# Páginas por chamada nos casos de parse (o custo é por página, não depende do tamanho da oferta)
+PAGINAS_PARSE = 200
+# Variação aceita em relação ao baseline antes de marcar como mais lento/mais rápido
+TOLERANCIA = 0.15
+TEMPO_MINIMO = 0.2
+
+class Fixtures:
+    """
+    Páginas e turmas já parseadas usadas pelos casos. `turmas(n)` repete as turmas disponíveis
+    (com ids novos) até ter n.
+    """
+
+    def __init__(self, arquivo: str | None = None, max_turmas: int = max(TAMANHOS), arquivo_dir: str = ARCHIVE_DIR):
+        from scrap.get_turma_data import parse_turma_page
+
+        if arquivo:
+            self.origem = f"arquivo {arquivo}"
+            self.paginas_turma, self.paginas_oferta = self._do_arquivo(arquivo, arquivo_dir)
+        else:
+            self.origem = "sintético"
+            self.paginas_turma, self.paginas_oferta = self._sinteticas(min(max_turmas, 2000))
+        if not self.paginas_turma:
+            raise ValueError("Nenhuma página de turma nas fixtures")
+        self.turmas_base = [(turma_id, parse_turma_page(html)) for turma_id, html in self.paginas_turma]
+
+    @staticmethod
+    def _sinteticas(turmas: int) -> tuple[list[tuple[str, str]], list[str]]:
+        from bench.mock_portal import Catalog
+        catalog = Catalog(cursos=10, turmas=turmas)
+        paginas_turma = [(turma_id, catalog.render_turma(turma_id)) for turma_id in catalog.turmas]
+        paginas_oferta = [catalog.render_oferta(curso_id) for curso_id in catalog.cursos]
+        return paginas_turma, paginas_oferta
+
+    @staticmethod
+    def _do_arquivo(run: str, path: str) -> tuple[list[tuple[str, str]], list[str]]:
+        from scrap.archive import ReplaySession
+        session = ReplaySession(run, path=path)
+        paginas_turma, paginas_oferta = [], []
+        for key, entry in session.pages.items():
+            if entry["status"] != 200:
+                continue
+            if "turma.action" in key:
+                paginas_turma.append((key.rsplit("=", 1)[-1], session.get(key).text))
+            elif "oferta.action" in key:
+                paginas_oferta.append(session.get(key).text)
+        return paginas_turma, paginas_oferta
+
+    def paginas(self, n: int) -> list[str]:
+        return [self.paginas_turma[i % len(self.paginas_turma)][1] for i in range(n)]
+
+    def turmas(self, n: int) -> dict[str, dict]:
+        base = self.turmas_base
+        return {f"{i:06}": base[i % len(base)][1] for i in range(n)}
+
+def _parse_turma_page(fixtures: Fixtures, n: int, backend: str):
+    from scrap.get_turma_data import parse_turma_page
+    paginas = fixtures.paginas(PAGINAS_PARSE)
+    return lambda: [parse_turma_page(html, backend=backend) for html in paginas], len(paginas)
+
+def _parse_table_por_titulo(fixtures: Fixtures, n: int):
+    from scrap.get_turma_data import _parse_table_por_titulo
+    sopas = [BeautifulSoup(html, "html.parser") for html in fixtures.paginas(PAGINAS_PARSE)]
+    titulos = ["Docentes", "Horários", "Espaço Físico"]
+    return lambda: [_parse_table_por_titulo(sopa, titulo) for sopa in sopas for titulo in titulos], len(sopas) * len(titulos)
+
+def _parse_ofertas(fixtures: Fixtures, n: int):
+    from scrap.get_turmas_disponiveis_data import parse_ofertas
+    paginas = fixtures.paginas_oferta
+    return lambda: [parse_ofertas(html) for html in paginas], len(paginas)
+
+def _clean_str(fixtures: Fixtures, n: int, memorizada: bool):
+    from scrap.texto import clean_str
+    nomes = [turma[campo] for turma in fixtures.turmas(n).values() for campo in ("Disciplina", "Curso")]
+    func = clean_str if memorizada else clean_str.__wrapped__
+    return lambda: [func(nome) for nome in nomes], len(nomes)
+
+def _transform_data(fixtures: Fixtures, n: int):
+    from transform.transform_data import transform_data, carregar_requisitos
+    requisitos = carregar_requisitos()
+    turmas = fixtures.turmas(n)
+    return lambda: [transform_data(turma_id, data, requisitos) for turma_id, data in turmas.items()], n
+
+def _turma_from_dict(fixtures: Fixtures, n: int):
+    from scrap.turma_model import carregar_turmas
+    turmas = fixtures.turmas(n)
+    return lambda: carregar_turmas(turmas), n
+
+def _transform_turma(fixtures: Fixtures, n: int):
+    from scrap.turma_model import carregar_turmas
+    from transform.transform_data import transform_turma, carregar_requisitos
+    requisitos = carregar_requisitos()
+    turmas = carregar_turmas(fixtures.turmas(n))
+    return lambda: [transform_turma(turma_id, turma, requisitos) for turma_id, turma in turmas.items()], n
+
+def _run_transformation(fixtures: Fixtures, n: int, tmp: str):
+    from transform.transform_data import run_transformation
+    disponiveis = os.path.join(tmp, f"turmas_disponiveis_{n}.json")
+    with open(disponiveis, "w") as f:
+        json.dump(fixtures.turmas(n), f)
+    matricula = os.path.join(tmp, "turmas_matricula.json")
+    with open(matricula, "w") as f:
+        json.dump({turma_id: {**data, "Matrícula": "Aceita/Matriculada"} for turma_id, data in fixtures.turmas_base[:6]}, f)
+
+    def rodar():
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_transformation(
+                disciplinas_aprovadas_path=os.path.join(tmp, "nenhum.json"),
+                turmas_disponiveis_path=disponiveis,
+                turmas_matricula_path=matricula,
+                output_path=os.path.join(tmp, "output", "matricula_data.json"),
+            )
+    return rodar, n
+
+def _generate_ics(fixtures: Fixtures, n: int, tmp: str):
+    from transform.generate_ics import generate_ics
+    turmas = fixtures.turmas(n)
+
+    def rodar():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_ics(turmas_data=turmas, output_path=os.path.join(tmp, "output", "agenda.ics"))
+    return rodar, n
+
+# nome -> (prepara(fixtures, n, tmp) -> (função, itens por chamada), depende do tamanho)
+CASOS = {
+    "parse_turma_page[stream]": (lambda f, n, tmp: _parse_turma_page(f, n, "stream"), False),
+    "parse_turma_page[html.parser]": (lambda f, n, tmp: _parse_turma_page(f, n, "html.parser"), False),
+    "parse_turma_page[lxml]": (lambda f, n, tmp: _parse_turma_page(f, n, "lxml"), False),
+    "_parse_table_por_titulo": (lambda f, n, tmp: _parse_table_por_titulo(f, n), False),
+    "parse_ofertas": (lambda f, n, tmp: _parse_ofertas(f, n), False),
+    "clean_str": (lambda f, n, tmp: _clean_str(f, n, memorizada=False), True),
+    "clean_str[memorizada]": (lambda f, n, tmp: _clean_str(f, n, memorizada=True), True),
+    "transform_data": (lambda f, n, tmp: _transform_data(f, n), True),
+    "Turma.from_dict": (lambda f, n, tmp: _turma_from_dict(f, n), True),
+    "transform_turma": (lambda f, n, tmp: _transform_turma(f, n), True),
+    "run_transformation": (_run_transformation, True),
+    "generate_ics": (_generate_ics, True),
+}
+
+def medir(func, itens: int, repeticoes: int) -> dict:
+    """
+    Itens por segundo (melhor de `repeticoes` rodadas de pelo menos TEMPO_MINIMO) e pico de memória de uma chamada.
+    """
+    func()  # aquece caches e imports
+    timer = timeit.Timer(func)
+    loops, tempo = timer.autorange()
+    if tempo < TEMPO_MINIMO:
+        loops = max(loops, int(loops * TEMPO_MINIMO / max(tempo, 1e-9)))
+    melhor = min(timer.repeat(repeat=repeticoes, number=loops)) / loops
+
+    tracemalloc.start()
+    func()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "itens": itens,
+        "itens_por_s": round(itens / melhor, 1),
+        "us_por_item": round(melhor / itens * 1e6, 2),
+        "pico_kb": round(pico / 1024, 1),
+    }
+
+def rodar(casos: list[str], tamanhos: list[int], arquivo: str | None, repeticoes: int, arquivo_dir: str = ARCHIVE_DIR) -> dict:
+    fixtures = Fixtures(arquivo, max_turmas=max(tamanhos), arquivo_dir=arquivo_dir)
+    resultados = {}
+    tmp = tempfile.mkdtemp(prefix="cefet-bench-micro-")
+    try:
+        for nome in casos:
+            prepara, escala = CASOS[nome]
+            for n in (tamanhos if escala else [PAGINAS_PARSE]):
+                chave = f"{nome}@{n}" if escala else nome
+                try:
+                    func, itens = prepara(fixtures, n, tmp)
+                    resultado = medir(func, itens, repeticoes)
+                except Exception as error:  # ex.: lxml não instalado
+                    print(f"{chave}: ignorado ({type(error).__name__}: {error})")
+                    continue
+                resultados[chave] = resultado
+                print(f"{chave:<36} {resultado['itens_por_s']:>12,.0f} itens/s {resultado['us_por_item']:>10.2f} µs/item {resultado['pico_kb']:>10.1f} KB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "fixtures": fixtures.origem,
+        "resultados": resultados,
+    }
+
+def comparar(atual: dict, baseline: dict, tolerancia: float = TOLERANCIA) -> list[str]:
+    """
+    Imprime a razão atual/baseline de cada caso e retorna os casos mais lentos que o baseline além da tolerância.
+    """
+    print(f"\nComparação com o baseline de {baseline['data']} (Python {baseline['python']}, fixtures {baseline['fixtures']}):")
+    regressoes = []
+    for chave, resultado in atual["resultados"].items():
+        anterior = baseline["resultados"].get(chave)
+        if anterior is None:
+            print(f"  {chave:<36} novo")
+            continue
+        razao = resultado["itens_por_s"] / anterior["itens_por_s"]
+        memoria = resultado["pico_kb"] / anterior["pico_kb"] if anterior["pico_kb"] else 1.0
+        if razao < 1 - tolerancia:
+            situacao = "MAIS LENTO"
+            regressoes.append(chave)
+        elif razao > 1 + tolerancia:
+            situacao = "mais rápido"
+        else:
+            situacao = "igual"
+        print(f"  {chave:<36} {razao:6.2f}x velocidade {memoria:6.2f}x memória  {situacao}")
+    return regressoes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--casos", default=",".join(CASOS), help="Casos separados por vírgula")
+    parser.add_argument("--tamanhos", default=",".join(map(str, TAMANHOS)), help="Números de turmas separados por vírgula")
+    parser.add_argument("--arquivo", metavar="RUN", help="Usa as páginas de uma execução de data/archive (\"latest\" = a mais recente)")
+    parser.add_argument("--arquivo-dir", default=ARCHIVE_DIR, help="Pasta do arquivo de páginas")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Arquivo do baseline")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados como o novo baseline")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Queda de velocidade aceita (0.15 = 15%%)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    casos = [caso for caso in args.casos.split(",") if caso]
+    desconhecidos = [caso for caso in casos if caso not in CASOS]
+    if desconhecidos:
+        parser.error(f"casos desconhecidos: {', '.join(desconhecidos)} (disponíveis: {', '.join(CASOS)})")
+
+    # Os caminhos do currículo (curriculum/requisitos.json) e do arquivo são relativos à raiz do repositório
+    args.arquivo_dir = os.path.abspath(args.arquivo_dir)
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    if args.baseline != BASELINE_PATH:
+        args.baseline = os.path.abspath(args.baseline)
+    os.chdir(REPO_DIR)
+    inicio = time.perf_counter()
+    atual = rodar(casos, [int(n) for n in args.tamanhos.split(",")], args.arquivo, args.repeticoes, args.arquivo_dir)
+    print(f"({time.perf_counter() - inicio:.1f}s, fixtures {atual['fixtures']})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=4, ensure_ascii=False)
+    regressoes = []
+    if args.salvar_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=4, ensure_ascii=False)
+        print(f"Baseline salvo em {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressoes = comparar(atual, json.load(f), args.tolerancia)
+    else:
+        print(f"Sem baseline em {args.baseline} (use --salvar-baseline)")
+    sys.exit(1 if regressoes else 0)
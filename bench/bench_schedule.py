@@ -0,0 +1,117 @@
+"""
+Benchmark do montador de grades (transform.schedule) em catálogos sintéticos.
+
+Compara com a forma direta (todas as combinações de turmas, conferindo conflito horário a
+horário com as strings de `slots`) quando ela é viável, e confere que as duas acham o mesmo
+número de grades e a mesma melhor nota.
+
+Uso:
+    python -m bench.bench_schedule
+    python -m bench.bench_schedule --disciplinas 10 --turmas 40
+"""
+import argparse
+import itertools
+import random
+import time
+
+from transform.schedule import ScheduleEngine, DIAS
+
+# Horários de aula típicos (início, fim)
+HORARIOS = [("07:00", "08:40"), ("08:50", "10:30"), ("10:40", "12:20"), ("12:30", "14:10"), ("14:35", "16:15"), ("16:25", "18:10"), ("18:20", "20:00"), ("20:10", "21:50")]
+# Acima disso a forma direta não é executada
+MAX_COMBINACOES_DIRETA = 2_000_000
+
+def catalogo_sintetico(disciplinas: int, turmas_por_disciplina: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    courses = []
+    for d in range(disciplinas):
+        for t in range(turmas_por_disciplina):
+            slots = []
+            for dia in rng.sample(DIAS[:6], rng.randint(1, 3)):
+                start, end = rng.choice(HORARIOS)
+                slots.append({"day": dia, "start": start, "end": end})
+            total = rng.choice([30, 40, 50])
+            courses.append({
+                "id": f"{d:03}{t:03}",
+                "code": f"DISCIPLINA {d}",
+                "slots": slots,
+                "occupancy": {"total": str(total), "occupied": str(rng.randint(0, total)), "requested": "0"},
+            })
+    return courses
+
+def _conflita_direto(a: dict, b: dict) -> bool:
+    for sa in a["slots"]:
+        for sb in b["slots"]:
+            if sa["day"] == sb["day"] and sa["start"] < sb["end"] and sb["start"] < sa["end"]:
+                return True
+    return False
+
+def direto(courses: list[dict], disciplinas: list[str], engine: ScheduleEngine) -> tuple[int, tuple | None]:
+    """
+    Todas as combinações, sem índice: retorna (grades sem conflito, melhor nota).
+    A nota é calculada pelo engine, para comparar só a busca.
+    """
+    por_disciplina = {}
+    for course in courses:
+        por_disciplina.setdefault(course["code"], []).append(course)
+    indice = {course["id"]: i for i, course in enumerate(engine.courses)}
+    total, melhor = 0, None
+    for combinacao in itertools.product(*(por_disciplina[d] for d in disciplinas)):
+        if any(_conflita_direto(a, b) for a, b in itertools.combinations(combinacao, 2)):
+            continue
+        total += 1
+        nota = engine.grade([indice[c["id"]] for c in combinacao]).nota
+        if melhor is None or nota < melhor:
+            melhor = nota
+    return total, melhor
+
+def rodar(disciplinas: int, turmas: int, escolhidas: int, top: int, seed: int = 0) -> dict:
+    courses = catalogo_sintetico(disciplinas, turmas, seed)
+    alvo = [f"DISCIPLINA {d}" for d in range(escolhidas)]
+
+    inicio = time.perf_counter()
+    engine = ScheduleEngine(courses)
+    montagem = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    total = sum(1 for _ in engine.combinacoes(alvo))
+    enumeracao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    grades = engine.ranquear(alvo, top=top)
+    ranking = time.perf_counter() - inicio
+
+    resultado = {
+        "turmas": len(courses), "escolhidas": escolhidas, "grades": total,
+        "montagem_ms": montagem * 1000, "enumeracao_ms": enumeracao * 1000, "ranking_ms": ranking * 1000,
+        "direta_ms": None, "confere": None,
+    }
+    if turmas ** escolhidas <= MAX_COMBINACOES_DIRETA:
+        inicio = time.perf_counter()
+        total_direto, melhor_direto = direto(courses, alvo, engine)
+        resultado["direta_ms"] = (time.perf_counter() - inicio) * 1000
+        resultado["confere"] = total_direto == total and (melhor_direto == (grades[0].nota if grades else None))
+    return resultado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--disciplinas", type=int, help="Disciplinas no catálogo (padrão: uma série de tamanhos)")
+    parser.add_argument("--turmas", type=int, default=10, help="Turmas por disciplina")
+    parser.add_argument("--escolhidas", type=int, default=6, help="Disciplinas da grade")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.disciplinas:
+        casos = [(args.disciplinas, args.turmas, args.escolhidas)]
+    else:
+        casos = [(20, 5, 5), (40, 10, 6), (60, 10, 7), (100, 20, 8), (200, 40, 8)]
+
+    print(f"{'turmas':>7} {'escolh.':>7} {'grades':>9} {'montagem':>10} {'enumerar':>10} {'top':>10} {'direta':>10}  confere")
+    for disciplinas, turmas, escolhidas in casos:
+        r = rodar(disciplinas, turmas, escolhidas, args.top)
+        direta = f"{r['direta_ms']:8.1f}ms" if r["direta_ms"] is not None else f"{'-':>10}"
+        confere = "-" if r["confere"] is None else ("sim" if r["confere"] else "NÃO")
+        print(
+            f"{r['turmas']:>7} {r['escolhidas']:>7} {r['grades']:>9} {r['montagem_ms']:8.1f}ms "
+            f"{r['enumeracao_ms']:8.1f}ms {r['ranking_ms']:8.1f}ms {direta}  {confere}"
+        )
@@ -0,0 +1,336 @@
+"""
+Servidor local que imita o Portal do Aluno, para testes de carga e benchmarks.
+
+Serve as páginas usadas pelo scraper (login, nota.action, quadrohorario.action, as páginas
+de oferta da matrícula e turma.action), geradas a partir de templates com a mesma estrutura
+que os parsers de scrap/ esperam, sobre um catálogo sintético e determinístico.
+
+Uso:
+    python -m bench.mock_portal --port 8765 --cursos 50 --turmas 5000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import hashlib
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+REQUISITOS_PATH = "curriculum/requisitos.json"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="UTF-8"><title>Portal do Aluno</title></head>
+<body>
+{conteudo}
+</body></html>"""
+
+LOGIN_FORM_TEMPLATE = """<form method="post" action="j_security_check">
+  <input type="text" name="j_username"><input type="password" name="j_password">
+  <button type="submit">Entrar</button>
+</form>"""
+
+LANDING_TEMPLATE = """<div id="menu"><button type="button">{nome}</button></div>
+<form><input type="hidden" id="matricula" value="{matricula}"></form>"""
+
+NOTAS_TABLE_TEMPLATE = """<table class="table-turmas">
+  <thead><tr><th>Disciplina</th><th>Situação</th></tr></thead>
+  <tbody>{linhas}</tbody>
+</table>"""
+
+NOTAS_ROW_TEMPLATE = """<tr><td>{disciplina}  (T.{turma})</td><td>{situacao}</td></tr>"""
+
+QUADRO_HORARIO_ROW_TEMPLATE = """<div class="turmaqh"><a href="/aluno/aluno/turma.action?turma={turma_id}">{disciplina} T.{turma_nome}</a> <img src="status.png" title="{situacao}"></div>"""
+
+CURSOS_TEMPLATE = """<select id="cursos">{opcoes}</select>"""
+
+OFERTA_PERIODO_TEMPLATE = """<div tipoinformacao="periodo"><a href="#">Período {periodo}</a>
+{disciplinas}
+</div>"""
+
+OFERTA_DISCIPLINA_TEMPLATE = """<div tipoinformacao="disciplina"><ul><li idturma="{turma_id}" nomedisciplina="{disciplina}">{disciplina}</li></ul></div>"""
+
+TURMA_TEMPLATE = """<div class="topopage">Turma&nbsp;{nome}&nbsp;-&nbsp;{disciplina}</div>
+<div title="Dados Gerais">
+  <div><span class="label">Disciplina:</span> {disciplina}</div>
+  <div><span class="label">Curso:</span> {curso}</div>
+  <div><span class="label">Ano:</span> 2026</div>
+  <div><span class="label">Período:</span> 1º Semestre</div>
+  <div><span class="label">Carga Horária Realizada:</span> {carga}</div>
+  <table class="tablevagas">
+    <tr><td><span class="label">Vagas Totais:</span></td><td><strong>{vagas_totais}</strong></td></tr>
+    <tr><td><span class="label">Vagas Ocupadas:</span></td><td><strong>{vagas_ocupadas}</strong></td></tr>
+    <tr><td><span class="label">Total de Matrículas:</span></td><td><strong>{vagas_ocupadas}</strong></td></tr>
+    <tr><td><span class="label">Total de Solicitações:</span></td><td><strong>{solicitacoes}</strong></td></tr>
+  </table>
+</div>
+<div title="Docentes"><table>
+  <thead><tr><th>Nome do Docente</th><th>Papel do Docente</th></tr></thead>
+  <tbody><tr><td>{docente}</td><td>Colaborador</td></tr></tbody>
+</table></div>
+<div title="Horários"><table>
+  <thead><tr><th>Dia da Semana</th><th>Hora Início</th><th>Hora Fim</th><th>Aula</th><th>Data Início Período</th><th>Data Fim Período</th></tr></thead>
+  <tbody>{horarios}</tbody>
+</table></div>
+<div title="Espaço Físico"><table>
+  <thead><tr><th>Nome do Prédio</th><th>Número da Sala</th><th>Espaço Físico</th></tr></thead>
+  <tbody><tr><td>Bloco {bloco}</td><td>{sala}</td><td>Sala de Aula</td></tr></tbody>
+</table></div>"""
+
+HORARIO_ROW_TEMPLATE = """<tr><td>{dia} - {dia_nome}</td><td>{inicio}</td><td>{fim}</td><td>Teórica</td><td>23/02/2026</td><td>02/07/2026</td></tr>"""
+
+DIAS = {2: "Segunda-feira", 3: "Terça-feira", 4: "Quarta-feira", 5: "Quinta-feira", 6: "Sexta-feira", 7: "Sábado"}
+HORARIOS = [("07:00", "08:40"), ("08:50", "10:30"), ("10:40", "12:20"), ("12:55", "14:35"), ("14:35", "16:15"), ("16:25", "18:05"), ("18:10", "19:50"), ("19:55", "21:35")]
+PRIMEIRO_TURMA_ID = 900000
+
+def _disciplinas_base() -> list[tuple[str, str]]:
+    """
+    Nomes (e períodos) das disciplinas: as do currículo, se existir, mais nomes sintéticos.
+    """
+    try:
+        with open(REQUISITOS_PATH, "r") as f:
+            base = [(d["disciplina"].upper(), d["periodo"]) for d in json.load(f)]
+    except OSError:
+        base = []
+    return base + [(f"DISCIPLINA SINTÉTICA {i}", str(i % 8 + 1)) for i in range(400)]
+
+class Catalog:
+    """
+    Catálogo sintético: cursos, turmas (com disciplina, período e curso) e um aluno por usuário.
+    Uma fração das turmas (`compartilhadas`) também é oferecida em um segundo curso.
+    """
+
+    def __init__(self, cursos: int = 50, turmas: int = 5000, compartilhadas: float = 0.1, seed: int = 0):
+        rng = random.Random(seed)
+        disciplinas = _disciplinas_base()
+        self.cursos = [str(1000 + i) for i in range(cursos)]
+        self.turmas = {}
+        self.ofertas = {curso_id: [] for curso_id in self.cursos}
+
+        for i in range(turmas):
+            turma_id = str(PRIMEIRO_TURMA_ID + i)
+            disciplina, periodo = disciplinas[i % len(disciplinas)]
+            curso_id = self.cursos[i % cursos]
+            self.turmas[turma_id] = {"disciplina": disciplina, "periodo": periodo, "curso": curso_id}
+            self.ofertas[curso_id].append(turma_id)
+            if cursos > 1 and rng.random() < compartilhadas:
+                outro = rng.choice([c for c in self.cursos if c != curso_id])
+                self.ofertas[outro].append(turma_id)
+
+        self._disciplinas = disciplinas
+        self._alunos = {}
+        # turma_id -> vagas ocupadas, sobrescreve o valor sintético (para simular a ocupação mudando)
+        self.ocupadas: dict[str, int] = {}
+
+    def aluno(self, user: str) -> dict:
+        """
+        Aluno sintético de cada usuário (matrícula, turmas matriculadas e disciplinas aprovadas),
+        sempre o mesmo para o mesmo usuário.
+        """
+        aluno = self._alunos.get(user)
+        if aluno is None:
+            rng = random.Random(user)
+            turma_ids = list(self.turmas)
+            aluno = {
+                "matricula": f"21{rng.randint(10000, 99999)}BCC",
+                "nome": f"ALUNO {user.upper()}",
+                "matriculadas": rng.sample(turma_ids, min(6, len(turma_ids))),
+                "aprovadas": rng.sample(self._disciplinas, min(15, len(self._disciplinas))),
+            }
+            self._alunos[user] = aluno
+        return aluno
+
+    def render_turma(self, turma_id: str) -> str | None:
+        turma = self.turmas.get(turma_id)
+        if turma is None:
+            return None
+        rng = random.Random(turma_id)
+        vagas_totais = rng.choice([30, 40, 50])
+        horarios = []
+        for dia in rng.sample(sorted(DIAS), rng.randint(1, 2)):
+            inicio, fim = rng.choice(HORARIOS)
+            horarios.append(HORARIO_ROW_TEMPLATE.format(dia=dia, dia_nome=DIAS[dia], inicio=inicio, fim=fim))
+        return TURMA_TEMPLATE.format(
+            nome=turma_id,
+            disciplina=turma["disciplina"],
+            curso=f"MAR - CURSO  DE BACHARELADO {turma['curso']}",
+            carga=rng.choice([36, 54, 72]),
+            vagas_totais=vagas_totais,
+            # O randint é sempre chamado, para não mudar os valores sorteados depois dele
+            vagas_ocupadas=self.ocupadas.get(turma_id, rng.randint(0, vagas_totais)),
+            solicitacoes=rng.randint(0, 20),
+            docente=f"DOCENTE {rng.randint(1, 200)}",
+            horarios="".join(horarios),
+            bloco=rng.choice("ABCDE"),
+            sala=rng.randint(100, 520),
+        )
+
+    def render_oferta(self, curso_id: str) -> str | None:
+        if curso_id not in self.ofertas:
+            return None
+        por_periodo = {}
+        for turma_id in self.ofertas[curso_id]:
+            turma = self.turmas[turma_id]
+            por_periodo.setdefault(turma["periodo"], []).append(
+                OFERTA_DISCIPLINA_TEMPLATE.format(turma_id=turma_id, disciplina=turma["disciplina"])
+            )
+        return "\n".join(
+            OFERTA_PERIODO_TEMPLATE.format(periodo=periodo, disciplinas="\n".join(disciplinas))
+            for periodo, disciplinas in sorted(por_periodo.items())
+        )
+
+    def render_cursos(self) -> str:
+        return CURSOS_TEMPLATE.format(opcoes="".join(f'<option value="{c}">Curso {c}</option>' for c in self.cursos))
+
+    def render_quadro_horario(self, user: str) -> str:
+        return "\n".join(
+            QUADRO_HORARIO_ROW_TEMPLATE.format(
+                turma_id=turma_id,
+                turma_nome=turma_id[-3:],
+                disciplina=self.turmas[turma_id]["disciplina"],
+                situacao="Aceita/Matriculada" if i % 2 == 0 else "Solicitada",
+            )
+            for i, turma_id in enumerate(self.aluno(user)["matriculadas"])
+        )
+
+    def render_notas(self, user: str) -> str:
+        linhas = "".join(
+            NOTAS_ROW_TEMPLATE.format(disciplina=disciplina, turma=i, situacao="Aprovado" if i % 5 else "Isento")
+            for i, (disciplina, _) in enumerate(self.aluno(user)["aprovadas"])
+        )
+        linhas += NOTAS_ROW_TEMPLATE.format(disciplina="DISCIPLINA REPROVADA", turma=99, situacao="Reprovado por Nota")
+        return NOTAS_TABLE_TEMPLATE.format(linhas=linhas)
+
+class MockPortalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+    catalog: Catalog = None
+    latency = 0.0
+    error_rate = 0.0
+    session_ttl = None
+    # JSESSIONIDSSO -> (instante do login, usuário)
+    sessions: dict[str, tuple[float, str]] = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str = "", headers: dict[str, str] | None = None):
+        data = PAGE_TEMPLATE.format(conteudo=body).encode("utf-8") if body else b""
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, data = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _cookies(self) -> dict[str, str]:
+        cookies = {}
+        for parte in self.headers.get("Cookie", "").split(";"):
+            if "=" in parte:
+                key, value = parte.strip().split("=", 1)
+                cookies[key] = value
+        return cookies
+
+    def _usuario(self) -> str | None:
+        """
+        Usuário da sessão da requisição, ou None se não estiver logado (ou a sessão expirou).
+        """
+        sessao = self.sessions.get(self._cookies().get("JSESSIONIDSSO"))
+        if sessao is None:
+            return None
+        inicio, user = sessao
+        if self.session_ttl is not None and time.time() - inicio >= self.session_ttl:
+            return None
+        return user
+
+    def _landing(self, user: str) -> str:
+        aluno = self.catalog.aluno(user)
+        return LANDING_TEMPLATE.format(nome=aluno["nome"], matricula=aluno["matricula"])
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(random.expovariate(1 / self.latency))
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path
+        user = self._usuario()
+
+        if path == "/aluno/" and user:
+            return self._send(200, self._landing(user))
+        if path in ("/aluno/", "/aluno/login.action"):
+            return self._send(200, LOGIN_FORM_TEMPLATE, {"Set-Cookie": f"JSESSIONID={secrets.token_hex(8)}; Path=/aluno"})
+
+        if not user:
+            return self._send(302, headers={"Location": "/aluno/login.action"})
+
+        if self.error_rate and random.random() < self.error_rate:
+            return self._send(500, "<h1>Erro interno</h1>")
+
+        catalog = self.catalog
+        body = None
+        if path == "/aluno/aluno/turma.action":
+            body = catalog.render_turma(query.get("turma", ""))
+        elif path == "/aluno/ajax/aluno/matricula/oferta.action":
+            body = catalog.render_oferta(query.get("cursoDisc", ""))
+        elif path == "/aluno/aluno/matricula/oferta.action":
+            body = catalog.render_cursos()
+        elif path == "/aluno/ajax/aluno/quadrohorario/quadrohorario.action":
+            body = catalog.render_quadro_horario(user)
+        elif path == "/aluno/aluno/nota/nota.action":
+            body = catalog.render_notas(user)
+
+        if body is None:
+            return self._send(404, "<h1>Not Found</h1>")
+        self._send(200, body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+        if urlsplit(self.path).path != "/aluno/j_security_check":
+            return self._send(404, "<h1>Not Found</h1>")
+        if not form.get("j_username") or form.get("j_password") == "senha-errada":
+            return self._send(403, "<h1>Acesso negado</h1>")
+        token = secrets.token_hex(16)
+        self.sessions[token] = (time.time(), form["j_username"])
+        self._send(200, self._landing(form["j_username"]), {"Set-Cookie": f"JSESSIONIDSSO={token}; Path=/"})
+
+def start_server(port: int = 0, latency: float = 0.0, error_rate: float = 0.0, cursos: int = 50, turmas: int = 5000, session_ttl: float | None = None, catalog: Catalog | None = None) -> ThreadingHTTPServer:
+    """
+    Inicia o servidor em uma thread daemon e retorna a instância (server.server_address tem a porta usada).
+    `latency` é o atraso médio por requisição (exponencial), em segundos.
+    """
+    handler = type("Handler", (MockPortalHandler,), {
+        "catalog": catalog or Catalog(cursos=cursos, turmas=turmas),
+        "latency": latency,
+        "error_rate": error_rate,
+        "session_ttl": session_ttl,
+        "sessions": {},
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita o Portal do Aluno")
+    parser.add_argument("--port", type=int, default=8765, help="0 = porta livre qualquer")
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso médio por requisição, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500")
+    parser.add_argument("--cursos", type=int, default=50)
+    parser.add_argument("--turmas", type=int, default=5000)
+    parser.add_argument("--session-ttl", type=float, default=None, help="Validade da sessão após o login, em segundos")
+    args = parser.parse_args()
+
+    server = start_server(port=args.port, latency=args.latency, error_rate=args.error_rate, cursos=args.cursos, turmas=args.turmas, session_ttl=args.session_ttl)
+    print(f"Servidor em http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,61 +1,273 @@
+"""
+Ponto de entrada do CEFET Scraper.
+
+Uso:
+    python main.py                 # o mesmo que "all": raspa, transforma e gera a agenda
+    python main.py scrape          # só a raspagem (data/)
+    python main.py transform       # só a transformação, a partir de data/ (ou de um snapshot com --db)
+    python main.py ics             # só a agenda, a partir de data/ (ou de um snapshot com --db)
+
+Os módulos de cada etapa são importados só quando ela roda: transform e ics não carregam
+requests nem bs4 e começam em milissegundos.
+"""
+import argparse
 import os
-from scrap.login import login
-from scrap.get_disciplinas_aprovadas import get_disciplinas_aprovadas
-from scrap.get_turmas_matricula_data import get_turmas_matricula_data
-from scrap.get_turmas_disponiveis_data import get_turmas_disponiveis_data
-from transform.transform_data import run_transformation
-from transform.generate_ics import generate_ics
-
-def main():
+# Só lê variáveis de ambiente: não carrega requests nem bs4
+from scrap.config import PARSE_WORKERS
+from stages import StageScheduler
+
+# Mesmo valor de scrap.snapshot_store.SNAPSHOT_DB_PATH, repetido para não importar o módulo só pelo --help
+SNAPSHOT_DB_PATH = "data/snapshots.db"
+ETAPAS = ("scrape", "transform", "ics")
+
+def _registrar_raspagem(agenda: StageScheduler, replay: str | None, stream: bool, snapshot_db: str | None, profiler, componentes: dict, parse_workers: int = 0, disciplinas: list[str] | None = None) -> tuple[str, ...]:
+    """
+    Registra as etapas 1 a 4 (e a 5, no modo streaming) no agendador. Depois do login, as três
+    raspagens rodam em paralelo, compartilhando a sessão, o registro de turmas e, com
+    `parse_workers`, o pool de processos de parse. Cache, registry, adapter e parse_pool vão
+    para `componentes`, para os resumos e o relatório do profiler (o main fecha o pool).
+    Com `disciplinas`, a etapa 4 roda no modo rápido (só as turmas dessas disciplinas).
+    Retorna os nomes das etapas de raspagem.
+    """
+    from scrap.login import login
+    from scrap.scheduler import SchedulingAdapter
+    from scrap.cache import ResponseCache
+    from scrap.archive import PageArchive, ReplaySession
+    from scrap.turma_registry import TurmaRegistry
+    from scrap.get_disciplinas_aprovadas import get_disciplinas_aprovadas
+    from scrap.get_turmas_matricula_data import get_turmas_matricula_data
+    from scrap.get_turmas_disponiveis_data import get_turmas_disponiveis_data, iter_turmas_disponiveis_data, listar_oferta, salvar_turmas_disponiveis_data, TurmasOferta, MAX_WORKERS, STREAM_SAVE_PATH
+
+    # 1. Login
+    def entrar():
+        cache = adapter = parse_pool = None
+        if parse_workers:
+            from scrap.parse_pool import ParsePool
+            # Os processos sobem enquanto o login acontece
+            parse_pool = ParsePool(parse_workers)
+        if replay:
+            session = ReplaySession(replay)
+            user_data = session.user_data
+            print(f"Reproduzindo execução arquivada {session.run}")
+        else:
+            # Agenda todas as requisições: taxa, concorrência adaptativa, novas tentativas e circuit breaker
+            adapter = SchedulingAdapter()
+            user_data, session = login(adapter=adapter)
+            archive = PageArchive()
+            archive.attach(session)
+            archive.set_user_data(user_data)
+            cache = ResponseCache()
+        if profiler is not None:
+            profiler.anexar(session)
+        # Turmas compartilhadas entre os scrapers: cada uma é buscada uma vez por execução
+        registry = TurmaRegistry(cache=cache, parse_pool=parse_pool)
+        componentes.update(cache=cache, registry=registry, adapter=adapter, parse_pool=parse_pool)
+        return session, user_data["matricula"], registry
+
+    # 2. Raspagem de Disciplinas Aprovadas
+    def disciplinas_aprovadas(login):
+        session, matricula, _ = login
+        print("\n[1/3] Raspando disciplinas aprovadas...")
+        return get_disciplinas_aprovadas(session=session, matricula=matricula)
+
+    # 3. Raspagem de Turmas Matriculadas
+    def turmas_matricula(login):
+        session, matricula, registry = login
+        print("\n[2/3] Raspando turmas matriculadas/solicitadas...")
+        return get_turmas_matricula_data(session=session, matricula=matricula, registry=registry)
+
+    # 4. Raspagem de Turmas Disponíveis
+    def turmas_disponiveis(login):
+        session, matricula, registry = login
+        print("\n[3/3] Raspando turmas disponíveis (isso pode demorar)...")
+        return get_turmas_disponiveis_data(session=session, matricula=matricula, workers=MAX_WORKERS, resume=not replay, registry=registry, parse_pool=registry.parse_pool)
+
+    # 4, modo rápido: a oferta inteira sai das páginas de oferta; os detalhes, só das disciplinas pedidas
+    def turmas_disponiveis_rapido(login):
+        session, matricula, registry = login
+        print(f"\n[3/3] Listando a oferta e buscando as turmas de {', '.join(disciplinas)}...")
+        oferta = listar_oferta(session, matricula, registry.parse_pool)
+        if oferta is None:
+            return None
+        turmas = TurmasOferta(session, oferta, workers=MAX_WORKERS, registry=registry, parse_pool=registry.parse_pool)
+        turma_id_data = turmas.carregar(turmas.da_disciplina(disciplinas))
+        salvar_turmas_disponiveis_data(turma_id_data)
+        return turma_id_data
+
+    # 4 e 5 juntas: cada turma é transformada ao chegar, por isso precisa antes dos dados do aluno
+    def turmas_disponiveis_stream(login, disciplinas_aprovadas, turmas_matricula):
+        from transform.transform_data import run_transformation_stream
+        session, matricula, registry = login
+        print("\n[3/3] Raspando turmas disponíveis e transformando conforme chegam...")
+        # Sem o registry: ele guardaria todas as turmas em memória
+        run_transformation_stream(
+            iter_turmas_disponiveis_data(session=session, matricula=matricula, workers=MAX_WORKERS, cache=componentes["cache"], resume=not replay, parse_pool=registry.parse_pool),
+            turmas_matricula_data=turmas_matricula,
+            disciplinas_aprovadas=disciplinas_aprovadas,
+        )
+
+    agenda.add("login", entrar)
+    agenda.add("disciplinas_aprovadas", disciplinas_aprovadas, ("login",))
+    agenda.add("turmas_matricula", turmas_matricula, ("login",))
+    if stream:
+        agenda.add("turmas_disponiveis_stream", turmas_disponiveis_stream, ("login", "disciplinas_aprovadas", "turmas_matricula"))
+        raspagem = ("disciplinas_aprovadas", "turmas_matricula", "turmas_disponiveis_stream")
+    else:
+        agenda.add("turmas_disponiveis", turmas_disponiveis_rapido if disciplinas else turmas_disponiveis, ("login",))
+        raspagem = ("disciplinas_aprovadas", "turmas_matricula", "turmas_disponiveis")
+
+    if snapshot_db:
+        def snapshot(login, disciplinas_aprovadas, turmas_matricula, **disponiveis):
+            from scrap.snapshot_store import SnapshotStore
+            from transform.transform_data import ler_turmas_jsonl
+            _, matricula, _ = login
+            with SnapshotStore(snapshot_db) as store:
+                store.save_run(
+                    matricula, disciplinas_aprovadas, turmas_matricula,
+                    # No modo streaming as turmas não ficam em memória: são relidas do JSONL
+                    ler_turmas_jsonl(STREAM_SAVE_PATH) if stream else (disponiveis["turmas_disponiveis"] or {}).items(),
+                )
+        agenda.add("snapshot", snapshot, ("login",) + raspagem)
+    return raspagem
+
+def main(replay: str | None = None, stream: bool = False, snapshot_db: str | None = None, profile: str | None = None, etapas: tuple[str, ...] = ETAPAS, snapshot_id: str | None = None, parse_workers: int = 0, disciplinas: list[str] | None = None):
     """
     Função principal que orquestra o fluxo completo de raspagem e transformação de dados.
-    
+
     O fluxo consiste em:
     1. Realizar login no Portal do Aluno.
     2. Raspagem das disciplinas aprovadas (histórico).
     3. Raspagem das turmas em que o aluno está matriculado ou solicitou.
     4. Raspagem de todas as turmas disponíveis para o curso do aluno.
     5. Transformação e consolidação de todos os dados para o formato clean.
+    6. Geração da agenda (.ics).
+
+    As etapas rodam pelo agendador de stages.py: 2, 3 e 4 em paralelo depois do login, a agenda
+    assim que a etapa 3 termina e a transformação quando as três raspagens terminam. No fim,
+    o resumo mostra o caminho crítico.
+
+    `etapas` escolhe o que roda ("scrape" = 1 a 4, "transform" = 5, "ics" = 6). Sem "scrape",
+    a transformação e a agenda leem os arquivos de data/ ou, com `snapshot_db`, o snapshot
+    `snapshot_id` (o mais recente por padrão).
+
+    Todas as páginas baixadas são guardadas em data/archive (ver scrap.archive). Com `replay`,
+    o fluxo roda a partir das páginas arquivadas dessa execução, sem acessar o portal.
+
+    Com `stream`, as etapas 4 e 5 rodam juntas: cada turma disponível é transformada e escrita
+    na saída assim que chega (data/turmas_disponiveis_data.jsonl no lugar do .json), com a
+    memória constante qualquer que seja o tamanho da oferta.
+
+    Com `snapshot_db`, a raspagem também é guardada como um snapshot no banco SQLite
+    (ver scrap.snapshot_store), mantendo o histórico de ocupação entre execuções.
+
+    Com `profile` ("basico", ou "completo" para ligar também cProfile e tracemalloc), a execução
+    é instrumentada (ver scrap.profiler) e o relatório vai para data/profile/.
+
+    Com `parse_workers`, as threads da raspagem só baixam as páginas e o parse roda nesse número
+    de processos (ver scrap.parse_pool).
+
+    Com `disciplinas`, a etapa 4 roda no modo rápido: a oferta é listada só pelas páginas de
+    oferta (data/oferta.json, uma requisição por curso) e os detalhes são buscados apenas para
+    as turmas dessas disciplinas, que formam data/turmas_disponiveis_data.json.
     """
     print("=== Iniciando CEFET Scraper ===")
-    
+
+    profiler = None
+    if profile:
+        from scrap.profiler import Profiler, resumo
+        profiler = Profiler(completo=profile == "completo")
+        profiler.iniciar()
+    agenda = StageScheduler(medir=profiler.etapa if profiler is not None else None)
+    componentes = {}
     try:
-        # 1. Login
-        user_data, session = login()
-        matricula = user_data["matricula"]
-        
         # Garantir que a pasta data existe
         os.makedirs("data", exist_ok=True)
-        
-        # 2. Raspagem de Disciplinas Aprovadas
-        print("\n[1/3] Raspando disciplinas aprovadas...")
-        get_disciplinas_aprovadas(session=session, matricula=matricula)
-        
-        # 3. Raspagem de Turmas Matriculadas
-        print("\n[2/3] Raspando turmas matriculadas/solicitadas...")
-        turmas_matricula_data = get_turmas_matricula_data(session=session, matricula=matricula)
-        
-        # 4. Raspagem de Turmas Disponíveis
-        print("\n[3/3] Raspando turmas disponíveis (isso pode demorar)...")
-        get_turmas_disponiveis_data(session=session, matricula=matricula)
-        
-        print("\n=== Raspagem finalizada com sucesso! ===")
-
-        # 5. Transformação de Dados
-        print("\nIniciando transformação de dados...")
-        run_transformation()
-
-        # 6. Geração de ICS
-        print("\nSalvando agenda...")
-        generate_ics(turmas_data=turmas_matricula_data)
-        
-        
+
+        raspagem = ()
+        if disciplinas and stream:
+            raise ValueError("--disciplinas não combina com --stream")
+        if "scrape" in etapas:
+            raspagem = _registrar_raspagem(agenda, replay, stream, snapshot_db, profiler, componentes, parse_workers, disciplinas)
+
+        # 5. Transformação de Dados (no modo streaming, já feita durante a raspagem)
+        if "transform" in etapas and not ("scrape" in etapas and stream):
+            def transformacao(**_):
+                from transform.transform_data import run_transformation
+                print("\nIniciando transformação de dados...")
+                if raspagem:
+                    run_transformation()
+                else:
+                    run_transformation(snapshot_db=snapshot_db, snapshot_id=snapshot_id)
+            agenda.add("transformacao", transformacao, raspagem)
+
+        # 6. Geração de ICS: só precisa das turmas matriculadas
+        if "ics" in etapas:
+            def ics(turmas_matricula=None):
+                from transform.generate_ics import generate_ics
+                print("\nSalvando agenda...")
+                generate_ics(turmas_data=turmas_matricula, snapshot_db=None if raspagem else snapshot_db, snapshot_id=snapshot_id)
+            agenda.add("ics", ics, ("turmas_matricula",) if raspagem else ())
+
+        try:
+            agenda.run()
+        finally:
+            if componentes.get("parse_pool") is not None:
+                componentes["parse_pool"].close()
+            registry = componentes.get("registry")
+            if registry is not None:
+                print("\n" + registry.summary())
+            if componentes.get("cache") is not None:
+                print(componentes["cache"].summary())
+            if componentes.get("adapter") is not None:
+                print(componentes["adapter"].summary())
+            if componentes.get("parse_pool") is not None:
+                print(componentes["parse_pool"].summary())
+            print(agenda.summary())
+        if raspagem:
+            print("\n=== Raspagem finalizada com sucesso! ===")
+
     except PermissionError:
         print("\nErro: Usuário ou senha inválidos no arquivo .env")
     except ValueError as e:
         print(f"\nErro de configuração: {e}")
     except Exception as e:
         print(f"\nOcorreu um erro inesperado: {e}")
+    finally:
+        if profiler is not None:
+            relatorio = profiler.parar(**componentes)
+            print("\n" + resumo(relatorio))
+            print("Relatório salvo em", profiler.salvar(relatorio))
 
 if __name__ == "__main__":
-    main()
+    # Opções com default SUPPRESS: valem antes ou depois do subcomando ("main.py --stream" ou "main.py all --stream")
+    opcoes_raspagem = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    opcoes_raspagem.add_argument("--replay", metavar="RUN", help="Reprocessa uma execução arquivada em data/archive, sem rede (\"latest\" = a mais recente)")
+    opcoes_raspagem.add_argument("--stream", action="store_true", help="Transforma as turmas disponíveis à medida que são raspadas (memória constante)")
+    opcoes_raspagem.add_argument("--db", nargs="?", const=SNAPSHOT_DB_PATH, metavar="ARQUIVO", help=f"Guarda a execução como snapshot no banco SQLite (padrão: {SNAPSHOT_DB_PATH})")
+    opcoes_raspagem.add_argument("--parse-workers", type=int, metavar="N", help="Faz o parse das páginas em N processos; as threads só baixam (padrão: CEFET_PARSE_WORKERS, 0 = sem processos)")
+    opcoes_raspagem.add_argument("--disciplinas", nargs="+", metavar="NOME", help="Modo rápido: lista a oferta só pelas páginas de oferta e busca os detalhes apenas das turmas destas disciplinas")
+    opcoes_gerais = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    opcoes_gerais.add_argument("--profile", nargs="?", const="basico", choices=["basico", "completo"], help="Grava um relatório de tempos, requisições e memória em data/profile/ (\"completo\" inclui cProfile e tracemalloc)")
+    opcoes_offline = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    opcoes_offline.add_argument("--db", nargs="?", const=SNAPSHOT_DB_PATH, metavar="ARQUIVO", help=f"Lê as turmas de um snapshot do banco SQLite em vez de data/ (padrão: {SNAPSHOT_DB_PATH})")
+    opcoes_offline.add_argument("--snapshot", metavar="ID", help="Snapshot a usar com --db (padrão: o mais recente)")
+
+    parser = argparse.ArgumentParser(description="CEFET Scraper", parents=[opcoes_raspagem, opcoes_gerais])
+    subparsers = parser.add_subparsers(dest="comando", metavar="{all,scrape,transform,ics}")
+    subparsers.add_parser("all", parents=[opcoes_raspagem, opcoes_gerais], help="Raspa, transforma e gera a agenda (padrão)")
+    subparsers.add_parser("scrape", parents=[opcoes_raspagem, opcoes_gerais], help="Só a raspagem (data/)")
+    subparsers.add_parser("transform", parents=[opcoes_offline, opcoes_gerais], help="Só a transformação (output/matricula_data.json)")
+    subparsers.add_parser("ics", parents=[opcoes_offline, opcoes_gerais], help="Só a agenda (output/agenda.ics)")
+    args = parser.parse_args()
+
+    comando = args.comando or "all"
+    main(
+        replay=getattr(args, "replay", None),
+        stream=getattr(args, "stream", False),
+        snapshot_db=getattr(args, "db", None),
+        profile=getattr(args, "profile", None),
+        etapas=ETAPAS if comando == "all" else (comando,),
+        snapshot_id=getattr(args, "snapshot", None),
+        parse_workers=getattr(args, "parse_workers", PARSE_WORKERS),
+        disciplinas=getattr(args, "disciplinas", None),
+    )
@@ -0,0 +1,163 @@
+"""
+Backend assíncrono (asyncio + aiohttp) para as funções de raspagem.
+
+Usa os mesmos parsers das funções síncronas em scrap/*.py; apenas o transporte muda.
+Todas as requisições de turma são disparadas de uma vez no mesmo event loop, e o
+TCPConnector limita quantas conexões ficam abertas por host (as demais aguardam na fila
+do próprio connector, reaproveitando as conexões keep-alive).
+
+Requer o extra opcional `async`:
+    uv sync --extra async    |    pip install aiohttp
+"""
+import asyncio
+import os
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from scrap.login import HEADERS, MAIN_PAGE_URL, LOGIN_URL, _load_credentials, _check_login_status, parse_user_data
+from scrap.get_turma_data import turma_url, parse_turma_page
+from scrap.get_disciplinas_aprovadas import notas_url, parse_disciplinas_aprovadas, salvar_disciplinas_aprovadas
+from scrap.get_turmas_matricula_data import quadro_horario_url, parse_quadro_horario, salvar_turmas_matricula_data
+from scrap.get_cursos_disponiveis_id import matricula_oferta_url, parse_cursos_disponiveis_id, salvar_cursos_disponiveis_id
+from scrap.get_turmas_disponiveis_data import ofertas_url, parse_ofertas, carregar_cursos_salvos, salvar_turmas_disponiveis_data
+
+# Conexões simultâneas por host. As demais requisições ficam na fila do connector.
+LIMIT_PER_HOST = 32
+
+def _check_aiohttp():
+    if aiohttp is None:
+        raise ImportError("O backend assíncrono precisa do aiohttp: uv sync --extra async (ou pip install aiohttp)")
+
+def new_async_session(limit_per_host: int = LIMIT_PER_HOST, cookies: dict[str, str] | None = None) -> "aiohttp.ClientSession":
+    """
+    Cria uma aiohttp.ClientSession com os headers do scraper e limite de conexões por host.
+    Deve ser criada (e fechada) dentro de um event loop em execução.
+    """
+    _check_aiohttp()
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=limit_per_host, keepalive_timeout=30)
+    # unsafe=True aceita cookies de hosts por IP (ex.: servidor local em CEFET_BASE_URL)
+    cookie_jar = aiohttp.CookieJar(unsafe=True)
+    return aiohttp.ClientSession(headers=HEADERS, connector=connector, cookies=cookies, cookie_jar=cookie_jar)
+
+async def _get_text(session: "aiohttp.ClientSession", url: str, allow_redirects: bool = True) -> str:
+    async with session.get(url, allow_redirects=allow_redirects) as response:
+        return await response.text()
+
+async def login_async(limit_per_host: int = LIMIT_PER_HOST) -> tuple[dict[str, str], "aiohttp.ClientSession"]:
+    """
+    Versão assíncrona de scrap.login.login.
+    A sessão retornada deve ser fechada pelo chamador (await session.close()).
+    """
+    print("Logando")
+    user, password = _load_credentials()
+
+    session = new_async_session(limit_per_host=limit_per_host)
+    try:
+        # JSESSIONID
+        await _get_text(session, MAIN_PAGE_URL)
+
+        # JSESSIONIDSSO
+        login_data = {"j_username": user, "j_password": password}
+        async with session.post(LOGIN_URL, data=login_data) as login_response:
+            _check_login_status(login_response.status)
+            user_data = parse_user_data(await login_response.text())
+    except BaseException:
+        await session.close()
+        raise
+
+    print(f"Logado: {user_data['nome']} | {user_data['matricula']}")
+    return (user_data, session)
+
+async def get_turma_data_async(session: "aiohttp.ClientSession", turma_id: str) -> dict[str:str]:
+    """
+    Versão assíncrona de scrap.get_turma_data.get_turma_data.
+    """
+    return parse_turma_page(await _get_text(session, turma_url(turma_id)))
+
+async def get_disciplinas_aprovadas_async(session: "aiohttp.ClientSession", matricula: str) -> list[str]:
+    """
+    Versão assíncrona de scrap.get_disciplinas_aprovadas.get_disciplinas_aprovadas.
+    """
+    aprovados = parse_disciplinas_aprovadas(await _get_text(session, notas_url(matricula)))
+    salvar_disciplinas_aprovadas(aprovados)
+    return aprovados
+
+async def get_turmas_matricula_data_async(session: "aiohttp.ClientSession", matricula: str) -> dict[str:dict[str:str]]:
+    """
+    Versão assíncrona de scrap.get_turmas_matricula_data.get_turmas_matricula_data.
+    """
+    html = await _get_text(session, quadro_horario_url(matricula), allow_redirects=False)
+    turmas = parse_quadro_horario(html)
+
+    turma_datas = await asyncio.gather(*(get_turma_data_async(session, turma_id) for turma_id, _, _ in turmas))
+
+    turma_id_data = {}
+    for (turma_id, turma_disciplina, turma_matricula), turma_data in zip(turmas, turma_datas):
+        print(f"Dados de {turma_disciplina} | {turma_matricula}")
+        turma_data["Matrícula"] = turma_matricula
+        turma_id_data[turma_id] = turma_data
+
+    salvar_turmas_matricula_data(turma_id_data)
+    return turma_id_data
+
+async def _buscar_turma_async(session: "aiohttp.ClientSession", turma_id: str, disciplina_nome: str, periodo: str) -> dict[str:str] | None:
+    try:
+        turma_data = await get_turma_data_async(session, turma_id)
+    except Exception as error:
+        print(f"Erro ao checar turma {turma_id} ({disciplina_nome}): {error}")
+        return None
+    print(f"Dados de {disciplina_nome}")
+    turma_data["Período"] = periodo
+    return turma_data
+
+async def get_turmas_disponiveis_data_async(session: "aiohttp.ClientSession", matricula: str) -> dict[str:dict[str:str]]:
+    """
+    Versão assíncrona de scrap.get_turmas_disponiveis_data.get_turmas_disponiveis_data.
+    Todas as turmas são requisitadas de uma vez; o limite de conexões fica a cargo do connector da sessão.
+    """
+    print ("Checando cursos disponiveis.")
+    try:
+        html = await _get_text(session, matricula_oferta_url(matricula), allow_redirects=False)
+        cursos_disponiveis_id = parse_cursos_disponiveis_id(html)
+        salvar_cursos_disponiveis_id(cursos_disponiveis_id)
+    except Exception as error:
+        print(error)
+        cursos_disponiveis_id = carregar_cursos_salvos()
+        if cursos_disponiveis_id is None:
+            return
+
+    ofertas_pages = await asyncio.gather(*(
+        _get_text(session, ofertas_url(matricula, curso_id), allow_redirects=False)
+        for curso_id in cursos_disponiveis_id
+    ))
+    turmas = [turma for html in ofertas_pages for turma in parse_ofertas(html)]
+
+    turma_datas = await asyncio.gather(*(
+        _buscar_turma_async(session, turma_id, disciplina_nome, periodo)
+        for turma_id, disciplina_nome, periodo in turmas
+    ))
+
+    turma_id_data = {}
+    for (turma_id, _, _), turma_data in zip(turmas, turma_datas):
+        if turma_data is not None:
+            turma_id_data[turma_id] = turma_data
+
+    salvar_turmas_disponiveis_data(turma_id_data)
+    return turma_id_data
+
+async def _main():
+    os.makedirs("data", exist_ok=True)
+    user_data, session = await login_async()
+    async with session:
+        matricula = user_data["matricula"]
+        await asyncio.gather(
+            get_disciplinas_aprovadas_async(session, matricula),
+            get_turmas_matricula_data_async(session, matricula),
+            get_turmas_disponiveis_data_async(session, matricula),
+        )
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,167 @@
+"""
+Arquivo das páginas baixadas do portal, para reprocessar uma execução sem rede.
+
+Cada página é guardada comprimida (gzip) em data/archive/objects/, endereçada pelo sha256
+do conteúdo (páginas iguais são guardadas uma vez só). Cada execução tem um manifesto
+data/archive/runs/<run>.jsonl, com uma linha por página: URL -> sha256, status e redirecionamento.
+
+Uso:
+    python -m scrap.archive          # lista as execuções arquivadas
+    python main.py --replay <run>    # roda o pipeline a partir do arquivo ("latest" = a mais recente)
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+import requests
+from urllib.parse import urlsplit
+
+ARCHIVE_DIR = "data/archive"
+
+def _page_key(url: str) -> str:
+    # Caminho + query: o replay não depende do host usado na execução original (ver CEFET_BASE_URL)
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+def _objects_dir(path: str) -> str:
+    return os.path.join(path, "objects")
+
+def _runs_dir(path: str) -> str:
+    return os.path.join(path, "runs")
+
+def list_runs(path: str = ARCHIVE_DIR) -> list[str]:
+    if not os.path.isdir(_runs_dir(path)):
+        return []
+    return sorted(nome[:-6] for nome in os.listdir(_runs_dir(path)) if nome.endswith(".jsonl"))
+
+class PageArchive:
+    """
+    Grava as páginas de uma execução. Use attach(session) para arquivar todas as respostas da sessão.
+    """
+
+    def __init__(self, path: str = ARCHIVE_DIR, run: str | None = None):
+        self.path = path
+        self.run = run or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+        os.makedirs(_objects_dir(path), exist_ok=True)
+        os.makedirs(_runs_dir(path), exist_ok=True)
+        self.manifest_path = os.path.join(_runs_dir(path), self.run + ".jsonl")
+
+    def _write_object(self, content: bytes) -> str:
+        sha = hashlib.sha256(content).hexdigest()
+        object_path = os.path.join(_objects_dir(self.path), sha[:2], sha + ".html.gz")
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, object_path)
+        return sha
+
+    def _append(self, entry: dict):
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def store(self, url: str, html: str, status: int = 200, location: str | None = None):
+        sha = self._write_object(html.encode("utf-8"))
+        self._append({"url": url, "sha256": sha, "status": status, "location": location})
+
+    def set_user_data(self, user_data: dict[str, str]):
+        self._append({"user_data": user_data})
+
+    def _hook(self, response: requests.Response, *args, **kwargs):
+        # 304: o corpo vem do cache, que registra a página por conta própria (ver store_from_cache)
+        if response.status_code == 304:
+            return
+        self.store(response.request.url, response.text, response.status_code, response.headers.get("Location"))
+
+    def attach(self, session: requests.Session):
+        session.hooks["response"].append(self._hook)
+        session.archive = self
+
+def store_from_cache(session: requests.Session, url: str, html: str):
+    """
+    Registra no arquivo da sessão (se houver) uma página servida pelo cache, sem acesso à rede.
+    """
+    archive = getattr(session, "archive", None)
+    if archive is not None:
+        archive.store(url, html)
+
+class _ReplayResponse:
+    def __init__(self, url: str, status_code: int, content: bytes, location: str | None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode("utf-8")
+        self.headers = {"Location": location} if location else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (arquivado) para {self.url}", response=self)
+
+class ReplaySession:
+    """
+    Substitui a requests.Session respondendo com as páginas arquivadas de uma execução.
+    Nenhuma requisição é feita; uma URL fora do arquivo levanta LookupError.
+    """
+
+    def __init__(self, run: str, path: str = ARCHIVE_DIR):
+        if run == "latest":
+            runs = list_runs(path)
+            if not runs:
+                raise LookupError(f"Nenhuma execução arquivada em {path}")
+            run = runs[-1]
+        manifest_path = os.path.join(_runs_dir(path), run + ".jsonl")
+        if not os.path.exists(manifest_path):
+            raise LookupError(f"Execução {run} não encontrada em {path}")
+
+        self.run = run
+        self.path = path
+        self.headers = {}
+        self.hooks = {"response": []}
+        self.user_data = None
+        self.pages = {}
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    entry = json.loads(linha)
+                except ValueError:
+                    continue
+                if "user_data" in entry:
+                    self.user_data = entry["user_data"]
+                else:
+                    # Se a mesma URL foi baixada mais de uma vez, vale a última
+                    self.pages[_page_key(entry["url"])] = entry
+
+    def _load(self, url: str) -> _ReplayResponse:
+        entry = self.pages.get(_page_key(url))
+        if entry is None:
+            raise LookupError(f"Página não arquivada na execução {self.run}: {url}")
+        sha = entry["sha256"]
+        with gzip.open(os.path.join(_objects_dir(self.path), sha[:2], sha + ".html.gz"), "rb") as f:
+            content = f.read()
+        return _ReplayResponse(url, entry["status"], content, entry.get("location"))
+
+    def get(self, url: str, allow_redirects: bool = True, **kwargs) -> _ReplayResponse:
+        response = self._load(url)
+        while allow_redirects and 300 <= response.status_code < 400 and response.headers.get("Location"):
+            response = self._load(requests.compat.urljoin(response.url, response.headers["Location"]))
+        return response
+
+    def post(self, url: str, **kwargs):
+        raise LookupError("Requisições POST não são reproduzidas no modo replay")
+
+    def mount(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+if __name__ == "__main__":
+    for run in list_runs():
+        with open(os.path.join(_runs_dir(ARCHIVE_DIR), run + ".jsonl"), "r", encoding="utf-8") as f:
+            paginas = sum(1 for linha in f if '"url"' in linha)
+        print(f"{run}  {paginas} páginas")
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import tempfile
+import requests
+from urllib.parse import urlsplit
+from scrap.archive import store_from_cache
+
+CACHE_DIR = "data/cache"
+MAX_BYTES = 256 * 1024 * 1024
+
+# Vagas/solicitações (bloco "Dados Gerais") mudam durante a matrícula e vêm na mesma página que
+# docentes, horários e espaço físico; todas as etapas que leem a página usam as vagas, então a página
+# inteira vence junto com elas. Depois disso a revalidação condicional evita baixá-la de novo se não mudou
+VAGAS_TTL = 15 * 60
+
+# TTL (segundos) por endpoint, identificado pelo último trecho do caminho da URL. None: nunca guardado
+ENDPOINT_TTLS = {
+    "turma.action": VAGAS_TTL,
+    # Oferta, quadro de horários e notas mudam durante a matrícula e são uma página por execução
+    "oferta.action": None,
+    "quadrohorario.action": None,
+    "nota.action": None,
+}
+
+class ResponseCache:
+    """
+    Cache em disco das páginas do portal, indexado pela URL.
+
+    Cada entrada guarda o HTML e os validadores (ETag/Last-Modified) enviados pelo portal.
+    - Entrada mais nova que o TTL: devolvida sem acessar a rede.
+    - Entrada vencida: revalidada com requisição condicional (If-None-Match/If-Modified-Since);
+      um 304 renova a entrada sem baixar a página de novo.
+    - Tamanho total limitado a `max_bytes`; as entradas acessadas há mais tempo são removidas primeiro.
+
+    Só endpoints com TTL em `ttls` são guardados; os demais vão sempre à rede.
+    """
+
+    def __init__(self, path: str = CACHE_DIR, max_bytes: int = MAX_BYTES, ttls: dict[str, int] = ENDPOINT_TTLS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        # chave -> [tamanho em bytes, último acesso]
+        self._index = {}
+        for name in os.listdir(path):
+            if name.endswith(".html"):
+                stat = os.stat(os.path.join(path, name))
+                self._index[name[:-5]] = [stat.st_size, stat.st_mtime]
+        self._total_bytes = sum(size for size, _ in self._index.values())
+
+    def ttl_for(self, url: str) -> int | None:
+        endpoint = urlsplit(url).path.rsplit("/", 1)[-1]
+        return self.ttls.get(endpoint)
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _load(self, key: str) -> tuple[dict, str] | None:
+        try:
+            with open(os.path.join(self.path, key + ".json"), "r") as f:
+                meta = json.load(f)
+            with open(os.path.join(self.path, key + ".html"), "r", encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def _replace(self, path: str, escrever, **kwargs):
+        # Escreve em um temporário próprio e troca, para nunca deixar uma entrada pela metade;
+        # duas threads gravando a mesma URL não compartilham o temporário
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", **kwargs) as f:
+                escrever(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _write(self, key: str, meta: dict, body: str | None = None):
+        if body is not None:
+            self._replace(os.path.join(self.path, key + ".html"), lambda f: f.write(body), encoding="utf-8")
+        self._replace(os.path.join(self.path, key + ".json"), lambda f: json.dump(meta, f))
+
+    def _touch(self, key: str, size: int | None = None):
+        with self._lock:
+            if size is not None:
+                old_size = self._index.get(key, [0, 0])[0]
+                self._total_bytes += size - old_size
+                self._index[key] = [size, time.time()]
+            elif key in self._index:
+                self._index[key][1] = time.time()
+        try:
+            os.utime(os.path.join(self.path, key + ".html"))
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                for ext in (".html", ".json"):
+                    try:
+                        os.remove(os.path.join(self.path, key + ext))
+                    except OSError:
+                        pass
+                del self._index[key]
+                self._total_bytes -= size
+                self.stats["evicted"] += 1
+
+    def get(self, session: requests.Session, url: str, max_age: int | None = None, **kwargs) -> str:
+        """
+        Retorna o HTML da URL, usando o cache quando possível.
+        `max_age` (segundos) reduz o TTL do endpoint para esta chamada.
+        """
+        ttl = self.ttl_for(url)
+        if ttl is None:
+            response = session.get(url, **kwargs)
+            response.raise_for_status()
+            return response.text
+        if max_age is not None:
+            ttl = min(ttl, max_age)
+
+        key = self._key(url)
+        entry = self._load(key)
+        headers = {}
+        if entry is not None:
+            meta, body = entry
+            if time.time() - meta["fetched_at"] < ttl:
+                self._touch(key)
+                with self._lock:
+                    self.stats["hits"] += 1
+                store_from_cache(session, url, body)
+                return body
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            meta["fetched_at"] = time.time()
+            self._write(key, meta)
+            self._touch(key)
+            with self._lock:
+                self.stats["revalidated"] += 1
+            store_from_cache(session, url, body)
+            return body
+
+        with self._lock:
+            self.stats["misses"] += 1
+        # Página de erro (depois das novas tentativas do scrap.scheduler) não vai para o cache nem para o parser
+        response.raise_for_status()
+        if response.status_code == 200:
+            meta = {
+                "url": url,
+                "fetched_at": time.time(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            body = response.text
+            self._write(key, meta, body)
+            self._touch(key, size=len(body.encode("utf-8")))
+            self._evict()
+        return response.text
+
+    def summary(self) -> str:
+        return "Cache: {hits} hits, {revalidated} revalidadas, {misses} misses, {evicted} removidas".format(**self.stats)
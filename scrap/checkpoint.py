@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+from typing import Iterator
+
+class Checkpoint:
+    """
+    Arquivo JSONL onde cada linha é um registro {"id": ..., "data": ...} já concluído.
+    Cada registro é gravado (e enviado ao disco) assim que termina, então uma execução
+    interrompida pode ser retomada a partir dele. Seguro para uso por várias threads.
+
+    A primeira linha é um cabeçalho {"checkpoint": {...contexto, "created_at": ...}} com o
+    `contexto` da execução (ex.: a matrícula). `validar` descarta um checkpoint de outro
+    contexto ou mais velho que `max_age` segundos, para que uma execução interrompida de outra
+    conta ou de dias atrás não se misture com a atual.
+    """
+
+    def __init__(self, path: str, contexto: dict | None = None, max_age: float | None = None):
+        self.path = path
+        self.contexto = contexto or {}
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _cabecalho(self) -> dict | None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.loads(f.readline()).get("checkpoint")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def validar(self) -> bool:
+        """
+        Descarta o checkpoint salvo se ele não for deste contexto ou estiver vencido.
+        Retorna True se há um checkpoint válido para retomar.
+        """
+        if not os.path.exists(self.path):
+            return False
+        cabecalho = self._cabecalho()
+        if cabecalho is None:
+            motivo = "sem cabeçalho"
+        elif any(cabecalho.get(chave) != valor for chave, valor in self.contexto.items()):
+            motivo = "de outra execução (" + ", ".join(f"{chave} {cabecalho.get(chave)}" for chave in self.contexto) + ")"
+        elif self.max_age is not None and time.time() - cabecalho.get("created_at", 0) > self.max_age:
+            motivo = f"criado há mais de {self.max_age / 3600:.0f}h"
+        else:
+            return True
+        print(f"Descartando {self.path}: checkpoint {motivo}")
+        self.clear()
+        return False
+
+    def _reparar(self):
+        """
+        Remove uma última linha incompleta (execução interrompida no meio da escrita), para que
+        os próximos appends comecem em uma linha nova.
+        """
+        with open(self.path, "rb+") as f:
+            fim = f.seek(0, os.SEEK_END)
+            pos = fim
+            # Procura o último "\n" de trás para frente, sem ler o arquivo inteiro
+            while pos > 0:
+                inicio = max(0, pos - 65536)
+                f.seek(inicio)
+                bloco = f.read(pos - inicio)
+                quebra = bloco.rfind(b"\n")
+                if quebra != -1:
+                    pos = inicio + quebra + 1
+                    break
+                pos = inicio
+            if pos != fim:
+                f.truncate(pos)
+
+    def iter(self) -> Iterator[tuple[str, dict]]:
+        """
+        Gera os registros salvos (id, dados) um a um, na ordem em que foram gravados, sem
+        carregar o arquivo inteiro. Uma última linha incompleta é ignorada (e removida).
+        """
+        if not os.path.exists(self.path):
+            return
+        with self._lock:
+            self._reparar()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if "id" in registro:
+                    yield registro["id"], registro["data"]
+
+    def load(self) -> dict[str, dict]:
+        """
+        Retorna os registros salvos (id -> dados).
+        """
+        return dict(self.iter())
+
+    def append(self, id: str, data: dict):
+        linha = json.dumps({"id": id, "data": data}, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                if f.tell() == 0:
+                    f.write(json.dumps({"checkpoint": {**self.contexto, "created_at": time.time()}}) + "\n")
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,13 @@
+import os
+
+# Endereço do Portal do Aluno. Pode ser trocado (ex.: servidor local de testes) pela variável de ambiente CEFET_BASE_URL.
+BASE_URL = os.getenv("CEFET_BASE_URL", "https://alunos.cefet-rj.br").rstrip("/")
+
+# Parser da página da turma: "stream" (extrator rápido), "lxml" (BeautifulSoup + lxml) ou "html.parser" (BeautifulSoup puro)
+PARSER_BACKEND = os.getenv("CEFET_PARSER", "stream")
+
+# Requisições por segundo ao portal (token bucket do scrap.scheduler). 0 = sem limite.
+RATE_LIMIT = float(os.getenv("CEFET_RATE_LIMIT", "30"))
+
+# Processos de parse (scrap.parse_pool): as threads só baixam as páginas e o parse roda nesses processos. 0 = parse nas próprias threads.
+PARSE_WORKERS = int(os.getenv("CEFET_PARSE_WORKERS", "0"))
@@ -1,17 +1,18 @@
 import requests
 from bs4 import BeautifulSoup
 import json
+from scrap.config import BASE_URL
 
-# Só pode ser usado quando a seleção de matérias está aberta
-def get_cursos_disponiveis_id (session: requests.Session, matricula: str) -> list[str]:
+SAVE_PATH = "data/cursos_disponiveis_id.json"
+
+def matricula_oferta_url(matricula: str) -> str:
+    return f"{BASE_URL}/aluno/aluno/matricula/oferta.action?matricula={matricula}"
+
+def parse_cursos_disponiveis_id(html: str) -> list[str]:
     """
-    Retorna o id dos cursos com turmas disponíveis para a matrícula.
-    Usa a página de matrícula (é disponível apenas quando a fase de matrícula está aberta).
+    Faz o parse da página de matrícula (oferta.action) e retorna os ids dos cursos.
     """
-    print ("Checando cursos disponiveis.")
-    matricula_url = "https://alunos.cefet-rj.br/aluno/aluno/matricula/oferta.action?matricula="+ matricula
-    matricula_page = session.get(matricula_url, allow_redirects=False)
-    matricula_soup = BeautifulSoup(matricula_page.text, "html.parser") 
+    matricula_soup = BeautifulSoup(html, "html.parser") 
     cursos_soup = matricula_soup.find(id ="cursos")
 
     if cursos_soup is None:
@@ -20,9 +21,22 @@ def get_cursos_disponiveis_id (session: requests.Session, matricula: str) -> lis
     for curso in cursos_soup.find_all("option"):
         id = curso.get("value")
         curso_id_list.append(id)
+    return curso_id_list
 
-    with open ("data/cursos_disponiveis_id.json","w") as f:
+def salvar_cursos_disponiveis_id(curso_id_list: list[str]):
+    with open (SAVE_PATH,"w") as f:
         json.dump(curso_id_list, f)
+
+# Só pode ser usado quando a seleção de matérias está aberta
+def get_cursos_disponiveis_id (session: requests.Session, matricula: str) -> list[str]:
+    """
+    Retorna o id dos cursos com turmas disponíveis para a matrícula.
+    Usa a página de matrícula (é disponível apenas quando a fase de matrícula está aberta).
+    """
+    print ("Checando cursos disponiveis.")
+    matricula_page = session.get(matricula_oferta_url(matricula), allow_redirects=False)
+    curso_id_list = parse_cursos_disponiveis_id(matricula_page.text)
+    salvar_cursos_disponiveis_id(curso_id_list)
     
     return curso_id_list
 
@@ -31,4 +45,4 @@ if __name__ == "__main__":
     from pprint import pprint
     user_data, session = login()
     curso_id_list = get_cursos_disponiveis_id(session=session, matricula=user_data["matricula"])
-    pprint(curso_id_list)
\ No newline at end of file
+    pprint(curso_id_list)
@@ -1,13 +1,20 @@
 import requests
 from bs4 import BeautifulSoup
 import json
+from scrap.config import BASE_URL
+from scrap.profiler import medir_parse
 
-def get_disciplinas_aprovadas (session: requests.Session, matricula: str):
+SAVE_PATH = "data/disciplinas_aprovadas.json"
+
+def notas_url(matricula: str) -> str:
+    return f"{BASE_URL}/aluno/aluno/nota/nota.action?matricula={matricula}"
+
+@medir_parse("nota")
+def parse_disciplinas_aprovadas(html: str) -> list[str]:
     """
-    Extrai as disciplinas aprovadas do histórico escolar.
+    Faz o parse da página de notas (nota.action) e retorna as disciplinas aprovadas ou isentas.
     """
-    notas_page = session.get(f"https://alunos.cefet-rj.br/aluno/aluno/nota/nota.action?matricula={matricula}")
-    notas_soup = BeautifulSoup(notas_page.text, 'html.parser')
+    notas_soup = BeautifulSoup(html, 'html.parser')
 
     peridos = notas_soup.find_all("table", class_="table-turmas")
 
@@ -23,14 +30,25 @@ def get_disciplinas_aprovadas (session: requests.Session, matricula: str):
 
             if situacao == 'Aprovado' or situacao == 'Isento':
                 aprovados.append(disciplina)
-    
-    with open("data/disciplinas_aprovadas.json", "w") as json_file:
+
+    return aprovados
+
+def salvar_disciplinas_aprovadas(aprovados: list[str], save_path: str = SAVE_PATH):
+    with open(save_path, "w") as json_file:
         json.dump(aprovados, json_file, indent=4)
     print("Disciplinas Aprovadas salvas")
 
+def get_disciplinas_aprovadas (session: requests.Session, matricula: str, save_path: str = SAVE_PATH):
+    """
+    Extrai as disciplinas aprovadas do histórico escolar.
+    """
+    notas_page = session.get(notas_url(matricula))
+    notas_page.raise_for_status()
+    aprovados = parse_disciplinas_aprovadas(notas_page.text)
+    salvar_disciplinas_aprovadas(aprovados, save_path)
     return aprovados
 
 if __name__ == "__main__":
     from scrap.login import login
     user_data, session = login()
-    get_disciplinas_aprovadas(session=session, matricula=user_data["matricula"])
\ No newline at end of file
+    get_disciplinas_aprovadas(session=session, matricula=user_data["matricula"])
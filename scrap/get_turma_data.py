@@ -1,5 +1,12 @@
 import requests
 from bs4 import BeautifulSoup
+from scrap.config import BASE_URL, PARSER_BACKEND
+from scrap.cache import ResponseCache
+from scrap.parse_pool import ParsePool
+from scrap.profiler import medir_parse
+
+def turma_url(turma_id: str) -> str:
+    return f"{BASE_URL}/aluno/aluno/turma.action?turma={turma_id}"
 
 def _parse_table_por_titulo(soup, titulo):
     """
@@ -22,9 +29,24 @@ def _parse_table_por_titulo(soup, titulo):
         dados.append(dict(zip(headers, valores)))
     return dados
 
-def get_turma_data(session: requests.Session, turma_id: str) -> dict[str:str]:
+def baixar_turma_page(session: requests.Session, turma_id: str, cache: ResponseCache | None = None) -> str:
+    """
+    Baixa o HTML da página da turma, sem o parse (ver get_turma_data).
+    """
+    if cache is not None:
+        return cache.get(session, turma_url(turma_id))
+    turma_page = session.get(turma_url(turma_id))
+    turma_page.raise_for_status()
+    return turma_page.text
+
+def get_turma_data(session: requests.Session, turma_id: str, cache: ResponseCache | None = None, parse_pool: ParsePool | None = None) -> dict[str:str]:
     """
     Checa a página da turma e retorna um dicionário.
+
+    Com `cache`, a página é lida do cache em disco; como as vagas vêm na mesma página,
+    uma cópia mais velha que o TTL das vagas (scrap.cache.VAGAS_TTL) é revalidada.
+
+    Com `parse_pool`, o parse roda em um dos processos do pool (ver scrap.parse_pool).
     """
     """
     Exemplo:
@@ -46,12 +68,34 @@ def get_turma_data(session: requests.Session, turma_id: str) -> dict[str:str]:
     'Vagas Ocupadas': '25',
     'Vagas Totais': '40'}
     """
-    turma_url = "https://alunos.cefet-rj.br/aluno/aluno/turma.action?turma="+ turma_id
-    turma_page = session.get(turma_url)
-    turma_soup = BeautifulSoup(turma_page.text, 'html.parser')
+    html = baixar_turma_page(session, turma_id, cache)
+    if parse_pool is not None:
+        return parse_pool.parse("turma", html)
+    return parse_turma_page(html)
+
+@medir_parse("turma")
+def parse_turma_page(html: str, backend: str = PARSER_BACKEND) -> dict[str:str]:
+    """
+    Faz o parse do HTML da página da turma (turma.action).
+
+    backend:
+        - "stream": extrator rápido (scrap.turma_parser); se falhar, refaz com "html.parser"
+        - "lxml": BeautifulSoup com o parser em C do lxml (precisa do lxml instalado)
+        - "html.parser": BeautifulSoup com o parser da stdlib (referência)
+    """
+    if backend == "stream":
+        from scrap.turma_parser import parse_turma_page_stream
+        try:
+            return parse_turma_page_stream(html)
+        except Exception:
+            backend = "html.parser"
+
+    turma_soup = BeautifulSoup(html, backend)
     turma_data = {}
 
     container = turma_soup.find("div", title="Dados Gerais")
+    if container is None:
+        raise ValueError("Página da turma sem \"Dados Gerais\" (erro do portal ou sessão expirada?)")
 
     # Vagas (tabela interna)
     for row in container.select(".tablevagas tr"):
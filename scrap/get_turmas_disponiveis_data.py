@@ -1,55 +1,426 @@
 import requests
 import json
 import os
+import threading
+import time
 from bs4 import BeautifulSoup
-from scrap.get_cursos_disponiveis_id import get_cursos_disponiveis_id
-from scrap.get_turma_data import get_turma_data
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from collections.abc import Mapping
+from typing import Iterator
+from scrap.config import BASE_URL
+from scrap.get_cursos_disponiveis_id import get_cursos_disponiveis_id, SAVE_PATH as CURSOS_DISPONIVEIS_PATH
+from scrap.cache import ResponseCache
+from scrap.checkpoint import Checkpoint
+from scrap.get_turma_data import get_turma_data, baixar_turma_page
+from scrap.parse_pool import ParsePool
+from scrap.turma_registry import TurmaRegistry
+from scrap.turma_model import Turma
+from scrap.profiler import medir_parse
+from scrap.scheduler import CircuitOpenError, BREAKER_COOLDOWN
+from scrap.texto import clean_str
 
 SAVE_PATH = "data/turmas_disponiveis_data.json"
+CHECKPOINT_PATH = "data/turmas_disponiveis_checkpoint.jsonl"
+# Um checkpoint mais velho que isso é descartado: as vagas já mudaram e a sessão já expirou
+CHECKPOINT_MAX_AGE = 12 * 60 * 60
+# Saída do modo streaming (iter_turmas_disponiveis_data)
+STREAM_SAVE_PATH = "data/turmas_disponiveis_data.jsonl"
+# Saída do modo rápido (listar_oferta): só o que vem nas páginas de oferta
+OFERTA_SAVE_PATH = "data/oferta.json"
+MAX_WORKERS = 8
+# Pausas do circuit breaker (ver scrap.scheduler) que uma turma espera antes de desistir
+CIRCUITO_ESPERAS = 3
 
-def get_turmas_disponiveis_data(session: requests.Session, matricula: str) -> dict[str:dict[str:str]]:
+def ofertas_url(matricula: str, curso_id: str) -> str:
+    return f"{BASE_URL}/aluno/ajax/aluno/matricula/oferta.action?matricula={matricula}&cursoDisc={curso_id}&exigeConsistencia=false&agruparPor=periodo"
+
+@medir_parse("oferta")
+def parse_ofertas(html: str) -> list[tuple[str, str, str]]:
     """
-    Extrai os dados das turmas disponíveis para matricula.
-    Retorna um dicionário com o id da turma e seus respectivos dados.
+    Faz o parse da página de oferta de um curso (agrupada por período).
+    Retorna uma lista (na ordem da página) de tuplas (id da turma, nome da disciplina, período).
+    """
+    ofertas_soup = BeautifulSoup(html, 'html.parser')
+
+    turmas = []
+    for periodo_soup in ofertas_soup.find_all(tipoinformacao="periodo"):
+        periodo = periodo_soup.find("a").get_text()[-1]
+
+        for disciplina_soup in periodo_soup.find_all(tipoinformacao="disciplina"):
+            disciplina_content = disciplina_soup.find('li')
+            disciplina_nome = disciplina_content.get('nomedisciplina')
+            turma_id = disciplina_content.get('idturma')
+            turmas.append((turma_id, disciplina_nome, periodo))
+    return turmas
+
+def carregar_cursos_salvos() -> list[str] | None:
+    """
+    Oferece usar os ids de cursos salvos na última execução, quando a página de matrícula está indisponível.
+    """
+    if os.path.exists(CURSOS_DISPONIVEIS_PATH) and input(f"Usar ultimos ids de cursos salvos em {CURSOS_DISPONIVEIS_PATH}? y\\n \n").lower() == "y":
+        with open(CURSOS_DISPONIVEIS_PATH, "r") as f:
+            return json.load(f)
+    return None
+
+def salvar_turmas_disponiveis_data(turma_id_data: dict[str:dict[str:str]]):
+    with open (SAVE_PATH,"w") as f:
+        json.dump(turma_id_data, f, indent= 4)
+    print(f"Dados das turmas salvos em {SAVE_PATH}")
+
+def _listar_turmas(session: requests.Session, matricula: str, cursos_disponiveis_id: list[str], parse_pool: ParsePool | None = None) -> list[tuple[str, str, str]]:
+    """
+    Percorre as páginas de oferta de cada curso.
+    Retorna uma lista (na ordem da página) de tuplas (id da turma, nome da disciplina, período).
+
+    Com `parse_pool`, cada página vai para o parse enquanto a próxima é baixada.
+    """
+    paginas = []
+    for curso_id in cursos_disponiveis_id:
+        ofertas_page = session.get(ofertas_url(matricula, curso_id), allow_redirects=False)
+        ofertas_page.raise_for_status()
+        if parse_pool is not None:
+            paginas.append(parse_pool.submit("oferta", ofertas_page.text))
+        else:
+            paginas.append(parse_ofertas(ofertas_page.text))
+
+    turmas = []
+    for pagina in paginas:
+        turmas.extend(pagina.result() if parse_pool is not None else pagina)
+    return turmas
+
+def _registrar_turma(turma_id: str, turma_data: dict[str:str], periodo: str, checkpoint: Checkpoint | None) -> dict[str:str]:
+    turma_data["Período"] = periodo
+    if checkpoint is not None:
+        checkpoint.append(turma_id, turma_data)
+    return turma_data
+
+def _esperar_circuito(turma_id: str, buscar):
     """
+    Chama `buscar()`. Se o portal estiver em pausa (circuit breaker aberto, ver scrap.scheduler),
+    espera a pausa acabar e tenta de novo, até CIRCUITO_ESPERAS vezes, em vez de perder a turma.
+    """
+    for _ in range(CIRCUITO_ESPERAS):
+        try:
+            return buscar()
+        except CircuitOpenError:
+            print(f"Portal em pausa; turma {turma_id} será tentada de novo em {BREAKER_COOLDOWN:.0f}s")
+            time.sleep(BREAKER_COOLDOWN)
+    return buscar()
+
+def _avisar_faltando(turma_ids: list[str]):
+    if turma_ids:
+        print(f"Atenção: {len(turma_ids)} turmas ficaram fora do resultado por erro: {', '.join(turma_ids)}")
+
+def _buscar_turma(session: requests.Session, turma_id: str, disciplina_nome: str, periodo: str, cache: ResponseCache | None = None, checkpoint: Checkpoint | None = None, registry: TurmaRegistry | None = None) -> dict[str:str] | None:
+    """
+    Busca os dados de uma turma e, se houver checkpoint, grava o resultado nele.
+    Retorna None em caso de erro, para que uma turma com problema não interrompa as demais.
+    """
+    print(f"Checando dados de {disciplina_nome}")
     try:
-        cursos_disponiveis_id = get_cursos_disponiveis_id(session=session, matricula=matricula)
+        if registry is not None:
+            turma_data = _esperar_circuito(turma_id, lambda: registry.get(session, turma_id))
+        else:
+            turma_data = _esperar_circuito(turma_id, lambda: get_turma_data(session= session, turma_id= turma_id, cache= cache))
+    except Exception as error:
+        print(f"Erro ao checar turma {turma_id} ({disciplina_nome}): {error}")
+        return None
+    return _registrar_turma(turma_id, turma_data, periodo, checkpoint)
+
+def _cursos_disponiveis(session: requests.Session, matricula: str) -> list[str] | None:
+    try:
+        return get_cursos_disponiveis_id(session=session, matricula=matricula)
     except Exception as error:
         print(error)
-        cursos_disponiveis_path = "data/cursos_disponiveis_id.json"
-        if os.path.exists(cursos_disponiveis_path) and input(f"Usar ultimos ids de cursos salvos em {cursos_disponiveis_path}? y\\n \n").lower() == "y":
-            with open(cursos_disponiveis_path, "r") as f:
-                cursos_disponiveis_id = json.load(f)
-        else:
-            return
-        
-    turma_id_data = {}
+        return carregar_cursos_salvos()
 
-    for curso_id in cursos_disponiveis_id:
-        ofertas_url = f"https://alunos.cefet-rj.br/aluno/ajax/aluno/matricula/oferta.action?matricula={matricula}&cursoDisc={curso_id}&exigeConsistencia=false&agruparPor=periodo"
-        ofertas_page = session.get(ofertas_url, allow_redirects=False)
+def _preparar_turmas(session: requests.Session, matricula: str, resume: bool, parse_pool: ParsePool | None = None) -> tuple[dict[str, tuple[str, str, str]], Checkpoint, set[str]] | None:
+    """
+    Lista as turmas das páginas de oferta e abre o checkpoint.
+    Retorna (turmas únicas por id, checkpoint, ids já concluídos), ou None se não há cursos.
+    """
+    cursos_disponiveis_id = _cursos_disponiveis(session, matricula)
+    if cursos_disponiveis_id is None:
+        return None
+
+    turmas = _listar_turmas(session=session, matricula=matricula, cursos_disponiveis_id=cursos_disponiveis_id, parse_pool=parse_pool)
+
+    # Turmas de outro semestre não estão em `unicas` e são ignoradas ao retomar
+    checkpoint = Checkpoint(CHECKPOINT_PATH, contexto={"matricula": matricula}, max_age=CHECKPOINT_MAX_AGE)
+    if not resume:
+        checkpoint.clear()
+    concluidas = {turma_id for turma_id, _ in checkpoint.iter()} if checkpoint.validar() else set()
+    if concluidas:
+        print(f"Retomando: {len(concluidas)} turmas já salvas em {CHECKPOINT_PATH}")
+    # Uma turma oferecida em mais de um curso é buscada uma vez só. Como no resultado por id,
+    # ela fica na posição da primeira ocorrência, com o período da última.
+    unicas = {}
+    for turma in turmas:
+        unicas[turma[0]] = turma
+    if len(unicas) < len(turmas):
+        print(f"{len(turmas) - len(unicas)} turmas oferecidas em mais de um curso (buscadas uma vez só)")
+    return unicas, checkpoint, concluidas
 
-        ofertas_soup = BeautifulSoup(ofertas_page.text, 'html.parser')
+def _buscar_pendentes(session: requests.Session, pendentes: list[tuple[str, str, str]], workers: int, cache: ResponseCache | None, checkpoint: Checkpoint, registry: TurmaRegistry | None, parse_pool: ParsePool | None = None) -> Iterator[tuple[str, dict[str:str] | None]]:
+    """
+    Busca as turmas pendentes e gera (id, dados ou None) de cada uma assim que termina.
+    Com workers > 1, no máximo `workers` * 4 buscas ficam na fila, para que um consumidor
+    lento não acumule os resultados em memória.
+    """
+    if parse_pool is not None:
+        yield from _buscar_pendentes_pool(session, pendentes, workers, cache, checkpoint, registry, parse_pool)
+        return
+    if workers <= 1:
+        for turma_id, disciplina_nome, periodo in pendentes:
+            yield turma_id, _buscar_turma(session, turma_id, disciplina_nome, periodo, cache, checkpoint, registry)
+        return
 
-        for periodo_soup in ofertas_soup.find_all(tipoinformacao="periodo"):
-            periodo = periodo_soup.find("a").get_text()[-1]
+    def buscar(turma_id, disciplina_nome, periodo):
+        return turma_id, _buscar_turma(session, turma_id, disciplina_nome, periodo, cache, checkpoint, registry)
 
-            for disciplina_soup in periodo_soup.find_all(tipoinformacao="disciplina"):
-                disciplina_content = disciplina_soup.find('li')
-                disciplina_nome = disciplina_content.get('nomedisciplina')
-                print(f"Checando dados de {disciplina_nome}")
-                turma_id = disciplina_content.get('idturma')
-                turma_data = get_turma_data(session= session, turma_id= turma_id)
-                turma_data["Período"] = periodo
-                turma_id_data[turma_id]= turma_data
+    # As threads compartilham a sessão autenticada (e o pool de conexões dela)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        em_andamento = set()
+        for turma in pendentes:
+            em_andamento.add(executor.submit(buscar, *turma))
+            if len(em_andamento) >= workers * 4:
+                prontas, em_andamento = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for future in prontas:
+                    yield future.result()
+        for future in as_completed(em_andamento):
+            yield future.result()
 
-    with open (SAVE_PATH,"w") as f:
-        json.dump(turma_id_data, f, indent= 4)
-    print(f"Dados das turmas salvos em {SAVE_PATH}")
+def _buscar_pendentes_pool(session: requests.Session, pendentes: list[tuple[str, str, str]], workers: int, cache: ResponseCache | None, checkpoint: Checkpoint, registry: TurmaRegistry | None, parse_pool: ParsePool) -> Iterator[tuple[str, dict[str:str] | None]]:
+    """
+    Versão de _buscar_pendentes com o parse em processos: as `workers` threads só baixam o HTML
+    e o entregam ao `parse_pool`, seguindo para a próxima turma sem esperar o parse. No máximo
+    `workers` * 4 turmas ficam em andamento (baixando ou no parse), e o pool limita as que
+    esperam parse (ver scrap.parse_pool).
+    """
+    def baixar(turma_id, disciplina_nome, periodo) -> Future:
+        # Retorna o Future dos dados da turma: o do parse ou, com registry, o do registro
+        print(f"Checando dados de {disciplina_nome}")
+        future = None
+        if registry is not None:
+            future, dono = registry.reservar(turma_id)
+            if not dono:
+                return future
+        try:
+            html = _esperar_circuito(turma_id, lambda: baixar_turma_page(session, turma_id, registry.cache if registry is not None else cache))
+            parse = parse_pool.submit("turma", html)
+        except Exception as error:
+            if future is not None:
+                registry.concluir(turma_id, future, erro=error)
+            raise
+        if future is not None:
+            registry.acompanhar(turma_id, future, parse)
+            return future
+        return parse
+
+    em_andamento = {}
+    def coletar(prontos):
+        for future in prontos:
+            turma_id, disciplina_nome, periodo = turma = em_andamento.pop(future)
+            try:
+                resultado = future.result()
+            except Exception as error:
+                print(f"Erro ao checar turma {turma_id} ({disciplina_nome}): {error}")
+                yield turma_id, None
+                continue
+            if isinstance(resultado, Future):
+                # Terminou o download: falta o parse
+                em_andamento[resultado] = turma
+                continue
+            # Com registry, o resultado é a Turma compartilhada: o scraper recebe um dicionário novo
+            turma_data = resultado.to_dict() if type(resultado) is Turma else resultado
+            yield turma_id, _registrar_turma(turma_id, turma_data, periodo, checkpoint)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for turma in pendentes:
+            em_andamento[executor.submit(baixar, *turma)] = turma
+            while len(em_andamento) >= workers * 4:
+                prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                yield from coletar(prontos)
+        while em_andamento:
+            prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+            yield from coletar(prontos)
+
+def get_turmas_disponiveis_data(session: requests.Session, matricula: str, workers: int = 1, cache: ResponseCache | None = None, resume: bool = True, registry: TurmaRegistry | None = None, parse_pool: ParsePool | None = None) -> dict[str:dict[str:str]]:
+    """
+    Extrai os dados das turmas disponíveis para matricula.
+    Retorna um dicionário com o id da turma e seus respectivos dados.
+
+    Com workers > 1, as páginas das turmas são buscadas em paralelo (até `workers`
+    requisições simultâneas) usando a mesma sessão. O resultado é o mesmo do modo serial,
+    na mesma ordem.
+
+    Com `cache`, as páginas das turmas são lidas/guardadas no cache em disco (ver scrap.cache).
+
+    Cada turma concluída é gravada em CHECKPOINT_PATH. Se uma execução anterior foi
+    interrompida, as turmas já presentes no checkpoint não são buscadas de novo
+    (resume=False descarta o checkpoint; um checkpoint de outra matrícula ou mais velho
+    que CHECKPOINT_MAX_AGE também). O JSON final é montado a partir do checkpoint,
+    que é removido ao final.
+
+    Com `registry`, as turmas são obtidas pelo registro da execução (ver scrap.turma_registry).
+
+    Com `parse_pool`, as threads só baixam as páginas e o parse roda nos processos do pool
+    (ver scrap.parse_pool).
+    """
+    preparadas = _preparar_turmas(session, matricula, resume, parse_pool)
+    if preparadas is None:
+        return
+    unicas, checkpoint, concluidas = preparadas
+    pendentes = [turma for turma_id, turma in unicas.items() if turma_id not in concluidas]
+
+    for _ in _buscar_pendentes(session, pendentes, workers, cache, checkpoint, registry, parse_pool):
+        pass
+
+    # Monta o resultado a partir do checkpoint, na ordem das páginas de oferta (a mesma do modo serial)
+    concluidas = checkpoint.load()
+    turma_id_data = {}
+    for turma_id in unicas:
+        if turma_id in concluidas:
+            turma_id_data[turma_id] = concluidas[turma_id]
+    _avisar_faltando([turma_id for turma_id in unicas if turma_id not in concluidas])
+
+    salvar_turmas_disponiveis_data(turma_id_data)
+    checkpoint.clear()
 
     return turma_id_data
 
+def iter_turmas_disponiveis_data(session: requests.Session, matricula: str, workers: int = 1, cache: ResponseCache | None = None, resume: bool = True, registry: TurmaRegistry | None = None, save_path: str = STREAM_SAVE_PATH, parse_pool: ParsePool | None = None) -> Iterator[tuple[str, dict[str:str]]]:
+    """
+    Versão em streaming de get_turmas_disponiveis_data: gera (id da turma, dados) de cada turma
+    assim que ela é concluída (na ordem em que terminam, não na das páginas de oferta), sem
+    guardar as turmas em memória. As já concluídas em uma execução interrompida vêm primeiro,
+    lidas do checkpoint.
+
+    Cada registro é anexado ao checkpoint (JSONL) antes de ser gerado; quando todas as turmas
+    terminam, o checkpoint vira `save_path` (um {"id": ..., "data": ...} por linha).
+    """
+    preparadas = _preparar_turmas(session, matricula, resume, parse_pool)
+    if preparadas is None:
+        return
+    unicas, checkpoint, concluidas = preparadas
+
+    for turma_id, turma_data in checkpoint.iter():
+        if turma_id in unicas:
+            yield turma_id, turma_data
+
+    pendentes = [turma for turma_id, turma in unicas.items() if turma_id not in concluidas]
+    faltando = []
+    for turma_id, turma_data in _buscar_pendentes(session, pendentes, workers, cache, checkpoint, registry, parse_pool):
+        if turma_data is not None:
+            yield turma_id, turma_data
+        else:
+            faltando.append(turma_id)
+    _avisar_faltando(faltando)
+
+    if os.path.exists(CHECKPOINT_PATH):
+        os.replace(CHECKPOINT_PATH, save_path)
+        print(f"Dados das turmas salvos em {save_path}")
+
+def listar_oferta(session: requests.Session, matricula: str, parse_pool: ParsePool | None = None, save_path: str | None = OFERTA_SAVE_PATH) -> dict[str:dict[str:str]] | None:
+    """
+    Modo rápido: lista as turmas disponíveis só pelas páginas de oferta, com uma requisição por
+    curso em vez de uma por turma.
+    Retorna {id da turma: {"Disciplina": nome, "Período": período}}, na ordem das páginas de oferta
+    (uma turma oferecida em mais de um curso fica na primeira posição, com o período da última,
+    como em get_turmas_disponiveis_data), e salva em `save_path`. Retorna None se não há cursos.
+    """
+    cursos_disponiveis_id = _cursos_disponiveis(session, matricula)
+    if cursos_disponiveis_id is None:
+        return None
+    oferta = {}
+    for turma_id, disciplina_nome, periodo in _listar_turmas(session, matricula, cursos_disponiveis_id, parse_pool):
+        oferta[turma_id] = {"Disciplina": disciplina_nome, "Período": periodo}
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump(oferta, f, indent=4)
+        print(f"{len(oferta)} turmas de {len(cursos_disponiveis_id)} cursos salvas em {save_path}")
+    return oferta
+
+class TurmasOferta(Mapping):
+    """
+    Turmas disponíveis com os detalhes carregados sob demanda.
+
+    A lista vem de listar_oferta (uma requisição por curso). Horários, docentes e vagas de uma
+    turma só são buscados no primeiro acesso (`turmas[id]`), ou em paralelo para um subconjunto
+    com `carregar(ids)`; depois ficam guardados. `oferta[id]` tem o que já se sabe sem buscar
+    (disciplina e período).
+
+    Iterar ou usar len/in não busca nada; `items()` e `values()` buscam turma a turma, então
+    chame `carregar()` antes para buscar todas em paralelo.
+    """
+
+    def __init__(self, session: requests.Session, oferta: dict[str:dict[str:str]], workers: int = MAX_WORKERS, cache: ResponseCache | None = None, registry: TurmaRegistry | None = None, parse_pool: ParsePool | None = None):
+        self.session = session
+        self.oferta = oferta
+        self.workers = workers
+        self.cache = cache
+        self.registry = registry
+        self.parse_pool = parse_pool
+        self._lock = threading.Lock()
+        self._carregadas: dict[str, dict] = {}
+
+    def __getitem__(self, turma_id: str) -> dict[str:str]:
+        turma_data = self._carregadas.get(turma_id)
+        if turma_data is not None:
+            return turma_data
+        resumo = self.oferta[turma_id]
+        if self.registry is not None:
+            turma_data = self.registry.get(self.session, turma_id)
+        else:
+            turma_data = get_turma_data(session=self.session, turma_id=turma_id, cache=self.cache, parse_pool=self.parse_pool)
+        turma_data = _registrar_turma(turma_id, turma_data, resumo["Período"], None)
+        with self._lock:
+            return self._carregadas.setdefault(turma_id, turma_data)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.oferta)
+
+    def __len__(self) -> int:
+        return len(self.oferta)
+
+    def carregar(self, turma_ids: list[str] | None = None) -> dict[str:dict[str:str]]:
+        """
+        Busca em paralelo as turmas `turma_ids` (todas, por padrão) que ainda não foram carregadas.
+        Retorna {id: dados} das que estão carregadas, na ordem de `turma_ids`; uma turma que falhou
+        fica de fora (e pode ser tentada de novo).
+        """
+        turma_ids = list(self.oferta) if turma_ids is None else [turma_id for turma_id in turma_ids if turma_id in self.oferta]
+        pendentes = [
+            (turma_id, self.oferta[turma_id]["Disciplina"], self.oferta[turma_id]["Período"])
+            for turma_id in turma_ids if turma_id not in self._carregadas
+        ]
+        for turma_id, turma_data in _buscar_pendentes(self.session, pendentes, self.workers, self.cache, None, self.registry, self.parse_pool):
+            if turma_data is not None:
+                with self._lock:
+                    self._carregadas.setdefault(turma_id, turma_data)
+        return {turma_id: self._carregadas[turma_id] for turma_id in turma_ids if turma_id in self._carregadas}
+
+    def da_disciplina(self, nomes: list[str]) -> list[str]:
+        """
+        Ids das turmas das disciplinas `nomes` (comparadas com clean_str), na ordem da oferta.
+        """
+        procuradas = {clean_str(nome) for nome in nomes}
+        return [turma_id for turma_id, resumo in self.oferta.items() if clean_str(resumo["Disciplina"]) in procuradas]
+
 if __name__ == "__main__":
+    import argparse
     from scrap.login import login
+
+    parser = argparse.ArgumentParser(description="Raspa as turmas disponíveis para matrícula")
+    parser.add_argument("--listar", action="store_true", help=f"Modo rápido: só as páginas de oferta, salvas em {OFERTA_SAVE_PATH}")
+    parser.add_argument("--disciplinas", nargs="+", metavar="NOME", help="Modo rápido: busca os detalhes só das turmas destas disciplinas")
+    args = parser.parse_args()
+
     user_data, session = login()
-    get_turmas_disponiveis_data(session=session, matricula=user_data["matricula"])
\ No newline at end of file
+    if args.listar or args.disciplinas:
+        oferta = listar_oferta(session, user_data["matricula"])
+        if oferta is not None and args.disciplinas:
+            turmas = TurmasOferta(session, oferta, cache=ResponseCache())
+            salvar_turmas_disponiveis_data(turmas.carregar(turmas.da_disciplina(args.disciplinas)))
+    else:
+        get_turmas_disponiveis_data(session=session, matricula=user_data["matricula"], workers=MAX_WORKERS, cache=ResponseCache())
@@ -1,35 +1,60 @@
 import requests
 import json
 from bs4 import BeautifulSoup
+from scrap.config import BASE_URL
+from scrap.cache import ResponseCache
 from scrap.get_turma_data import get_turma_data
+from scrap.turma_registry import TurmaRegistry
+from scrap.profiler import medir_parse
 
 SAVE_PATH = "data/turmas_matricula_data.json"
 
-def get_turmas_matricula_data(session: requests.Session, matricula: str) -> dict[str:dict[str:str]]:
+def quadro_horario_url(matricula: str) -> str:
+    return f"{BASE_URL}/aluno/ajax/aluno/quadrohorario/quadrohorario.action?matricula={matricula}"
+
+@medir_parse("quadrohorario")
+def parse_quadro_horario(html: str) -> list[tuple[str, str, str]]:
     """
-    Extrai os dados das turmas matriculadas (Solicitada | Aceita/Matriculada) através do quadro de horários.
-    Retorna um dicionário com o id da turma e seus respectivos dados.
+    Faz o parse do quadro de horários (quadrohorario.action).
+    Retorna uma lista de tuplas (id da turma, disciplina, situação da matrícula).
     """
-    quadro_horario_url = "https://alunos.cefet-rj.br/aluno/ajax/aluno/quadrohorario/quadrohorario.action?matricula="+ matricula
-    quadro_horario_page = session.get(quadro_horario_url, allow_redirects=False)
-    quadro_horario_soup = BeautifulSoup(quadro_horario_page.text, "html.parser") 
-
-    turma_soup_list = quadro_horario_soup.find_all(class_="turmaqh")
+    quadro_horario_soup = BeautifulSoup(html, "html.parser") 
 
-    turma_id_data= {}
-    for turma in turma_soup_list:
+    turmas = []
+    for turma in quadro_horario_soup.find_all(class_="turmaqh"):
         turma_disciplina = turma.get_text(strip=True).split("T.")[0]
         turma_id = turma.find("a").get("href").split("turma=")[1]
         turma_matricula = turma.find("img").get("title")
+        turmas.append((turma_id, turma_disciplina, turma_matricula))
+    return turmas
+
+def salvar_turmas_matricula_data(turma_id_data: dict[str:dict[str:str]], save_path: str = SAVE_PATH):
+    with open (save_path,"w") as f:
+        json.dump(turma_id_data, f, indent= 4)
+    print(f"Dados das turmas salvos em {save_path}")
+
+def get_turmas_matricula_data(session: requests.Session, matricula: str, cache: ResponseCache | None = None, registry: TurmaRegistry | None = None, save_path: str = SAVE_PATH) -> dict[str:dict[str:str]]:
+    """
+    Extrai os dados das turmas matriculadas (Solicitada | Aceita/Matriculada) através do quadro de horários.
+    Retorna um dicionário com o id da turma e seus respectivos dados.
+
+    Com `registry`, as turmas são obtidas pelo registro da execução (ver scrap.turma_registry).
+    """
+    quadro_horario_page = session.get(quadro_horario_url(matricula), allow_redirects=False)
+    quadro_horario_page.raise_for_status()
+
+    turma_id_data= {}
+    for turma_id, turma_disciplina, turma_matricula in parse_quadro_horario(quadro_horario_page.text):
         print(f"Checando dados de {turma_disciplina} | {turma_matricula}")
-        turma_data = get_turma_data(session= session, turma_id=turma_id)
+        if registry is not None:
+            turma_data = registry.get(session, turma_id)
+        else:
+            turma_data = get_turma_data(session= session, turma_id=turma_id, cache=cache)
         turma_data["Matrícula"] = turma_matricula
         
         turma_id_data[turma_id] = turma_data
 
-    with open (SAVE_PATH,"w") as f:
-        json.dump(turma_id_data, f, indent= 4)
-    print(f"Dados das turmas salvos em {SAVE_PATH}")
+    salvar_turmas_matricula_data(turma_id_data, save_path)
 
     return turma_id_data
 
@@ -38,4 +63,4 @@ if __name__ == "__main__":
     # from pprint import pprint
     user_data, session = login()
     turma_id_data = get_turmas_matricula_data(session=session, matricula=user_data["matricula"])
-    # pprint(turma_id_data)
\ No newline at end of file
+    # pprint(turma_id_data)
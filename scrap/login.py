@@ -1,26 +1,27 @@
 import requests
 import os
+import threading
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from scrap.config import BASE_URL
+from scrap.scheduler import SchedulingAdapter
+from scrap.session_store import SessionStore, restore_cookies
 
-def login() -> tuple[dict[str, str], requests.Session]:
-    """
-    Cria uma nova sessão autenticada utilizando as credenciais definidas no arquivo .env.
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:141.0) Gecko/20100101 Firefox/141.0",
+    "Accept": "text/html",
+    "Accept-Language": "pt-BR",
+    "Referer": "https://cpa.cefet-rj.br/", # Evita Avaliação CPA 
+}
 
-    Realiza o login no portal do aluno do CEFET-RJ, obtendo os cookies de autenticação
-    e extraindo os dados básicos do usuário logado.
+MAIN_PAGE_URL = f"{BASE_URL}/aluno/"
+LOGIN_URL = f"{BASE_URL}/aluno/j_security_check"
 
-    Variáveis de ambiente necessárias:
-        - user
-        - password
-
-    :return: Tupla contendo:
-        - user_data: Dicionário com as chaves "nome" e "matricula"
-        - session: Instância de requests.Session autenticada
-    :rtype: tuple[dict[str, str], requests.Session]
+def _load_credentials() -> tuple[str, str]:
+    """
+    Lê usuário e senha do arquivo .env.
     """
-    print("Logando")
-    
     load_dotenv()
     user = os.getenv('user')
     password = os.getenv('password')
@@ -28,36 +29,164 @@ def login() -> tuple[dict[str, str], requests.Session]:
     if not user or not password:
         raise ValueError("Salve usuario e senha no .env")
 
+    return user, password
+
+def _check_login_status(status_code: int):
+    """
+    Converte o status HTTP da resposta do j_security_check em exceção.
+    """
+    if status_code == 403:
+        raise PermissionError("Usuário ou senha inválidos")
+    elif status_code != 200:
+        raise RuntimeError(
+            f"Erro HTTP no login: {status_code}"
+        )
+
+def parse_user_data(html: str) -> dict[str, str]:
+    """
+    Extrai nome e matrícula da página inicial do aluno logado.
+    """
+    login_soup = BeautifulSoup(html, 'html.parser')
+    nome = login_soup.find(id = "menu").find('button').text
+    matricula = login_soup.find(id='matricula')['value']
+    return {"nome": nome, "matricula": matricula}
+
+def new_session(adapter: HTTPAdapter | None = None) -> requests.Session:
+    """
+    Cria uma sessão (ainda não autenticada) com os headers e o agendador de requisições do scraper
+    (ver scrap.scheduler). Com `adapter`, a sessão usa esse adapter (e o pool de conexões e os
+    limites dele) em vez de um próprio.
+    """
     session = requests.session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:141.0) Gecko/20100101 Firefox/141.0",
-        "Accept": "text/html",
-        "Accept-Language": "pt-BR",
-        "Referer": "https://cpa.cefet-rj.br/", # Evita Avaliação CPA 
-    })
+    adapter = adapter or SchedulingAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
 
+def is_login_page(response: requests.Response) -> bool:
+    """
+    Indica se o portal respondeu com a tela de login (sessão expirada ou inexistente):
+    redirecionamento para o login ou página com o formulário do j_security_check.
+    """
+    if response.is_redirect and "login" in response.headers.get("Location", "").lower():
+        return True
+    return b"j_security_check" in response.content
+
+def _authenticate(session: requests.Session, user: str, password: str) -> dict[str, str]:
+    """
+    Faz o login na sessão e retorna os dados do usuário.
+    """
     # Pega o cookie de acesso - JSESSIONID
-    main_page_url = "https://alunos.cefet-rj.br/aluno/"
-    session.get(main_page_url)
+    session.get(MAIN_PAGE_URL)
 
     # Pega cookie de autentificação - JSESSIONIDSSO
-    login_url = "https://alunos.cefet-rj.br/aluno/j_security_check"
     login_data = {"j_username": user, "j_password": password}
-    login_response = session.post(login_url, data=login_data)
+    login_response = session.post(LOGIN_URL, data=login_data)
 
-    if login_response.status_code == 403:
-        raise PermissionError("Usuário ou senha inválidos")
-    elif login_response.status_code != 200:
-        raise RuntimeError(
-            f"Erro HTTP no login: {login_response.status_code}"
-        )
+    _check_login_status(login_response.status_code)
 
-    login_soup = BeautifulSoup(login_response.text, 'html.parser')
-    nome = login_soup.find(id = "menu").find('button').text
-    matricula = login_soup.find(id='matricula')['value']
+    return parse_user_data(login_response.text)
+
+def _restore_session(store: SessionStore, user: str, adapter: HTTPAdapter | None = None) -> tuple[dict[str, str], requests.Session] | None:
+    """
+    Recupera a sessão salva do usuário, se ela ainda for aceita pelo portal.
+    """
+    saved = store.load(user)
+    if saved is None:
+        return None
+    user_data, cookies = saved
+
+    session = new_session(adapter)
+    restore_cookies(session, cookies)
+    response = session.get(MAIN_PAGE_URL, allow_redirects=False)
+    if is_login_page(response):
+        return None
+    try:
+        user_data = parse_user_data(response.text)
+    except (AttributeError, TypeError, KeyError):
+        return None
+    return user_data, session
+
+def _attach_relogin(session: requests.Session, store: SessionStore, user: str, password: str):
+    """
+    Refaz o login de forma transparente quando uma resposta indicar que a sessão expirou,
+    repetindo a requisição original com os novos cookies e os mesmos argumentos de envio
+    (allow_redirects, timeout, stream...).
+    """
+    lock = threading.Lock()
+    login_urls = (MAIN_PAGE_URL, LOGIN_URL)
+    enviar = session.send
+
+    def send(request: requests.PreparedRequest, **kwargs):
+        # O hook não recebe allow_redirects; guarda os argumentos do envio para repetir a requisição igual
+        request.send_kwargs = kwargs
+        return enviar(request, **kwargs)
+
+    session.send = send
+
+    def relogin_hook(response: requests.Response, *args, **kwargs):
+        request = response.request
+        if request.url in login_urls or getattr(request, "relogin", False) or not is_login_page(response):
+            return response
+
+        sso_enviado = request.headers.get("Cookie", "")
+        with lock:
+            # Outra thread pode já ter refeito o login enquanto esta esperava
+            sso_atual = session.cookies.get("JSESSIONIDSSO")
+            if not sso_atual or f"JSESSIONIDSSO={sso_atual}" in sso_enviado:
+                print("Sessão expirada, logando novamente")
+                user_data = _authenticate(session, user, password)
+                store.save(user, user_data, session)
+
+        retry = request.copy()
+        retry.headers.pop("Cookie", None)
+        retry.prepare_cookies(session.cookies)
+        retry.relogin = True
+        return session.send(retry, **getattr(request, "send_kwargs", kwargs))
+
+    session.hooks["response"].append(relogin_hook)
+
+def login(reuse: bool = True, user: str | None = None, password: str | None = None, adapter: HTTPAdapter | None = None) -> tuple[dict[str, str], requests.Session]:
+    """
+    Cria uma nova sessão autenticada utilizando as credenciais definidas no arquivo .env
+    (ou as passadas em `user`/`password`).
+
+    Realiza o login no portal do aluno do CEFET-RJ, obtendo os cookies de autenticação
+    e extraindo os dados básicos do usuário logado.
+
+    Com `reuse`, tenta antes a sessão salva em data/session.json (ver scrap.session_store);
+    só faz o login se ela não existir ou tiver expirado. Se a sessão expirar durante a
+    execução, o login é refeito automaticamente.
+
+    `adapter` permite compartilhar o pool de conexões entre sessões (ver SchedulingAdapter).
+
+    Variáveis de ambiente necessárias (se `user`/`password` não forem passados):
+        - user
+        - password
+
+    :return: Tupla contendo:
+        - user_data: Dicionário com as chaves "nome" e "matricula"
+        - session: Instância de requests.Session autenticada
+    :rtype: tuple[dict[str, str], requests.Session]
+    """
+    print("Logando")
+    
+    if not user or not password:
+        user, password = _load_credentials()
+    store = SessionStore()
+
+    restored = _restore_session(store, user, adapter) if reuse else None
+    if restored is not None:
+        user_data, session = restored
+        print("Usando sessão salva")
+    else:
+        session = new_session(adapter)
+        user_data = _authenticate(session, user, password)
+        store.save(user, user_data, session)
 
-    print(f"Logado: {nome} | {matricula}")
+    _attach_relogin(session, store, user, password)
 
-    user_data = {"nome": nome, "matricula": matricula}
+    print(f"Logado: {user_data['nome']} | {user_data['matricula']}")
 
-    return (user_data, session)
\ No newline at end of file
+    return (user_data, session)
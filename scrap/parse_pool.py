@@ -0,0 +1,103 @@
+"""
+Pool de processos para o parse das páginas (main.py --parse-workers).
+
+Com a busca em paralelo, o parse (BeautifulSoup ou o extrator do scrap.turma_parser) vira o gargalo:
+é trabalho de CPU e as threads de raspagem disputam o GIL. Com um ParsePool, as threads só baixam
+o HTML e o entregam a processos de parse, que devolvem os dicionários prontos; cada thread segue
+para a próxima página sem esperar o parse.
+
+Contrapressão: no máximo `max_pendentes` páginas ficam esperando parse. Uma thread que baixou
+uma página a mais espera uma vaga antes de entregá-la, então a rede não corre na frente dos
+processos acumulando HTML em memória.
+
+Os processos são iniciados com "spawn" (não herdam as threads e a sessão do processo principal)
+e leem as mesmas variáveis de ambiente, como CEFET_PARSER.
+"""
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from scrap import profiler
+from scrap.config import PARSE_WORKERS
+
+# Parsers disponíveis nos processos, por tipo de página (os mesmos nomes do scrap.profiler).
+# O quadro de horários é uma página por execução e continua sendo lido no processo principal
+PARSERS = {
+    "turma": "scrap.get_turma_data:parse_turma_page",
+    "oferta": "scrap.get_turmas_disponiveis_data:parse_ofertas",
+}
+
+def _parse(tipo: str, html: str) -> tuple[object, float]:
+    """
+    Roda no processo de parse. Retorna (resultado, segundos de parse), para o profiler do processo principal.
+    """
+    modulo, funcao = PARSERS[tipo].split(":")
+    parser = getattr(importlib.import_module(modulo), funcao)
+    inicio = time.perf_counter()
+    return parser(html), time.perf_counter() - inicio
+
+class ParsePool:
+    """
+    Processos de parse compartilhados pelos scrapers de uma execução.
+    Use `submit` para entregar uma página sem esperar o resultado, ou `parse` para esperar.
+    """
+
+    def __init__(self, workers: int | None = None, max_pendentes: int | None = None):
+        self.workers = workers or PARSE_WORKERS or os.cpu_count() or 1
+        self.max_pendentes = max_pendentes or self.workers * 4
+        self.stats = {"paginas": 0, "esperas": 0, "espera_ms": 0}
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(self.max_pendentes)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, tipo: str, html: str) -> Future:
+        """
+        Entrega `html` para o parse e retorna um Future com o resultado.
+        Bloqueia enquanto houver `max_pendentes` páginas esperando parse.
+        """
+        if not self._vagas.acquire(blocking=False):
+            inicio = time.perf_counter()
+            self._vagas.acquire()
+            with self._lock:
+                self.stats["esperas"] += 1
+                self.stats["espera_ms"] += round((time.perf_counter() - inicio) * 1000)
+        try:
+            parse = self._executor.submit(_parse, tipo, html)
+        except BaseException:
+            self._vagas.release()
+            raise
+
+        resultado = Future()
+        def concluir(parse: Future):
+            self._vagas.release()
+            erro = parse.exception()
+            if erro is not None:
+                resultado.set_exception(erro)
+                return
+            dados, segundos = parse.result()
+            with self._lock:
+                self.stats["paginas"] += 1
+            profiler.registrar_parse(tipo, segundos)
+            resultado.set_result(dados)
+        parse.add_done_callback(concluir)
+        return resultado
+
+    def parse(self, tipo: str, html: str):
+        return self.submit(tipo, html).result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self) -> str:
+        return (
+            f"Parse: {self.stats['paginas']} páginas em {self.workers} processos, "
+            f"{self.stats['esperas']} esperas por vaga ({self.stats['espera_ms'] / 1000:.2f}s)"
+        )
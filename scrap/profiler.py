@@ -0,0 +1,273 @@
+"""
+Instrumentação de uma execução (main.py --profile).
+
+Mede, sem mudar o fluxo:
+- cada requisição (por endpoint: quantidade, latência p50/p95/máxima, bytes, status);
+- o tempo de parse por tipo de página (turma, oferta, nota, quadrohorario, vagas);
+- o tempo de cada etapa do main.main;
+- os contadores do cache, do registro de turmas e do agendador;
+- o pico de memória (RSS do processo e, no modo completo, do heap Python via tracemalloc).
+
+No modo "completo", cProfile e tracemalloc ficam ligados durante toda a execução. Em Python 3.12+
+o cProfile também enxerga as threads de raspagem; em versões anteriores, só a thread principal.
+Os dois deixam a execução algumas vezes mais lenta: use os tempos do modo "basico" como referência.
+
+Sem um Profiler ativo, `etapa` e `medir_parse` não fazem nada além de checar uma variável.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+from urllib.parse import urlsplit
+import requests
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_DIR = "data/profile"
+# Funções do cProfile e linhas do tracemalloc incluídas no relatório
+TOP_FUNCOES = 25
+TOP_ALOCACOES = 10
+
+_atual: "Profiler | None" = None
+
+def medir_parse(tipo: str):
+    """
+    Decorador para funções de parse: soma o tempo de cada chamada em `tipo` no Profiler ativo.
+    """
+    def decorador(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _atual
+            if profiler is None:
+                return func(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.registrar_parse(tipo, time.perf_counter() - inicio)
+        return wrapper
+    return decorador
+
+def registrar_parse(tipo: str, segundos: float):
+    """
+    Soma um parse feito fora deste processo (scrap.parse_pool) no Profiler ativo.
+    """
+    profiler = _atual
+    if profiler is not None:
+        profiler.registrar_parse(tipo, segundos)
+
+def etapa(nome: str):
+    """
+    Mede um bloco como uma etapa da execução, se houver Profiler ativo.
+    """
+    return _atual.etapa(nome) if _atual is not None else nullcontext()
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))] if ordenados else 0.0
+
+def _pico_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class Profiler:
+    """
+    Coleta as medidas de uma execução. Use `iniciar()`, `anexar(session)` e, no fim, `parar(...)`.
+    """
+
+    def __init__(self, completo: bool = False, path: str = PROFILE_DIR):
+        self.completo = completo
+        self.path = path
+        self._lock = threading.Lock()
+        self._requisicoes: dict[str, dict] = {}
+        self._parse: dict[str, list[float]] = {}
+        self._etapas: list[dict] = []
+        self._cprofile: cProfile.Profile | None = None
+        # Etapas em andamento (as do main.main rodam em paralelo) e o maior pico de heap já visto
+        self._ativas: list[dict] = []
+        self._pico_heap = 0
+
+    def iniciar(self):
+        global _atual
+        _atual = self
+        self.inicio = datetime.now()
+        self._inicio = time.perf_counter()
+        if self.completo:
+            tracemalloc.start()
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def anexar(self, session: requests.Session):
+        """
+        Mede as respostas da sessão (hook de resposta do requests).
+        """
+        hooks = getattr(session, "hooks", None)
+        if hooks is not None:
+            hooks["response"].append(self._hook)
+
+    def _hook(self, response: requests.Response, *args, **kwargs):
+        endpoint = urlsplit(response.url).path.rsplit("/", 1)[-1] or "/"
+        segundos = response.elapsed.total_seconds()
+        tamanho = len(response.content)
+        with self._lock:
+            medidas = self._requisicoes.setdefault(endpoint, {"latencias": [], "bytes": 0, "status": {}})
+            medidas["latencias"].append(segundos)
+            medidas["bytes"] += tamanho
+            medidas["status"][response.status_code] = medidas["status"].get(response.status_code, 0) + 1
+
+    def registrar_parse(self, tipo: str, segundos: float):
+        with self._lock:
+            self._parse.setdefault(tipo, []).append(segundos)
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """
+        Mede uma etapa. No modo completo, o pico do heap da etapa só é medido se ela rodou sozinha:
+        o pico do tracemalloc é um só para o processo, e zerá-lo no início de uma etapa apagaria o
+        das que estão em andamento. Etapas que rodaram junto com outras ficam marcadas "em_paralelo"
+        e entram só no pico da execução inteira.
+        """
+        medida = {"etapa": nome}
+        with self._lock:
+            if self.completo:
+                self._pico_heap = max(self._pico_heap, tracemalloc.get_traced_memory()[1])
+                if not self._ativas:
+                    tracemalloc.reset_peak()
+            for outra in self._ativas:
+                outra["em_paralelo"] = True
+            if self._ativas:
+                medida["em_paralelo"] = True
+            self._ativas.append(medida)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            medida["segundos"] = round(time.perf_counter() - inicio, 4)
+            with self._lock:
+                self._ativas.remove(medida)
+                if self.completo:
+                    pico = tracemalloc.get_traced_memory()[1]
+                    self._pico_heap = max(self._pico_heap, pico)
+                    if not medida.get("em_paralelo"):
+                        medida["pico_heap_mb"] = round(pico / 2**20, 2)
+                self._etapas.append(medida)
+
+    def parar(self, **componentes) -> dict:
+        """
+        Encerra a coleta e monta o relatório. `componentes` são objetos com `.stats`
+        (ex.: cache=ResponseCache, registry=TurmaRegistry, adapter=SchedulingAdapter); None é ignorado.
+        """
+        global _atual
+        if _atual is self:
+            _atual = None
+        total = time.perf_counter() - self._inicio
+
+        relatorio = {
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "segundos": round(total, 3),
+            "etapas": self._etapas,
+            "requisicoes": {
+                endpoint: {
+                    "quantidade": len(m["latencias"]),
+                    "bytes": m["bytes"],
+                    "latencia_p50_ms": round(_percentil(m["latencias"], 0.5) * 1000, 1),
+                    "latencia_p95_ms": round(_percentil(m["latencias"], 0.95) * 1000, 1),
+                    "latencia_max_ms": round(max(m["latencias"]) * 1000, 1),
+                    "status": {str(status): n for status, n in sorted(m["status"].items())},
+                }
+                for endpoint, m in sorted(self._requisicoes.items())
+            },
+            "parse": {
+                tipo: {
+                    "paginas": len(tempos),
+                    "total_ms": round(sum(tempos) * 1000, 1),
+                    "media_ms": round(sum(tempos) / len(tempos) * 1000, 3),
+                    "p95_ms": round(_percentil(tempos, 0.95) * 1000, 3),
+                }
+                for tipo, tempos in sorted(self._parse.items())
+            },
+            "contadores": {nome: dict(c.stats) for nome, c in componentes.items() if c is not None},
+            "memoria": {"pico_rss_mb": _pico_rss_mb()},
+        }
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            stats = pstats.Stats(self._cprofile, stream=io.StringIO()).strip_dirs()
+            funcoes = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCOES]
+            relatorio["cprofile"] = [
+                {
+                    "funcao": f"{arquivo}:{linha}({nome})",
+                    "chamadas": chamadas,
+                    "proprio_s": round(proprio, 4),
+                    "acumulado_s": round(acumulado, 4),
+                }
+                for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in funcoes
+            ]
+        if self.completo:
+            relatorio["memoria"]["pico_heap_mb"] = round(max(self._pico_heap, tracemalloc.get_traced_memory()[1]) / 2**20, 2)
+            alocacoes = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALOCACOES]
+            relatorio["memoria"]["alocacoes"] = [
+                {"linha": str(estatistica.traceback), "kb": round(estatistica.size / 1024, 1), "blocos": estatistica.count}
+                for estatistica in alocacoes
+            ]
+            tracemalloc.stop()
+        return relatorio
+
+    def salvar(self, relatorio: dict) -> str:
+        """
+        Grava o relatório em `path`/<início>.json, o resumo em .txt e, no modo completo, o cProfile em .prof.
+        Retorna o caminho do JSON.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        base = os.path.join(self.path, self.inicio.strftime("%Y%m%d-%H%M%S"))
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=4, ensure_ascii=False)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(resumo(relatorio) + "\n")
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(base + ".prof")
+        return base + ".json"
+
+def resumo(relatorio: dict) -> str:
+    """
+    Versão legível do relatório.
+    """
+    linhas = [f"Execução de {relatorio['inicio']}: {relatorio['segundos']:.2f}s"]
+    linhas.append("Etapas:")
+    for medida in relatorio["etapas"]:
+        heap = f" (pico do heap {medida['pico_heap_mb']:.1f} MB)" if "pico_heap_mb" in medida else " (em paralelo)" if medida.get("em_paralelo") else ""
+        linhas.append(f"  {medida['etapa']:<22} {medida['segundos']:8.2f}s{heap}")
+    if relatorio["requisicoes"]:
+        linhas.append("Requisições:")
+        for endpoint, m in relatorio["requisicoes"].items():
+            linhas.append(
+                f"  {endpoint:<22} {m['quantidade']:6} | p50 {m['latencia_p50_ms']:7.1f} ms  p95 {m['latencia_p95_ms']:7.1f} ms"
+                f"  máx {m['latencia_max_ms']:7.1f} ms | {m['bytes'] / 2**20:7.2f} MB"
+            )
+    if relatorio["parse"]:
+        linhas.append("Parse:")
+        for tipo, m in relatorio["parse"].items():
+            linhas.append(f"  {tipo:<22} {m['paginas']:6} páginas | {m['total_ms']:9.1f} ms  média {m['media_ms']:.3f} ms  p95 {m['p95_ms']:.3f} ms")
+    for nome, stats in relatorio["contadores"].items():
+        linhas.append(f"{nome}: " + ", ".join(f"{chave} {valor}" for chave, valor in stats.items()))
+    memoria = relatorio["memoria"]
+    if memoria.get("pico_rss_mb") is not None:
+        heap = f", heap Python {memoria['pico_heap_mb']:.1f} MB" if "pico_heap_mb" in memoria else ""
+        linhas.append(f"Pico de memória: RSS {memoria['pico_rss_mb']:.1f} MB{heap}")
+    if relatorio.get("cprofile"):
+        linhas.append("cProfile (tempo próprio):")
+        for funcao in relatorio["cprofile"][:10]:
+            linhas.append(f"  {funcao['proprio_s']:8.3f}s {funcao['acumulado_s']:8.3f}s {funcao['chamadas']:8}  {funcao['funcao']}")
+    return "\n".join(linhas)
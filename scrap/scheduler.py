@@ -0,0 +1,234 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from scrap.config import RATE_LIMIT
+
+# Requisições simultâneas: o limite adaptativo começa em INITIAL_CONCURRENCY e varia entre 1 e MAX_CONCURRENCY
+MAX_CONCURRENCY = 16
+INITIAL_CONCURRENCY = 4
+# Rajada máxima do token bucket (requisições liberadas de uma vez depois de um tempo parado)
+BURST = 20
+# Latência média acima de LATENCY_TOLERANCE x a menor média já vista (e pelo menos LATENCY_MIN_RISE
+# segundos acima dela, para que variações de poucos ms não contem) conta como sobrecarga
+LATENCY_TOLERANCE = 2.0
+LATENCY_MIN_RISE = 0.05
+LATENCY_EWMA_ALPHA = 0.2
+# Novas tentativas (só GET/HEAD), com espera aleatória em [0, min(BACKOFF_MAX, BACKOFF_BASE * 2^tentativa)]
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Circuit breaker: requisições seguidas que falharam em um endpoint (cada uma depois de todas as suas
+# tentativas) para abrir, e segundos até liberar uma requisição de teste. Acima de uma só requisição,
+# para que uma única turma com erro não pause as demais
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+# (conexão, leitura) em segundos, para requisições feitas sem timeout
+DEFAULT_TIMEOUT = (10, 60)
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    O endpoint falhou seguidamente e está em pausa (circuit breaker aberto).
+    """
+
+class TokenBucket:
+    """
+    Limita a taxa de requisições: `rate` por segundo, com rajadas de até `burst`.
+    rate <= 0 desativa o limite.
+    """
+
+    def __init__(self, rate: float, burst: int = BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (agora - self._updated) * self.rate)
+                self._updated = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.rate
+            time.sleep(espera)
+
+class AIMDLimiter:
+    """
+    Limite de concorrência adaptativo (AIMD): cada sucesso soma 1/limite (cerca de +1 a cada
+    "rodada" de requisições) e um erro, ou a latência média subindo acima da tolerância,
+    corta o limite pela metade. O corte acontece no máximo uma vez por latência média, para
+    que uma rajada de erros da mesma rodada não derrube o limite até 1.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, maximum: int = MAX_CONCURRENCY):
+        self.maximum = maximum
+        self.limit = float(min(initial, maximum))
+        self.in_flight = 0
+        self._ewma = None
+        self._baseline = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float | None, ok: bool):
+        """
+        Devolve a vaga. `latency` é None quando a requisição não teve resposta.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if latency is not None and ok:
+                self._ewma = latency if self._ewma is None else (1 - LATENCY_EWMA_ALPHA) * self._ewma + LATENCY_EWMA_ALPHA * latency
+                self._baseline = self._ewma if self._baseline is None else min(self._baseline, self._ewma)
+            sobrecarga = (
+                self._ewma is not None
+                and self._ewma > LATENCY_TOLERANCE * self._baseline
+                and self._ewma - self._baseline > LATENCY_MIN_RISE
+            )
+            if ok and not sobrecarga:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                agora = time.monotonic()
+                if agora - self._last_decrease > (self._ewma or 0):
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = agora
+                    if sobrecarga:
+                        # Recomeça a média a partir do novo patamar, senão um único pico cortaria várias vezes
+                        self._ewma = self._baseline
+            self._cond.notify_all()
+
+class CircuitBreaker:
+    """
+    Circuit breaker por endpoint (caminho da URL): depois de BREAKER_THRESHOLD requisições seguidas
+    sem sucesso o endpoint fica aberto (requisições recusadas) por BREAKER_COOLDOWN segundos; depois
+    disso uma requisição de teste é liberada, e o resultado dela fecha ou reabre o circuito.
+    Cada requisição conta uma vez (`record` depois da última tentativa), não uma por tentativa.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        # endpoint -> [falhas seguidas, aberto até (monotonic), teste em andamento]
+        self._endpoints: dict[str, list] = {}
+
+    def allow(self, endpoint: str) -> bool:
+        with self._lock:
+            estado = self._endpoints.setdefault(endpoint, [0, 0.0, False])
+            falhas, aberto_ate, testando = estado
+            if falhas < self.threshold:
+                return True
+            if time.monotonic() < aberto_ate or testando:
+                return False
+            estado[2] = True
+            return True
+
+    def record(self, endpoint: str, ok: bool):
+        with self._lock:
+            estado = self._endpoints.setdefault(endpoint, [0, 0.0, False])
+            estado[2] = False
+            if ok:
+                estado[0] = 0
+                return
+            estado[0] += 1
+            if estado[0] >= self.threshold:
+                if estado[0] == self.threshold:
+                    print(f"Endpoint {endpoint} com falhas seguidas, pausando por {self.cooldown:.0f}s")
+                estado[1] = time.monotonic() + self.cooldown
+
+def _backoff(tentativa: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** tentativa))
+
+def _retry_after(response: requests.Response) -> float | None:
+    try:
+        return min(BACKOFF_MAX, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+class SchedulingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter que agenda todas as requisições da sessão: token bucket (taxa), limite de
+    concorrência adaptativo (AIMD), novas tentativas com backoff exponencial aleatório para
+    erros temporários (5xx, 429, falhas de conexão e timeouts) e circuit breaker por endpoint.
+
+    Montado em várias sessões, elas compartilham o pool de conexões e todos os limites.
+    A resposta final (mesmo de erro) é devolvida normalmente; exceções só sobem quando as
+    tentativas acabam sem resposta ou o circuito do endpoint está aberto (CircuitOpenError).
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, rate: float = RATE_LIMIT, **kwargs):
+        kwargs.setdefault("pool_maxsize", max_concurrency)
+        super().__init__(**kwargs)
+        self.bucket = TokenBucket(rate)
+        self.limiter = AIMDLimiter(maximum=max_concurrency)
+        self.breaker = CircuitBreaker()
+        self.stats = {"requisicoes": 0, "retries": 0, "falhas": 0, "recusadas": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def send(self, request, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        endpoint = urlsplit(request.url).path
+        tentativas = MAX_RETRIES + 1 if request.method in ("GET", "HEAD") else 1
+
+        # O circuito é consultado e atualizado uma vez por requisição, não por tentativa
+        if not self.breaker.allow(endpoint):
+            self._count("recusadas")
+            raise CircuitOpenError(f"Endpoint {endpoint} em pausa após falhas seguidas", request=request)
+        ok = False
+        try:
+            for tentativa in range(tentativas):
+                self.bucket.take()
+                self.limiter.acquire()
+                self._count("requisicoes")
+                inicio = time.perf_counter()
+                try:
+                    response = super().send(request, *args, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                    self.limiter.release(None, ok=False)
+                    self._count("falhas")
+                    if tentativa == tentativas - 1:
+                        raise
+                    erro = error
+                    espera = _backoff(tentativa)
+                else:
+                    ok = response.status_code not in RETRY_STATUS
+                    self.limiter.release(time.perf_counter() - inicio, ok=ok)
+                    if not ok:
+                        self._count("falhas")
+                    if ok or tentativa == tentativas - 1:
+                        return response
+                    erro = f"HTTP {response.status_code}"
+                    espera = _retry_after(response) or _backoff(tentativa)
+                    # Lê o corpo para a conexão voltar ao pool
+                    response.content
+                    response.close()
+
+                self._count("retries")
+                print(f"Erro em {endpoint} ({erro}), tentando de novo em {espera:.1f}s")
+                time.sleep(espera)
+        finally:
+            self.breaker.record(endpoint, ok=ok)
+
+    def summary(self) -> str:
+        return (
+            "Requisições: {requisicoes} enviadas, {retries} repetidas, {falhas} falhas, "
+            "{recusadas} recusadas pelo circuit breaker, concorrência final {limite}"
+        ).format(limite=int(self.limiter.limit), **self.stats)
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import requests
+
+SESSION_PATH = "data/session.json"
+
+# Leitura-modificação-escrita do arquivo de sessões: várias contas logam ao mesmo tempo no batch
+_lock = threading.Lock()
+
+class SessionStore:
+    """
+    Guarda os cookies de sessão (JSESSIONID/JSESSIONIDSSO) e os dados do usuário de cada conta,
+    para que as próximas execuções não precisem passar pelo j_security_check.
+
+    O arquivo contém cookies de autenticação, então é gravado só com permissão do dono (0600).
+    Seguro para várias threads do mesmo processo (ex.: as contas do batch.py).
+    """
+
+    def __init__(self, path: str = SESSION_PATH):
+        self.path = path
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, contas: dict):
+        pasta = os.path.dirname(self.path) or "."
+        os.makedirs(pasta, exist_ok=True)
+        # mkstemp já cria o arquivo com permissão 0600, com um nome próprio para esta escrita
+        fd, tmp_path = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(contas, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self, user: str) -> tuple[dict[str, str], list[dict]] | None:
+        """
+        Retorna (user_data, cookies) salvos para o usuário, ou None.
+        """
+        conta = self._read().get(user)
+        if not conta:
+            return None
+        return conta["user_data"], conta["cookies"]
+
+    def save(self, user: str, user_data: dict[str, str], session: requests.Session):
+        cookies = [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in session.cookies
+        ]
+        with _lock:
+            contas = self._read()
+            contas[user] = {"user_data": user_data, "cookies": cookies, "saved_at": time.time()}
+            self._write(contas)
+
+    def clear(self, user: str):
+        with _lock:
+            contas = self._read()
+            if contas.pop(user, None) is not None:
+                self._write(contas)
+
+def restore_cookies(session: requests.Session, cookies: list[dict]):
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"])
@@ -0,0 +1,314 @@
+"""
+Armazenamento das execuções em SQLite, uma "foto" (snapshot) por execução.
+
+Cada snapshot guarda as turmas (disponíveis e do aluno), com docentes, horários, espaço físico
+e ocupação em tabelas indexadas por turma, disciplina, curso e dia da semana; assim o histórico
+de ocupação não se perde entre execuções e consultas não precisam carregar o JSON inteiro.
+O JSON original de cada turma também é guardado, para reconstruir exatamente as entradas de
+run_transformation e generate_ics.
+
+Uso:
+    python -m scrap.snapshot_store snapshots
+    python -m scrap.snapshot_store livres --dia 3 --depois 18:00
+    python -m scrap.snapshot_store historico 951522
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, Iterator
+
+SNAPSHOT_DB_PATH = "data/snapshots.db"
+
+DISPONIVEL = "disponivel"
+MATRICULA = "matricula"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    criado_em TEXT NOT NULL,
+    matricula TEXT
+);
+CREATE TABLE IF NOT EXISTS turma (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot(id) ON DELETE CASCADE,
+    tipo TEXT NOT NULL CHECK (tipo IN ('disponivel', 'matricula')),
+    turma_id TEXT NOT NULL,
+    disciplina TEXT,
+    curso TEXT,
+    nome TEXT,
+    ano TEXT,
+    semestre TEXT,
+    periodo TEXT,
+    situacao TEXT,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, tipo, turma_id)
+);
+CREATE INDEX IF NOT EXISTS turma_por_id ON turma (turma_id, snapshot_id);
+CREATE INDEX IF NOT EXISTS turma_por_disciplina ON turma (disciplina, snapshot_id);
+CREATE INDEX IF NOT EXISTS turma_por_curso ON turma (curso, snapshot_id);
+
+CREATE TABLE IF NOT EXISTS docente (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot(id) ON DELETE CASCADE,
+    turma_id TEXT NOT NULL,
+    nome TEXT,
+    papel TEXT
+);
+CREATE INDEX IF NOT EXISTS docente_por_turma ON docente (snapshot_id, turma_id);
+CREATE INDEX IF NOT EXISTS docente_por_nome ON docente (nome);
+
+CREATE TABLE IF NOT EXISTS horario (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot(id) ON DELETE CASCADE,
+    turma_id TEXT NOT NULL,
+    dia INTEGER,
+    hora_inicio TEXT,
+    hora_fim TEXT,
+    aula TEXT,
+    data_inicio TEXT,
+    data_fim TEXT
+);
+CREATE INDEX IF NOT EXISTS horario_por_turma ON horario (snapshot_id, turma_id);
+CREATE INDEX IF NOT EXISTS horario_por_dia ON horario (snapshot_id, dia, hora_inicio);
+
+CREATE TABLE IF NOT EXISTS espaco (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot(id) ON DELETE CASCADE,
+    turma_id TEXT NOT NULL,
+    predio TEXT,
+    sala TEXT,
+    espaco TEXT
+);
+CREATE INDEX IF NOT EXISTS espaco_por_turma ON espaco (snapshot_id, turma_id);
+
+CREATE TABLE IF NOT EXISTS ocupacao (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot(id) ON DELETE CASCADE,
+    turma_id TEXT NOT NULL,
+    vagas_totais INTEGER,
+    vagas_ocupadas INTEGER,
+    total_matriculas INTEGER,
+    total_solicitacoes INTEGER,
+    PRIMARY KEY (snapshot_id, turma_id)
+);
+CREATE INDEX IF NOT EXISTS ocupacao_por_turma ON ocupacao (turma_id, snapshot_id);
+
+CREATE TABLE IF NOT EXISTS disciplina_aprovada (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot(id) ON DELETE CASCADE,
+    disciplina TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aprovada_por_snapshot ON disciplina_aprovada (snapshot_id);
+"""
+
+def _int(valor) -> int | None:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+class SnapshotStore:
+    """
+    Banco SQLite com os snapshots das execuções. Seguro para uso por várias threads
+    (as escritas são serializadas).
+    """
+
+    def __init__(self, path: str = SNAPSHOT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Escrita
+
+    def create_snapshot(self, matricula: str | None = None) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO snapshot (criado_em, matricula) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), matricula),
+            )
+        return cursor.lastrowid
+
+    def add_turmas(self, snapshot_id: int, tipo: str, turmas: Iterable[tuple[str, dict]]) -> int:
+        """
+        Grava as turmas (pares id, dados) no snapshot, uma por vez (aceita um gerador).
+        Docentes, horários, espaço físico e ocupação são gravados uma vez por turma no snapshot,
+        mesmo que ela apareça nos dois tipos. Retorna o número de turmas gravadas.
+        """
+        total = 0
+        with self._lock, self._conn:
+            for turma_id, data in turmas:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO turma VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        snapshot_id, tipo, turma_id,
+                        data.get("Disciplina"), data.get("Curso"), data.get("Nome"),
+                        data.get("Ano"), data.get("Semestre"), data.get("Período"), data.get("Matrícula"),
+                        json.dumps(data, ensure_ascii=False),
+                    ),
+                )
+                total += 1
+                ja_gravada = self._conn.execute(
+                    "SELECT 1 FROM ocupacao WHERE snapshot_id = ? AND turma_id = ?", (snapshot_id, turma_id)
+                ).fetchone()
+                if not ja_gravada:
+                    self._add_detalhes(snapshot_id, turma_id, data)
+        return total
+
+    def _add_detalhes(self, snapshot_id: int, turma_id: str, data: dict):
+        self._conn.execute(
+            "INSERT INTO ocupacao VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                snapshot_id, turma_id,
+                _int(data.get("Vagas Totais")), _int(data.get("Vagas Ocupadas")),
+                _int(data.get("Total de Matrículas")), _int(data.get("Total de Solicitações")),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT INTO docente VALUES (?, ?, ?, ?)",
+            [(snapshot_id, turma_id, d.get("Nome do Docente"), d.get("Papel do Docente")) for d in data.get("Docentes") or []],
+        )
+        self._conn.executemany(
+            "INSERT INTO horario VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    snapshot_id, turma_id, _int((h.get("Dia da Semana") or "")[:1]),
+                    h.get("Hora Início"), h.get("Hora Fim"), h.get("Aula"),
+                    h.get("Data Início Período"), h.get("Data Fim Período"),
+                )
+                for h in data.get("Horários") or []
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO espaco VALUES (?, ?, ?, ?, ?)",
+            [(snapshot_id, turma_id, e.get("Nome do Prédio"), e.get("Número da Sala"), e.get("Espaço Físico")) for e in data.get("Espaço Físico") or []],
+        )
+
+    def add_disciplinas_aprovadas(self, snapshot_id: int, disciplinas: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO disciplina_aprovada VALUES (?, ?)", [(snapshot_id, d) for d in disciplinas]
+            )
+
+    def save_run(self, matricula: str, disciplinas_aprovadas: list[str], turmas_matricula: dict[str:dict], turmas_disponiveis: Iterable[tuple[str, dict]]) -> int:
+        """
+        Grava uma execução completa como um novo snapshot e retorna o id dele.
+        """
+        snapshot_id = self.create_snapshot(matricula)
+        self.add_disciplinas_aprovadas(snapshot_id, disciplinas_aprovadas or [])
+        self.add_turmas(snapshot_id, MATRICULA, (turmas_matricula or {}).items())
+        total = self.add_turmas(snapshot_id, DISPONIVEL, turmas_disponiveis)
+        print(f"Snapshot {snapshot_id} salvo em {self.path} ({total} turmas disponíveis)")
+        return snapshot_id
+
+    # Leitura
+
+    def resolve(self, snapshot_id: int | str | None = None, matricula: str | None = None) -> int:
+        """
+        Id do snapshot: o informado, ou o mais recente (da matrícula, se informada) para None/"latest".
+        """
+        if snapshot_id not in (None, "latest"):
+            return int(snapshot_id)
+        if matricula is None:
+            row = self._conn.execute("SELECT max(id) FROM snapshot").fetchone()
+        else:
+            row = self._conn.execute("SELECT max(id) FROM snapshot WHERE matricula = ?", (matricula,)).fetchone()
+        if row[0] is None:
+            raise LookupError(f"Nenhum snapshot em {self.path}")
+        return row[0]
+
+    def list_snapshots(self) -> list[dict]:
+        rows = self._conn.execute(
+            """SELECT s.id, s.criado_em, s.matricula, count(t.turma_id) AS turmas
+               FROM snapshot s LEFT JOIN turma t ON t.snapshot_id = s.id AND t.tipo = 'disponivel'
+               GROUP BY s.id ORDER BY s.id"""
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_turmas(self, snapshot_id: int, tipo: str) -> Iterator[tuple[str, dict]]:
+        """
+        Gera as turmas (id, dados originais) do snapshot uma a uma, na ordem em que foram gravadas.
+        """
+        cursor = self._conn.execute(
+            "SELECT turma_id, dados FROM turma WHERE snapshot_id = ? AND tipo = ? ORDER BY rowid",
+            (snapshot_id, tipo),
+        )
+        for turma_id, dados in cursor:
+            yield turma_id, json.loads(dados)
+
+    def load_turmas(self, snapshot_id: int, tipo: str) -> dict[str:dict]:
+        return dict(self.iter_turmas(snapshot_id, tipo))
+
+    def load_disciplinas_aprovadas(self, snapshot_id: int) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT disciplina FROM disciplina_aprovada WHERE snapshot_id = ? ORDER BY rowid", (snapshot_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def turmas_com_vagas(self, dia: int, depois_de: str = "00:00", antes_de: str = "23:59", snapshot_id: int | None = None) -> list[dict]:
+        """
+        Turmas disponíveis com aula no dia da semana (2 = segunda ... 7 = sábado) começando entre
+        `depois_de` e `antes_de` (HH:MM) e com vagas livres.
+        """
+        snapshot_id = self.resolve(snapshot_id)
+        rows = self._conn.execute(
+            """SELECT DISTINCT t.turma_id, t.disciplina, h.hora_inicio, h.hora_fim,
+                      o.vagas_totais - o.vagas_ocupadas AS vagas_livres
+               FROM horario h
+               JOIN ocupacao o ON o.snapshot_id = h.snapshot_id AND o.turma_id = h.turma_id
+               JOIN turma t ON t.snapshot_id = h.snapshot_id AND t.turma_id = h.turma_id AND t.tipo = 'disponivel'
+               WHERE h.snapshot_id = ? AND h.dia = ? AND h.hora_inicio BETWEEN ? AND ?
+                 AND o.vagas_totais > o.vagas_ocupadas
+               ORDER BY h.hora_inicio, t.disciplina""",
+            (snapshot_id, dia, depois_de, antes_de),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def historico_ocupacao(self, turma_id: str) -> list[dict]:
+        """
+        Ocupação da turma em cada snapshot em que ela aparece, do mais antigo ao mais recente.
+        """
+        rows = self._conn.execute(
+            """SELECT s.id AS snapshot_id, s.criado_em, o.vagas_totais, o.vagas_ocupadas,
+                      o.total_matriculas, o.total_solicitacoes
+               FROM ocupacao o JOIN snapshot s ON s.id = o.snapshot_id
+               WHERE o.turma_id = ? ORDER BY s.id""",
+            (turma_id,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=SNAPSHOT_DB_PATH)
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    subparsers.add_parser("snapshots", help="Lista os snapshots")
+    livres = subparsers.add_parser("livres", help="Turmas com vagas livres em um dia/horário")
+    livres.add_argument("--dia", type=int, required=True, help="2 = segunda ... 7 = sábado")
+    livres.add_argument("--depois", default="00:00", help="Início a partir de HH:MM")
+    livres.add_argument("--antes", default="23:59", help="Início até HH:MM")
+    livres.add_argument("--snapshot", help="Id do snapshot (padrão: o mais recente)")
+    historico = subparsers.add_parser("historico", help="Ocupação de uma turma ao longo dos snapshots")
+    historico.add_argument("turma_id")
+    args = parser.parse_args()
+
+    with SnapshotStore(args.db) as store:
+        if args.comando == "snapshots":
+            for s in store.list_snapshots():
+                print(f"{s['id']:5}  {s['criado_em']}  {s['matricula'] or '-':12}  {s['turmas']} turmas")
+        elif args.comando == "livres":
+            for t in store.turmas_com_vagas(args.dia, args.depois, args.antes, args.snapshot):
+                print(f"{t['turma_id']}  {t['hora_inicio']}-{t['hora_fim']}  {t['vagas_livres']:3} vagas  {t['disciplina']}")
+        else:
+            for h in store.historico_ocupacao(args.turma_id):
+                print(f"{h['criado_em']}  {h['vagas_ocupadas']}/{h['vagas_totais']} ocupadas, {h['total_solicitacoes']} solicitações")
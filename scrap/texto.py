@@ -0,0 +1,50 @@
+"""
+Normalização dos nomes de disciplinas e cursos, usada tanto na raspagem quanto na transformação.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+class _TabelaSemAcentos(dict):
+    """
+    Tabela para str.translate que tira os acentos (marcas combinantes da decomposição NFD)
+    de cada caractere. Cada caractere novo é calculado uma vez e guardado.
+    """
+
+    def __missing__(self, codigo: int) -> str:
+        decomposto = unicodedata.normalize("NFD", chr(codigo))
+        valor = "".join(c for c in decomposto if unicodedata.category(c) != "Mn")
+        self[codigo] = valor
+        return valor
+
+_SEM_ACENTOS = _TabelaSemAcentos()
+
+@lru_cache(maxsize=None)
+def clean_str(text: str) -> str:
+    """
+    Remove múltiplos espaços, acentos, parênteses (e conteúdo após),
+    e converte para caixa alta.
+    """
+    """
+    Exemplo:
+    Equações Diferenciais Parciais e Séries (EDPS) -> EQUACOES DIFERENCIAIS PARCIAIS E SERIES
+    """
+    # Remove conteúdo entre parênteses e o que vem depois
+    text = text.split("(")[0]
+
+    # Remove acentos (texto ASCII não tem o que remover)
+    if not text.isascii():
+        text = text.translate(_SEM_ACENTOS)
+
+    # Remove múltiplos espaços e strip
+    return " ".join(text.split()).upper()
+
+def _clean_str_referencia(text: str) -> str:
+    """
+    Implementação original de clean_str (NFD + unicodedata.category + regex), usada para conferir a rápida.
+    """
+    text = text.split("(")[0]
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.upper()
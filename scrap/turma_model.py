@@ -0,0 +1,282 @@
+"""
+Registros compactos das turmas: Turma, Horario, Docente e Espaco.
+
+Os dados de uma turma (página turma.action) circulam como dicionários com chaves longas
+("Carga Horária Realizada", "Total de Solicitações") e listas de dicionários em Docentes,
+Horários e Espaço Físico. Com milhares de turmas, isso pesa: cada dicionário tem sua tabela
+de chaves, e nomes de docentes, prédios, cursos, datas e horários se repetem em cada turma.
+
+Aqui cada turma vira um objeto com __slots__:
+- os textos repetidos são internados (sys.intern): uma única cópia de "Bloco C" ou "14:35";
+- os campos numéricos ("40", "72", "2026") viram int uma vez só, na leitura;
+- a ordem das chaves do dicionário original fica em uma tupla compartilhada por todas as
+  turmas com o mesmo formato, e chaves desconhecidas vão para `extras`.
+
+`from_dict` lê o formato de sempre e `to_dict` devolve o mesmo dicionário (mesmas chaves, na
+mesma ordem, com os números de volta como texto), então o JSON gravado não muda.
+
+Uso (memória por turma, dicionário x registro):
+    python -m scrap.turma_model data/turmas_disponiveis_data.json
+"""
+import sys
+from functools import lru_cache
+
+_intern = sys.intern
+
+# Tuplas de chaves já vistas: registros com o mesmo formato compartilham a mesma tupla
+_FORMATOS: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+def _texto(valor):
+    return _intern(valor) if type(valor) is str else valor
+
+@lru_cache(maxsize=4096)
+def _numero(valor):
+    """
+    "40" -> 40. Textos que não voltariam iguais com str() (ex.: "", "040", "1,5") ficam como texto.
+    Memorizada: os mesmos poucos números se repetem em todas as turmas.
+    """
+    if type(valor) is str and valor.isascii() and valor.isdigit() and (valor[0] != "0" or valor == "0"):
+        return int(valor)
+    return _texto(valor)
+
+class _Registro:
+    """
+    Base dos registros. Cada subclasse declara CAMPOS (chave do dicionário -> atributo, na
+    ordem do portal), os atributos NUMERICOS e, em LISTAS, os atributos que são listas de
+    outros registros, e um __init__ com um argumento por atributo (para criar registros no código).
+    """
+    __slots__ = ("_chaves", "extras")
+    CAMPOS: dict[str, str] = {}
+    NUMERICOS: frozenset[str] = frozenset()
+    LISTAS: dict[str, type] = {}
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._CANONICO = _FORMATOS.setdefault(tuple(cls.CAMPOS), tuple(cls.CAMPOS))
+        cls._so_texto = not cls.NUMERICOS and not cls.LISTAS
+        # Plano de leitura de cada formato (tupla de chaves) já visto
+        cls._planos: dict[tuple[str, ...], tuple[list, tuple[str, ...]]] = {}
+
+    @classmethod
+    def _planejar(cls, formato: tuple[str, ...]) -> tuple[list, tuple[str, ...]]:
+        """
+        ([(atributo ou None se a chave é desconhecida, conversor)] na ordem das chaves, atributos ausentes).
+        """
+        plano = []
+        for chave in formato:
+            atributo = cls.CAMPOS.get(chave)
+            if atributo is None:
+                plano.append((None, None))
+            elif atributo in cls.LISTAS:
+                plano.append((atributo, cls.LISTAS[atributo]._lista))
+            else:
+                plano.append((atributo, _numero if atributo in cls.NUMERICOS else _texto))
+        ausentes = tuple(atributo for chave, atributo in cls.CAMPOS.items() if chave not in formato)
+        cls._planos[formato] = plano, ausentes
+        return plano, ausentes
+
+    @classmethod
+    def _lista(cls, itens: list[dict] | None) -> tuple | None:
+        # Tupla: menor que a lista, e os registros não são alterados depois de lidos
+        return None if itens is None else tuple([cls.from_dict(item) for item in itens])
+
+    @classmethod
+    def from_dict(cls, dados: dict):
+        chaves = tuple(dados)
+        formato = _FORMATOS.get(chaves)
+        if formato is None:
+            formato = _FORMATOS.setdefault(chaves, chaves)
+        plano, ausentes = cls._planos.get(formato) or cls._planejar(formato)
+
+        # Sem passar pelo __init__: cada atributo é gravado uma vez só
+        registro = cls.__new__(cls)
+        registro._chaves = formato
+        registro.extras = None
+        for atributo in ausentes:
+            setattr(registro, atributo, None)
+        if cls._so_texto and formato is cls._CANONICO:
+            try:
+                # Caso comum (Docentes, Horários, Espaço Físico): só textos, internados em C
+                for (atributo, _), valor in zip(plano, map(_intern, dados.values())):
+                    setattr(registro, atributo, valor)
+                return registro
+            except TypeError:
+                pass
+        for (atributo, conversor), (chave, valor) in zip(plano, dados.items()):
+            if atributo is None:
+                if registro.extras is None:
+                    registro.extras = {}
+                registro.extras[_intern(chave)] = valor
+            else:
+                setattr(registro, atributo, conversor(valor))
+        return registro
+
+    def to_dict(self) -> dict:
+        dados = {}
+        campos = self.CAMPOS
+        for chave in self._chaves:
+            atributo = campos.get(chave)
+            if atributo is None:
+                dados[chave] = self.extras[chave]
+                continue
+            valor = getattr(self, atributo)
+            if type(valor) is int:
+                valor = str(valor)
+            elif type(valor) is tuple:
+                valor = [item.to_dict() for item in valor]
+            dados[chave] = valor
+        return dados
+
+    def __repr__(self) -> str:
+        campos = ", ".join(f"{atributo}={getattr(self, atributo)!r}" for atributo in self.CAMPOS.values() if getattr(self, atributo) is not None)
+        return f"{type(self).__name__}({campos})"
+
+class Horario(_Registro):
+    __slots__ = ("dia_semana", "hora_inicio", "hora_fim", "aula", "data_inicio", "data_fim")
+    CAMPOS = {
+        "Dia da Semana": "dia_semana",
+        "Hora Início": "hora_inicio",
+        "Hora Fim": "hora_fim",
+        "Aula": "aula",
+        "Data Início Período": "data_inicio",
+        "Data Fim Período": "data_fim",
+    }
+
+    def __init__(self, dia_semana: str | None = None, hora_inicio: str | None = None, hora_fim: str | None = None, aula: str | None = None, data_inicio: str | None = None, data_fim: str | None = None):
+        self._chaves = self._CANONICO
+        self.extras = None
+        self.dia_semana = dia_semana
+        self.hora_inicio = hora_inicio
+        self.hora_fim = hora_fim
+        self.aula = aula
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+
+    @property
+    def dia(self) -> str:
+        """
+        Número do dia da semana ("2 - Segunda-feira" -> "2"; 1 = domingo).
+        """
+        return self.dia_semana[0]
+
+class Docente(_Registro):
+    __slots__ = ("nome", "papel")
+    CAMPOS = {"Nome do Docente": "nome", "Papel do Docente": "papel"}
+
+    def __init__(self, nome: str | None = None, papel: str | None = None):
+        self._chaves = self._CANONICO
+        self.extras = None
+        self.nome = nome
+        self.papel = papel
+
+class Espaco(_Registro):
+    __slots__ = ("predio", "sala", "tipo")
+    CAMPOS = {"Nome do Prédio": "predio", "Número da Sala": "sala", "Espaço Físico": "tipo"}
+
+    def __init__(self, predio: str | None = None, sala: str | None = None, tipo: str | None = None):
+        self._chaves = self._CANONICO
+        self.extras = None
+        self.predio = predio
+        self.sala = sala
+        self.tipo = tipo
+
+class Turma(_Registro):
+    __slots__ = (
+        "vagas_totais", "vagas_ocupadas", "total_matriculas", "total_solicitacoes", "disciplina", "curso",
+        "ano", "carga_horaria", "docentes", "horarios", "espacos", "nome", "semestre", "periodo", "matricula",
+    )
+    CAMPOS = {
+        "Vagas Totais": "vagas_totais",
+        "Vagas Ocupadas": "vagas_ocupadas",
+        "Total de Matrículas": "total_matriculas",
+        "Total de Solicitações": "total_solicitacoes",
+        "Disciplina": "disciplina",
+        "Curso": "curso",
+        "Ano": "ano",
+        "Carga Horária Realizada": "carga_horaria",
+        "Docentes": "docentes",
+        "Horários": "horarios",
+        "Espaço Físico": "espacos",
+        "Nome": "nome",
+        "Semestre": "semestre",
+        # Acrescentados pelos scrapers: período da oferta e situação da matrícula
+        "Período": "periodo",
+        "Matrícula": "matricula",
+    }
+    NUMERICOS = frozenset({"vagas_totais", "vagas_ocupadas", "total_matriculas", "total_solicitacoes", "ano", "carga_horaria"})
+    LISTAS = {"docentes": Docente, "horarios": Horario, "espacos": Espaco}
+
+    def __init__(
+        self,
+        vagas_totais: int | str | None = None,
+        vagas_ocupadas: int | str | None = None,
+        total_matriculas: int | str | None = None,
+        total_solicitacoes: int | str | None = None,
+        disciplina: str | None = None,
+        curso: str | None = None,
+        ano: int | str | None = None,
+        carga_horaria: int | str | None = None,
+        docentes: tuple[Docente, ...] | None = None,
+        horarios: tuple[Horario, ...] | None = None,
+        espacos: tuple[Espaco, ...] | None = None,
+        nome: str | None = None,
+        semestre: str | None = None,
+        periodo: str | None = None,
+        matricula: str | None = None,
+    ):
+        self._chaves = self._CANONICO
+        self.extras = None
+        self.vagas_totais = vagas_totais
+        self.vagas_ocupadas = vagas_ocupadas
+        self.total_matriculas = total_matriculas
+        self.total_solicitacoes = total_solicitacoes
+        self.disciplina = disciplina
+        self.curso = curso
+        self.ano = ano
+        self.carga_horaria = carga_horaria
+        self.docentes = docentes
+        self.horarios = horarios
+        self.espacos = espacos
+        self.nome = nome
+        self.semestre = semestre
+        self.periodo = periodo
+        self.matricula = matricula
+
+def carregar_turmas(turma_id_data: dict[str:dict]) -> dict[str, Turma]:
+    """
+    {id: dados} no formato de sempre -> {id: Turma}.
+    """
+    return {_intern(turma_id): Turma.from_dict(dados) for turma_id, dados in turma_id_data.items()}
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import timeit
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("arquivo", help="JSON {id: dados da turma} (ex.: data/turmas_disponiveis_data.json)")
+    args = parser.parse_args()
+
+    with open(args.arquivo, "r", encoding="utf-8") as f:
+        texto = f.read()
+
+    def medir_memoria(construir):
+        tracemalloc.start()
+        objeto = construir()
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return objeto, memoria
+
+    dicionarios, memoria_dict = medir_memoria(lambda: json.loads(texto))
+    del dicionarios
+    registros, memoria_registro = medir_memoria(lambda: carregar_turmas(json.loads(texto)))
+    n = len(registros) or 1
+    print(f"{len(registros)} turmas: {memoria_dict / n:.0f} bytes/turma em dicionários, {memoria_registro / n:.0f} bytes/turma em registros ({memoria_dict / max(memoria_registro, 1):.1f}x menos)")
+
+    dados = json.loads(texto)
+    confere = all(registros[turma_id].to_dict() == turma for turma_id, turma in dados.items())
+    confere = confere and all(list(registros[turma_id].to_dict()) == list(turma) for turma_id, turma in dados.items())
+    leitura = timeit.timeit(lambda: carregar_turmas(dados), number=5) / 5
+    escrita = timeit.timeit(lambda: {turma_id: turma.to_dict() for turma_id, turma in registros.items()}, number=5) / 5
+    print(f"from_dict {leitura / n * 1e6:.1f} µs/turma, to_dict {escrita / n * 1e6:.1f} µs/turma, to_dict confere: {'sim' if confere else 'NÃO'}")
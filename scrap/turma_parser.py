@@ -0,0 +1,295 @@
+"""
+Extrator rápido da página da turma (turma.action).
+
+Em vez de montar a árvore inteira do documento com o BeautifulSoup, percorre o HTML uma
+única vez (html.parser.HTMLParser da stdlib) e só guarda os nós dentro dos blocos usados
+por get_turma_data: "Dados Gerais", "Docentes", "Horários", "Espaço Físico" e `topopage`.
+Sobre esses nós aplica as mesmas regras de busca do parser com BeautifulSoup, então o
+dicionário resultante é o mesmo.
+
+Checagem de paridade contra páginas gravadas (arquivos .html ou uma execução de data/archive):
+    python -m scrap.turma_parser --check pasta/com/paginas
+    python -m scrap.turma_parser --run latest
+"""
+from html.parser import HTMLParser
+
+TABELAS = ("Docentes", "Horários", "Espaço Físico")
+_TITULOS = frozenset(("Dados Gerais",) + TABELAS)
+
+# Tags sem fechamento (mesma lista do BeautifulSoup)
+_VOID = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+})
+# Texto dessas tags não entra no get_text() do BeautifulSoup
+_RAW_TEXT = frozenset({"script", "style"})
+_ASCII_SPACES = " \n\t\x0c\r"
+
+class _Node:
+    __slots__ = ("tag", "attrs", "classes", "children", "parent", "outer")
+
+    def __init__(self, tag: str, attrs: dict[str, str], parent: "_Node | None"):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = attrs.get("class", "").split()
+        self.children = []
+        self.parent = parent
+        # (tag, classes) dos ancestrais fora do bloco guardado; só preenchido na raiz do bloco
+        self.outer = ()
+
+    def descendants(self):
+        for child in self.children:
+            if type(child) is _Node:
+                yield child
+                yield from child.descendants()
+
+    def ancestors(self):
+        """
+        Ancestrais (tag, classes), do mais próximo ao mais distante, incluindo os de fora do bloco.
+        """
+        node = self
+        while node.parent is not None:
+            node = node.parent
+            yield node.tag, node.classes
+        yield from node.outer
+
+    def strings(self):
+        for child in self.children:
+            if type(child) is str:
+                yield child
+            elif child is not None:
+                yield from child.strings()
+
+    def get_text(self, strip: bool = False) -> str:
+        if strip:
+            return "".join(texto for texto in (s.strip() for s in self.strings()) if texto)
+        # O BeautifulSoup reduz textos só de espaços ASCII a um único " " ou "\n"
+        return "".join(
+            s if s.strip(_ASCII_SPACES) else ("\n" if "\n" in s else " ")
+            for s in self.strings()
+        )
+
+    def find(self, tag: str | None = None, classe: str | None = None) -> "_Node | None":
+        for node in self.descendants():
+            if (tag is None or node.tag == tag) and (classe is None or classe in node.classes):
+                return node
+        return None
+
+    def has_ancestor(self, tag: str | None = None, classe: str | None = None) -> bool:
+        for ancestor_tag, ancestor_classes in self.ancestors():
+            if (tag is None or ancestor_tag == tag) and (classe is None or classe in ancestor_classes):
+                return True
+        return False
+
+class _TurmaExtractor(HTMLParser):
+    """
+    Mantém a pilha de tags abertas do documento inteiro (para fechar tags como o BeautifulSoup),
+    mas só cria nós para os blocos de interesse.
+    """
+
+    def __init__(self, titulos: frozenset[str] = _TITULOS, topopage: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.stack = [] # [(tag, classes, _Node | None)]
+        self.blocos = {}
+        self.titulos = titulos
+        self.topopage = topopage
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {key: (value if value is not None else "") for key, value in attrs}
+        parent = self.stack[-1][2] if self.stack else None
+
+        bloco = None
+        if tag == "div" and attrs.get("title") in self.titulos and attrs["title"] not in self.blocos:
+            bloco = attrs["title"]
+        elif self.topopage and "topopage" not in self.blocos and "topopage" in attrs.get("class", "").split():
+            bloco = "topopage"
+
+        if parent is None and bloco is None:
+            node = None
+            classes = attrs["class"].split() if "class" in attrs else []
+        else:
+            node = _Node(tag, attrs, parent)
+            classes = node.classes
+            if parent is not None:
+                parent.children.append(node)
+            else:
+                node.outer = tuple((t, c) for t, c, _ in reversed(self.stack))
+            if bloco is not None:
+                self.blocos[bloco] = node
+
+        if tag not in _VOID:
+            self.stack.append((tag, classes, node))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Fecha a tag aberta mais recente com esse nome (e tudo que estiver aberto dentro dela)
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        if not self.stack:
+            return
+        tag, _, node = self.stack[-1]
+        if node is None or tag in _RAW_TEXT:
+            return
+        children = node.children
+        if children and type(children[-1]) is str:
+            children[-1] += data
+        else:
+            children.append(data)
+
+    def _separa_texto(self, *_):
+        # Comentários separam os textos vizinhos (não são concatenados)
+        if self.stack and self.stack[-1][2] is not None:
+            self.stack[-1][2].children.append(None)
+
+    handle_comment = _separa_texto
+    handle_decl = _separa_texto
+    handle_pi = _separa_texto
+    unknown_decl = _separa_texto
+
+def _parse_table(container: _Node | None) -> list[dict[str:str]] | None:
+    if container is None:
+        return None
+    table = container.find("table")
+    if table is None:
+        return None
+
+    headers = []
+    dados_rows = []
+    for node in table.descendants():
+        if node.tag == "th" and node.has_ancestor("thead"):
+            headers.append(node.get_text(strip=True))
+        elif node.tag == "tr" and node.has_ancestor("tbody"):
+            dados_rows.append(node)
+
+    dados = []
+    for row in dados_rows:
+        valores = [td.get_text(strip=True) for td in row.descendants() if td.tag == "td"]
+        dados.append(dict(zip(headers, valores)))
+    return dados
+
+def _linha_vagas(node: _Node, destino: dict[str:str]):
+    # Linha da tabela de vagas: rótulo (.label) e valor (<strong>)
+    if node.tag == "tr" and node.has_ancestor(classe="tablevagas"):
+        label = node.find(classe="label")
+        value = node.find("strong")
+        if label and value:
+            destino[label.get_text(strip=True).replace(":", "")] = value.get_text(strip=True)
+
+def parse_vagas_stream(html: str) -> dict[str:str]:
+    """
+    Só a tabela de vagas (.tablevagas) do bloco "Dados Gerais", com as mesmas chaves e valores de
+    parse_turma_page_stream (ex.: {"Vagas Totais": "40", ...}). Guarda só os nós desse bloco.
+    """
+    extractor = _TurmaExtractor(titulos=frozenset(("Dados Gerais",)), topopage=False)
+    extractor.feed(html)
+    extractor.close()
+    container = extractor.blocos.get("Dados Gerais")
+    if container is None:
+        raise AttributeError("Página da turma sem o bloco 'Dados Gerais'")
+    vagas = {}
+    for node in container.descendants():
+        _linha_vagas(node, vagas)
+    return vagas
+
+def parse_turma_page_stream(html: str) -> dict[str:str]:
+    """
+    Mesmo resultado de scrap.get_turma_data.parse_turma_page, sem montar a árvore do documento.
+    Levanta AttributeError (como o parser com BeautifulSoup) se a página não tiver os blocos esperados.
+    """
+    extractor = _TurmaExtractor()
+    extractor.feed(html)
+    extractor.close()
+    blocos = extractor.blocos
+
+    container = blocos.get("Dados Gerais")
+    if container is None:
+        raise AttributeError("Página da turma sem o bloco 'Dados Gerais'")
+    turma_data = {}
+
+    labels = []
+    for node in container.descendants():
+        # Vagas (tabela interna)
+        _linha_vagas(node, turma_data)
+        if node.tag == "span" and "label" in node.classes:
+            labels.append(node)
+
+    # Campos de texto soltos
+    for lbl in labels:
+        label_text = lbl.get_text(strip=True)
+        texto = label_text.replace(":", "")
+        valor = lbl.parent.get_text(strip=True).replace(label_text, "").strip()
+        if valor and texto not in turma_data:
+            turma_data[texto] = valor
+
+    for table_name in TABELAS:
+        turma_data[table_name] = _parse_table(blocos.get(table_name))
+
+    if "topopage" not in blocos:
+        raise AttributeError("Página da turma sem o título (topopage)")
+    turma_data["Nome"] = blocos["topopage"].get_text().split("\xa0")[1]
+
+    # Período = "1º Semestre"
+    turma_data["Semestre"] = turma_data["Período"][0]
+    del turma_data["Período"]
+
+    return turma_data
+
+def check_parity(paginas: list[tuple[str, str]], backends: list[str]) -> int:
+    """
+    Compara o resultado de cada backend com o parser de referência (BeautifulSoup + html.parser).
+    Recebe pares (nome, html) e retorna o número de divergências.
+    """
+    from scrap.get_turma_data import parse_turma_page
+
+    def resultado(html, backend):
+        try:
+            return parse_turma_page(html, backend=backend)
+        except Exception as error:
+            return f"{type(error).__name__}"
+
+    divergencias = 0
+    for nome, html in paginas:
+        esperado = resultado(html, "html.parser")
+        for backend in backends:
+            obtido = resultado(html, backend)
+            if obtido != esperado:
+                divergencias += 1
+                print(f"[{backend}] {nome}: diverge\n  esperado: {esperado}\n  obtido:   {obtido}")
+    print(f"{len(paginas)} páginas, {len(backends)} backends, {divergencias} divergências")
+    return divergencias
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description="Checa a paridade dos parsers da página da turma")
+    fonte = parser.add_mutually_exclusive_group(required=True)
+    fonte.add_argument("--check", metavar="DIR", help="Pasta com páginas turma.action gravadas (*.html)")
+    fonte.add_argument("--run", help="Execução arquivada em data/archive (ver scrap.archive)")
+    parser.add_argument("--backends", nargs="+", default=["stream", "lxml"])
+    args = parser.parse_args()
+
+    paginas = []
+    if args.run:
+        from scrap.archive import ReplaySession
+        session = ReplaySession(args.run)
+        for url in session.pages:
+            if "/turma.action?" in url:
+                paginas.append((url, session.get(url).text))
+    else:
+        for nome in sorted(os.listdir(args.check)):
+            if nome.endswith(".html"):
+                with open(os.path.join(args.check, nome), "r", encoding="utf-8") as f:
+                    paginas.append((nome, f.read()))
+
+    sys.exit(1 if check_parity(paginas, args.backends) else 0)
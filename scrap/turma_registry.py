@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import Future
+import requests
+from scrap.cache import ResponseCache
+from scrap.get_turma_data import get_turma_data
+from scrap.parse_pool import ParsePool
+from scrap.turma_model import Turma
+
+class TurmaRegistry:
+    """
+    Registro das turmas buscadas em uma execução, compartilhado entre os scrapers.
+
+    Cada turma é buscada e parseada no máximo uma vez: pedidos repetidos (ex.: turma matriculada
+    que também aparece na oferta, ou oferecida em mais de um curso) reaproveitam o resultado, e
+    pedidos simultâneos da mesma turma esperam a busca que já está em andamento (single-flight).
+    Uma busca que falhou não fica registrada, então pode ser tentada de novo.
+
+    As turmas ficam guardadas como registros compactos (scrap.turma_model.Turma), já que o
+    registro mantém todas em memória até o fim da execução.
+
+    Com `parse_pool`, o parse das turmas buscadas por `get` roda nos processos do pool.
+    """
+
+    def __init__(self, cache: ResponseCache | None = None, parse_pool: ParsePool | None = None):
+        self.cache = cache
+        self.parse_pool = parse_pool
+        self.stats = {"pedidas": 0, "buscadas": 0}
+        self._lock = threading.Lock()
+        self._turmas: dict[str, Future] = {}
+
+    def reservar(self, turma_id: str) -> tuple[Future, bool]:
+        """
+        Retorna (Future com a Turma, se o chamador é o dono da busca). Só o primeiro
+        pedido é o dono, e ele tem que concluir o Future com `concluir` ou `acompanhar`; os
+        demais só esperam o resultado.
+        """
+        with self._lock:
+            self.stats["pedidas"] += 1
+            future = self._turmas.get(turma_id)
+            dono = future is None
+            if dono:
+                future = Future()
+                self._turmas[turma_id] = future
+                self.stats["buscadas"] += 1
+        return future, dono
+
+    def concluir(self, turma_id: str, future: Future, turma_data: dict[str:str] | None = None, erro: BaseException | None = None):
+        if erro is None:
+            try:
+                turma = Turma.from_dict(turma_data)
+            except Exception as error:
+                erro = error
+        if erro is not None:
+            with self._lock:
+                del self._turmas[turma_id]
+            future.set_exception(erro)
+        else:
+            future.set_result(turma)
+
+    def acompanhar(self, turma_id: str, future: Future, origem: Future):
+        """
+        Conclui `future` com o resultado de `origem` (ex.: o parse no scrap.parse_pool) quando ele terminar.
+        """
+        def concluir(origem: Future):
+            erro = origem.exception()
+            self.concluir(turma_id, future, None if erro is not None else origem.result(), erro)
+        origem.add_done_callback(concluir)
+
+    def get(self, session: requests.Session, turma_id: str) -> dict[str:str]:
+        """
+        Retorna os dados da turma (uma cópia, que o chamador pode alterar).
+        """
+        future, dono = self.reservar(turma_id)
+        if dono:
+            try:
+                turma_data = get_turma_data(session=session, turma_id=turma_id, cache=self.cache, parse_pool=self.parse_pool)
+            except Exception as error:
+                self.concluir(turma_id, future, erro=error)
+            else:
+                self.concluir(turma_id, future, turma_data)
+
+        # Um dicionário novo, que o chamador pode alterar (os scrapers acrescentam "Período" e "Matrícula")
+        return future.result().to_dict()
+
+    def summary(self) -> str:
+        pedidas, buscadas = self.stats["pedidas"], self.stats["buscadas"]
+        return f"Turmas: {pedidas} pedidas, {buscadas} buscadas, {pedidas - buscadas} reaproveitadas"
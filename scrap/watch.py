@@ -0,0 +1,198 @@
+"""
+Acompanha as vagas de uma lista de turmas durante a matrícula.
+
+A cada ciclo, as páginas das turmas são buscadas em paralelo e só o bloco .tablevagas é lido,
+com o extrator de scrap.turma_parser (as mesmas regras do parse da turma, sem montar a árvore
+da página inteira). Páginas iguais às do ciclo anterior (ETag/304 ou mesmo
+hash do conteúdo) nem chegam ao parser. Cada mudança em Vagas Totais, Vagas Ocupadas, Total de
+Matrículas ou Total de Solicitações vira um evento, enviado para a saída padrão, um arquivo
+JSONL e/ou um webhook. Cada ciclo informa a própria latência.
+
+O webhook (--webhook) recebe um POST com a lista JSON dos eventos de cada ciclo que teve
+mudanças. Só são aceitas URLs http:// ou https:// de um endpoint local (localhost, 127.0.0.0/8
+ou ::1); para mandar os eventos a outro host é preciso pedir explicitamente com --webhook-remoto.
+
+Uso:
+    python -m scrap.watch 951522 951530 --intervalo 10
+    python -m scrap.watch --arquivo turmas.txt --jsonl data/vagas.jsonl --webhook http://127.0.0.1:8000/vagas
+"""
+import hashlib
+import ipaddress
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+import requests
+from scrap.get_turma_data import turma_url
+from scrap.profiler import medir_parse
+from scrap.turma_parser import parse_vagas_stream
+
+INTERVALO = 10.0
+MAX_WORKERS = 8
+WEBHOOK_TIMEOUT = 2
+
+@medir_parse("vagas")
+def parse_vagas(page: str) -> dict[str:str]:
+    """
+    Extrai só a tabela de vagas (.tablevagas) da página da turma, com as mesmas chaves e
+    valores que parse_turma_page (ex.: {"Vagas Totais": "40", "Vagas Ocupadas": "25", ...}).
+    """
+    try:
+        vagas = parse_vagas_stream(page)
+    except AttributeError:
+        vagas = None
+    if not vagas:
+        raise ValueError("Página da turma sem a tabela de vagas (erro do portal ou sessão expirada?)")
+    return vagas
+
+def validar_webhook(url: str, remoto: bool = False) -> str:
+    """
+    Retorna a URL do webhook se ela for http(s) com host e, sem `remoto`, se o host só resolver
+    para endereços de loopback (localhost, 127.0.0.0/8, ::1); senão levanta ValueError.
+    """
+    partes = urlsplit(url)
+    if partes.scheme not in ("http", "https") or not partes.hostname:
+        raise ValueError(f"Webhook inválido: {url!r} (use uma URL http:// ou https://)")
+    if remoto:
+        return url
+    try:
+        enderecos = {info[4][0] for info in socket.getaddrinfo(partes.hostname, partes.port or 0, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, ValueError) as error:
+        raise ValueError(f"Webhook inválido: {url!r} (host não resolvido: {error})")
+    if not all(ipaddress.ip_address(endereco.split("%")[0]).is_loopback for endereco in enderecos):
+        raise ValueError(f"Webhook {url!r} não é local (use --webhook-remoto para enviar a outro host)")
+    return url
+
+class VagasWatcher:
+    """
+    Guarda o último estado de cada turma e compara com o de cada novo ciclo.
+    """
+
+    def __init__(self, session: requests.Session, turma_ids: list[str], workers: int = MAX_WORKERS):
+        self.session = session
+        self.turma_ids = list(dict.fromkeys(turma_ids))
+        self.workers = workers
+        # turma_id -> (etag, hash do conteúdo, vagas)
+        self._estado: dict[str, tuple[str | None, str, dict[str:str]]] = {}
+
+    def _checar(self, turma_id: str) -> tuple[str, dict[str:str] | None, dict[str:str] | None]:
+        """
+        Retorna (situação, vagas anteriores, vagas atuais); situação é "igual", "mudou", "nova" ou "erro".
+        """
+        anterior = self._estado.get(turma_id)
+        headers = {"If-None-Match": anterior[0]} if anterior and anterior[0] else {}
+        try:
+            response = self.session.get(turma_url(turma_id), headers=headers)
+            if response.status_code == 304 and anterior:
+                return "igual", anterior[2], anterior[2]
+            response.raise_for_status()
+            conteudo_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+            if anterior and anterior[1] == conteudo_hash:
+                return "igual", anterior[2], anterior[2]
+            vagas = parse_vagas(response.text)
+        except Exception as error:
+            print(f"Erro ao checar vagas da turma {turma_id}: {error}")
+            return "erro", None, None
+
+        self._estado[turma_id] = (response.headers.get("ETag"), conteudo_hash, vagas)
+        if anterior is None:
+            return "nova", None, vagas
+        return ("igual" if vagas == anterior[2] else "mudou"), anterior[2], vagas
+
+    def ciclo(self) -> tuple[list[dict], dict[str, int], float]:
+        """
+        Checa todas as turmas uma vez. Retorna (eventos de mudança, contagem por situação, segundos).
+        """
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            resultados = list(executor.map(self._checar, self.turma_ids))
+        duracao = time.perf_counter() - inicio
+
+        agora = datetime.now().isoformat(timespec="seconds")
+        contagem = {"igual": 0, "mudou": 0, "nova": 0, "erro": 0}
+        eventos = []
+        for turma_id, (situacao, antes, depois) in zip(self.turma_ids, resultados):
+            contagem[situacao] += 1
+            if situacao == "mudou":
+                mudancas = {campo: [antes.get(campo), valor] for campo, valor in depois.items() if antes.get(campo) != valor}
+                eventos.append({"turma": turma_id, "em": agora, "mudancas": mudancas, "vagas": depois})
+        return eventos, contagem, duracao
+
+def _emitir(eventos: list[dict], jsonl_path: str | None, webhook: str | None):
+    for evento in eventos:
+        mudancas = ", ".join(f"{campo}: {antes} -> {depois}" for campo, (antes, depois) in evento["mudancas"].items())
+        print(f"[{evento['em']}] Turma {evento['turma']}: {mudancas}")
+    if not eventos:
+        return
+    if jsonl_path:
+        with open(jsonl_path, "a", encoding="utf-8") as f:
+            for evento in eventos:
+                f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+    if webhook:
+        try:
+            requests.post(webhook, json=eventos, timeout=WEBHOOK_TIMEOUT)
+        except requests.RequestException as error:
+            print(f"Erro ao enviar eventos para {webhook}: {error}")
+
+def watch(session: requests.Session, turma_ids: list[str], intervalo: float = INTERVALO, jsonl_path: str | None = None, webhook: str | None = None, ciclos: int | None = None, workers: int = MAX_WORKERS, webhook_remoto: bool = False) -> list[float]:
+    """
+    Checa as vagas das turmas a cada `intervalo` segundos (contados do início de cada ciclo),
+    até Ctrl+C ou `ciclos` ciclos. Retorna a duração de cada ciclo.
+    O webhook tem que ser local, a não ser com `webhook_remoto` (ver validar_webhook).
+    """
+    if webhook:
+        validar_webhook(webhook, remoto=webhook_remoto)
+    watcher = VagasWatcher(session, turma_ids, workers=workers)
+    duracoes = []
+    print(f"Acompanhando {len(watcher.turma_ids)} turmas a cada {intervalo:g}s")
+    try:
+        while ciclos is None or len(duracoes) < ciclos:
+            inicio = time.monotonic()
+            eventos, contagem, duracao = watcher.ciclo()
+            duracoes.append(duracao)
+            _emitir(eventos, jsonl_path, webhook)
+            print(
+                f"Ciclo {len(duracoes)}: {len(watcher.turma_ids)} turmas em {duracao * 1000:.0f} ms "
+                f"({contagem['mudou']} mudaram, {contagem['igual']} iguais, {contagem['nova']} novas, {contagem['erro']} erros)"
+            )
+            if ciclos is not None and len(duracoes) >= ciclos:
+                break
+            time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+    except KeyboardInterrupt:
+        pass
+    if duracoes:
+        ordenadas = sorted(duracoes)
+        print(f"Latência por ciclo: mediana {ordenadas[len(ordenadas) // 2] * 1000:.0f} ms, máxima {ordenadas[-1] * 1000:.0f} ms")
+    return duracoes
+
+if __name__ == "__main__":
+    import argparse
+    from scrap.login import login
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("turmas", nargs="*", help="Ids das turmas")
+    parser.add_argument("--arquivo", help="Arquivo com um id de turma por linha")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO, help="Segundos entre o início de cada ciclo")
+    parser.add_argument("--jsonl", help="Anexa os eventos de mudança a este arquivo")
+    parser.add_argument("--webhook", help="Envia os eventos (POST com lista JSON) para esta URL http(s) local")
+    parser.add_argument("--webhook-remoto", action="store_true", help="Aceita um --webhook em outro host (não local)")
+    parser.add_argument("--ciclos", type=int, help="Para depois de N ciclos")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    turma_ids = list(args.turmas)
+    if args.arquivo:
+        with open(args.arquivo, "r") as f:
+            turma_ids += [linha.strip() for linha in f if linha.strip()]
+    if not turma_ids:
+        parser.error("informe ao menos uma turma")
+    if args.webhook:
+        try:
+            validar_webhook(args.webhook, remoto=args.webhook_remoto)
+        except ValueError as error:
+            parser.error(str(error))
+
+    user_data, session = login()
+    watch(session, turma_ids, intervalo=args.intervalo, jsonl_path=args.jsonl, webhook=args.webhook, ciclos=args.ciclos, workers=args.workers, webhook_remoto=args.webhook_remoto)
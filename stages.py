@@ -0,0 +1,118 @@
+"""
+Agendador de etapas com dependências, usado pelo main.py.
+
+Cada etapa declara de quais outras depende e recebe os resultados delas como argumentos nomeados.
+Uma etapa começa assim que todas as suas dependências terminam, em paralelo com as demais
+(threads: as etapas do scraper passam a maior parte do tempo esperando a rede). No fim, o
+relatório mostra quando cada etapa rodou e o caminho crítico: a cadeia de dependências que
+determinou o tempo total.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable
+
+@dataclass
+class Etapa:
+    nome: str
+    func: Callable
+    depende: tuple[str, ...] = ()
+    inicio: float | None = field(default=None, compare=False)
+    fim: float | None = field(default=None, compare=False)
+
+    @property
+    def duracao(self) -> float:
+        return (self.fim - self.inicio) if self.inicio is not None and self.fim is not None else 0.0
+
+class StageScheduler:
+    """
+    Roda as etapas registradas com `add` respeitando as dependências.
+
+    Se uma etapa falha, as que dependem dela (direta ou indiretamente) não rodam; as demais
+    continuam sendo iniciadas, e `run` levanta o primeiro erro depois que todas terminam.
+    `medir(nome)`, se informado, é um context manager em volta de cada etapa (ex.: scrap.profiler.etapa).
+    """
+
+    def __init__(self, max_workers: int | None = None, medir: Callable | None = None):
+        self.etapas: dict[str, Etapa] = {}
+        self.max_workers = max_workers
+        self.medir = medir or (lambda nome: nullcontext())
+        self._inicio = None
+
+    def add(self, nome: str, func: Callable, depende: tuple[str, ...] = ()):
+        faltando = [d for d in depende if d not in self.etapas]
+        if faltando:
+            raise ValueError(f"Etapa {nome} depende de etapas não registradas: {', '.join(faltando)}")
+        self.etapas[nome] = Etapa(nome, func, tuple(depende))
+
+    def _rodar(self, etapa: Etapa, resultados: dict):
+        etapa.inicio = time.perf_counter() - self._inicio
+        try:
+            with self.medir(etapa.nome):
+                return etapa.func(**{d: resultados[d] for d in etapa.depende})
+        finally:
+            etapa.fim = time.perf_counter() - self._inicio
+
+    def run(self) -> dict[str, object]:
+        """
+        Roda todas as etapas e retorna {nome: resultado}.
+        """
+        self._inicio = time.perf_counter()
+        resultados = {}
+        pendentes = dict(self.etapas)
+        rodando = {}
+        # Etapas que falharam ou que não vão rodar porque dependem (direta ou indiretamente) de uma que falhou
+        falhas = set()
+        erro = None
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(self.etapas) or 1) as executor:
+            while pendentes or rodando:
+                # Em ordem de registro, então uma dependência é sempre vista antes de quem depende dela
+                for nome, etapa in list(pendentes.items()):
+                    if any(d in falhas for d in etapa.depende):
+                        del pendentes[nome]
+                        falhas.add(nome)
+                    elif all(d in resultados for d in etapa.depende):
+                        del pendentes[nome]
+                        rodando[executor.submit(self._rodar, etapa, resultados)] = nome
+                if not rodando:
+                    break
+                prontos, _ = wait(rodando, return_when=FIRST_COMPLETED)
+                for future in prontos:
+                    nome = rodando.pop(future)
+                    try:
+                        resultados[nome] = future.result()
+                    except BaseException as error:
+                        falhas.add(nome)
+                        erro = erro or error
+        if erro is not None:
+            raise erro
+        return resultados
+
+    def caminho_critico(self) -> list[Etapa]:
+        """
+        Parte da etapa que terminou por último e volta, a cada passo, pela dependência que terminou
+        mais tarde (a que a segurou). A soma das durações desse caminho é o tempo total.
+        """
+        terminadas = [etapa for etapa in self.etapas.values() if etapa.fim is not None]
+        if not terminadas:
+            return []
+        etapa = max(terminadas, key=lambda e: e.fim)
+        caminho = [etapa]
+        while etapa.depende:
+            etapa = max((self.etapas[d] for d in etapa.depende), key=lambda e: e.fim or 0.0)
+            caminho.append(etapa)
+        return caminho[::-1]
+
+    def summary(self) -> str:
+        terminadas = [etapa for etapa in self.etapas.values() if etapa.fim is not None]
+        if not terminadas:
+            return "Etapas: nenhuma rodou"
+        total = max(etapa.fim for etapa in terminadas)
+        soma = sum(etapa.duracao for etapa in terminadas)
+        linhas = [f"Etapas: {total:.2f}s no total, {soma:.2f}s somando todas ({soma / total if total else 1:.1f}x de paralelismo)"]
+        for etapa in sorted(terminadas, key=lambda e: e.inicio):
+            linhas.append(f"  {etapa.nome:<34} {etapa.inicio:7.2f}s -> {etapa.fim:7.2f}s  ({etapa.duracao:.2f}s)")
+        caminho = self.caminho_critico()
+        linhas.append("Caminho crítico: " + " -> ".join(f"{etapa.nome} ({etapa.duracao:.2f}s)" for etapa in caminho))
+        return "\n".join(linhas)
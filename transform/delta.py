@@ -0,0 +1,433 @@
+"""
+Delta entre duas versões do output/matricula_data.json.
+
+A cada execução, run_transformation_stream compara as turmas novas com as do arquivo anterior,
+pelo id da turma, e grava ao lado da saída:
+- matricula_data.delta.json: o que mudou desde a versão anterior: turmas novas (completas),
+  turmas removidas (ids) e, das que mudaram, só os campos alterados (ex.: "occupancy", "slots",
+  "professors") em "changed" e os campos que deixaram de existir em "removed_fields", com o hash
+  novo de cada uma; "user", "prerequisites" e "metadata" entram
+  inteiros se mudaram. "base" é o hash da versão anterior e "hash" o da nova, para que o
+  consumidor só aplique o delta sobre a versão que tem;
+- matricula_data.hashes.json: o hash do conteúdo de cada turma e o da versão inteira, e em
+  "checked_at" a hora da última execução que conferiu a saída.
+
+Se nada mudou (fora a data de atualização), a saída não é reescrita e o delta da execução anterior
+é apagado, para não parecer uma mudança nova; só o "checked_at" dos hashes avança, para o
+consumidor saber que a versão que tem ainda é a atual.
+
+A comparação não carrega a versão anterior inteira: os hashes dela vêm do .hashes.json, e o
+conteúdo antigo só é lido (em streaming) para as turmas cujo hash mudou. Das turmas novas,
+ficam em memória só as que entram no delta.
+
+Uma turma que aparece duas vezes em "courses" (disponível e também matriculada) tem a segunda
+ocorrência identificada como "<id>#2". Os deltas dizem o que mudou em cada turma, não a
+posição dela na lista.
+
+Uso (delta entre dois arquivos quaisquer, conferindo que aplicá-lo dá o segundo):
+    python -m transform.delta output/antigo.json output/matricula_data.json
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
+DELTA_SUFIXO = ".delta.json"
+HASHES_SUFIXO = ".hashes.json"
+# Campos contados separadamente no resumo do delta
+CAMPOS_RESUMO = ("occupancy", "slots", "professors")
+# Bytes lidos por vez da versão anterior
+BLOCO_LEITURA = 1 << 16
+# Campo que não existe na versão anterior da turma (None é um valor válido)
+_AUSENTE = object()
+
+def hash_texto(texto: str) -> str:
+    return hashlib.blake2b(texto.encode(), digest_size=8).hexdigest()
+
+def hash_course(course: dict) -> str:
+    """
+    Hash do conteúdo da turma: o do texto que json.dump(..., indent=4) escreve para ela.
+    """
+    return hash_texto(json.dumps(course, indent=4))
+
+def _caminho(output_path: str, sufixo: str) -> str:
+    return os.path.splitext(output_path)[0] + sufixo
+
+def chaves(courses: Iterable[dict]) -> Iterator[tuple[str, dict]]:
+    """
+    (chave, turma) na ordem da lista: o id, ou "<id>#n" na n-ésima ocorrência de um id repetido.
+    """
+    vistas = {}
+    for course in courses:
+        n = vistas[course["id"]] = vistas.get(course["id"], 0) + 1
+        yield (course["id"] if n == 1 else f"{course['id']}#{n}"), course
+
+def _partes(metadata: dict, user: dict, prerequisites: dict) -> dict[str, str]:
+    """
+    O que se compara do documento além das turmas: o semestre e os hashes de "user" e "prerequisites".
+    """
+    return {
+        "semester": metadata.get("semester"),
+        "user": hash_texto(json.dumps(user)),
+        "prerequisites": hash_texto(json.dumps(prerequisites)),
+    }
+
+class _HashDocumento:
+    """
+    Hash da versão inteira, calculado à medida que as turmas passam: as turmas (chave e hash, na
+    ordem) e o resto do documento, sem a data de atualização.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=8)
+
+    def add(self, chave: str, h: str):
+        self._hash.update(f"{chave}:{h}\n".encode())
+
+    def hexdigest(self, metadata: dict, user: dict, prerequisites: dict) -> str:
+        self._hash.update(json.dumps([metadata.get("semester"), user, prerequisites]).encode())
+        return self._hash.hexdigest()
+
+def iter_courses(path: str, resto: dict | None = None) -> Iterator[dict]:
+    """
+    Lê as turmas ("courses") de um output/matricula_data.json uma a uma, sem carregar o arquivo
+    inteiro. Se `resto` for dado, ao fim da leitura ele recebe as demais chaves do documento
+    ("version", "metadata", "user", "prerequisites").
+    Raises json.JSONDecodeError se o arquivo não tiver esse formato.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        texto = ""
+        inicio = -1
+        while inicio == -1:
+            bloco = f.read(BLOCO_LEITURA)
+            if not bloco:
+                raise json.JSONDecodeError('Sem a lista "courses"', texto, len(texto))
+            texto += bloco
+            marca = texto.find('"courses"')
+            inicio = texto.find("[", marca) if marca != -1 else -1
+        if resto is not None:
+            # Tudo antes de "courses" ("version" e "metadata"), fechado como um objeto
+            resto.update(json.loads(texto[:marca].rstrip().rstrip(",") + "}"))
+        pos = inicio + 1
+        while True:
+            while pos < len(texto) and texto[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(texto) and texto[pos] == "]":
+                break
+            try:
+                course, fim = decoder.raw_decode(texto, pos)
+            except json.JSONDecodeError:
+                # Turma cortada no fim do bloco: lê mais e tenta de novo
+                bloco = f.read(BLOCO_LEITURA)
+                if not bloco:
+                    raise
+                texto = texto[pos:] + bloco
+                pos = 0
+                continue
+            yield course
+            pos = fim
+        if resto is not None:
+            # Depois de "courses": ', "user": ..., "prerequisites": ...}'
+            resto.update(json.loads("{" + (texto[pos + 1:] + f.read()).lstrip().lstrip(",")))
+
+class DeltaBuilder:
+    """
+    Monta o delta turma a turma, à medida que a nova versão é escrita.
+
+    A versão anterior entra como `anteriores` (chave -> hash de cada turma), `partes` (ver _partes)
+    e `base` (o hash dela), mais `ler_anteriores`, que devolve o conteúdo antigo de um conjunto
+    de chaves (só chamado para as turmas que mudaram). Sem versão anterior, `anteriores` é None
+    e nada é guardado além dos hashes novos.
+
+    Com `hashes_path`, os hashes novos vão direto para `hashes_path`.tmp, que `salvar` troca pelo
+    arquivo de hashes; sem ele, ficam em `hashes` (ex.: o diff entre dois arquivos da linha de comando).
+    """
+
+    def __init__(
+        self,
+        anteriores: dict[str, str] | None = None,
+        partes: dict | None = None,
+        base: str | None = None,
+        ler_anteriores: Callable[[set[str]], dict[str, dict]] | None = None,
+        hashes_path: str | None = None,
+    ):
+        self.anteriores = anteriores
+        self.partes = partes or {}
+        self.base = base
+        self._ler_anteriores = ler_anteriores
+        self._hash = _HashDocumento()
+        self._vistas: dict[str, int] = {}
+        self.total = 0
+        self.hashes: dict[str, str] | None = None
+        self.hashes_path = hashes_path
+        self._arquivo_hashes = None
+        if hashes_path is not None:
+            self._arquivo_hashes = open(hashes_path + ".tmp", "w")
+            self._arquivo_hashes.write('{\n    "courses": {')
+        else:
+            self.hashes = {}
+        self.added: dict[str, dict] = {}
+        # Turmas cujo hash mudou: a versão nova inteira, até `finish` comparar com a antiga
+        self._alteradas: dict[str, dict] = {}
+        self.novos_hashes: dict[str, str] = {}
+        self.contagem = {campo: 0 for campo in CAMPOS_RESUMO}
+
+    @classmethod
+    def do_documento(cls, anterior: dict | None, **kwargs) -> "DeltaBuilder":
+        """
+        Versão anterior já carregada (o documento inteiro), ou None.
+        """
+        if anterior is None:
+            return cls(**kwargs)
+        hash_documento = _HashDocumento()
+        anteriores = {}
+        for chave, course in chaves(anterior["courses"]):
+            anteriores[chave] = hash_course(course)
+            hash_documento.add(chave, anteriores[chave])
+        metadata, user, prerequisites = anterior.get("metadata", {}), anterior.get("user"), anterior.get("prerequisites")
+        return cls(
+            anteriores,
+            _partes(metadata, user, prerequisites),
+            hash_documento.hexdigest(metadata, user, prerequisites),
+            lambda pedidas: {chave: course for chave, course in chaves(anterior["courses"]) if chave in pedidas},
+            **kwargs,
+        )
+
+    @classmethod
+    def do_arquivo(cls, output_path: str) -> "DeltaBuilder":
+        """
+        Usa como versão anterior o arquivo `output_path`, se existir. Os hashes vêm do arquivo de
+        hashes gravado ao lado dele; se não houver (ou for de outra versão), são recalculados
+        lendo as turmas uma a uma.
+        """
+        hashes_path = _caminho(output_path, HASHES_SUFIXO)
+        if not os.path.exists(output_path):
+            return cls(hashes_path=hashes_path)
+
+        def ler_anteriores(pedidas: set[str]) -> dict[str, dict]:
+            return {chave: course for chave, course in chaves(iter_courses(output_path)) if chave in pedidas}
+
+        # Hashes mais antigos que a saída são de outra versão (ex.: gravada sem delta)
+        if os.path.exists(hashes_path) and os.path.getmtime(hashes_path) >= os.path.getmtime(output_path):
+            try:
+                with open(hashes_path, "r") as f:
+                    salvos = json.load(f)
+                return cls(salvos["courses"], salvos["partes"], salvos["hash"], ler_anteriores, hashes_path)
+            except (ValueError, KeyError):
+                pass
+
+        resto = {}
+        hash_documento = _HashDocumento()
+        anteriores = {}
+        try:
+            for chave, course in chaves(iter_courses(output_path, resto)):
+                anteriores[chave] = hash_course(course)
+                hash_documento.add(chave, anteriores[chave])
+        except (json.JSONDecodeError, KeyError):
+            print(f"{output_path} inválido: a próxima versão é gravada sem delta")
+            return cls(hashes_path=hashes_path)
+        metadata, user, prerequisites = resto.get("metadata", {}), resto.get("user"), resto.get("prerequisites")
+        return cls(
+            anteriores,
+            _partes(metadata, user, prerequisites),
+            hash_documento.hexdigest(metadata, user, prerequisites),
+            ler_anteriores,
+            hashes_path,
+        )
+
+    def add(self, course: dict, texto: str | None = None):
+        """
+        Registra uma turma da nova versão. `texto` é o json.dumps(course, indent=4) já calculado, se houver.
+        """
+        n = self._vistas[course["id"]] = self._vistas.get(course["id"], 0) + 1
+        chave = course["id"] if n == 1 else f"{course['id']}#{n}"
+        h = hash_texto(texto) if texto is not None else hash_course(course)
+        self._hash.add(chave, h)
+        if self._arquivo_hashes is not None:
+            self._arquivo_hashes.write(("," if self.total else "") + f"\n        {json.dumps(chave)}: {json.dumps(h)}")
+        else:
+            self.hashes[chave] = h
+        self.total += 1
+
+        if self.anteriores is None:
+            return
+        antigo = self.anteriores.pop(chave, None)
+        if antigo is None:
+            self.added[chave] = course
+            self.novos_hashes[chave] = h
+        elif antigo != h:
+            self._alteradas[chave] = course
+            self.novos_hashes[chave] = h
+
+    def finish(self, metadata: dict, user: dict, prerequisites: dict) -> dict | None:
+        """
+        Delta da versão anterior para a nova, ou None se nada mudou (fora a data de atualização).
+        Sem versão anterior, só "base" (None) e "hash".
+        """
+        novo_hash = self._hash.hexdigest(metadata, user, prerequisites)
+        partes = self.partes_novas = _partes(metadata, user, prerequisites)
+        self.novo_hash = novo_hash
+        if self.anteriores is None:
+            return {"base": None, "hash": novo_hash}
+
+        documento = {}
+        if partes["semester"] != self.partes.get("semester"):
+            documento["metadata"] = metadata
+        if partes["user"] != self.partes.get("user"):
+            documento["user"] = user
+        if partes["prerequisites"] != self.partes.get("prerequisites"):
+            documento["prerequisites"] = prerequisites
+
+        changed = {}
+        removed_fields = {}
+        antigas = self._ler_anteriores(set(self._alteradas)) if self._alteradas else {}
+        for chave, course in self._alteradas.items():
+            antigo = antigas.get(chave, {})
+            campos = {campo: valor for campo, valor in course.items() if antigo.get(campo, _AUSENTE) != valor}
+            sairam = sorted(antigo.keys() - course.keys())
+            if not (campos or sairam):
+                # Mesmo conteúdo em outra ordem de chaves
+                del self.novos_hashes[chave]
+                continue
+            if campos:
+                changed[chave] = campos
+            if sairam:
+                removed_fields[chave] = sairam
+            for campo in CAMPOS_RESUMO:
+                if campo in campos or campo in sairam:
+                    self.contagem[campo] += 1
+
+        removed = list(self.anteriores)
+        if not (self.added or removed or changed or removed_fields or documento):
+            return None
+        return {
+            "base": self.base,
+            "hash": novo_hash,
+            "added": self.added,
+            "removed": removed,
+            "changed": changed,
+            "removed_fields": removed_fields,
+            "hashes": self.novos_hashes,
+            **documento,
+        }
+
+    def salvar(self, output_path: str, delta: dict | None) -> str:
+        """
+        Grava os hashes (com a hora desta checagem) e, se houve versão anterior e mudanças, o delta
+        ao lado de `output_path`, depois da saída. Sem mudanças ou sem versão anterior, um delta
+        antigo é apagado. Retorna o caminho do delta.
+        """
+        delta_path = _caminho(output_path, DELTA_SUFIXO)
+        if self._arquivo_hashes is not None:
+            try:
+                self._arquivo_hashes.write(
+                    "\n    },\n"
+                    f'    "hash": {json.dumps(self.novo_hash)},\n'
+                    f'    "partes": {json.dumps(self.partes_novas)},\n'
+                    f'    "checked_at": {json.dumps(datetime.now().isoformat(timespec="seconds"))}\n}}'
+                )
+                self._arquivo_hashes.close()
+                os.replace(self.hashes_path + ".tmp", self.hashes_path)
+            except BaseException:
+                self.descartar()
+                raise
+        if delta is None or self.anteriores is None:
+            # Nada mudou (o delta anterior não descreve esta checagem) ou não há base (o delta seria o documento inteiro)
+            if os.path.exists(delta_path):
+                os.remove(delta_path)
+            return delta_path
+        with open(delta_path, "w") as f:
+            json.dump(delta, f, indent=4)
+        return delta_path
+
+    def descartar(self):
+        """
+        Fecha e apaga o arquivo temporário de hashes (ex.: a escrita da saída falhou no meio).
+        """
+        if self._arquivo_hashes is None:
+            return
+        self._arquivo_hashes.close()
+        try:
+            os.unlink(self.hashes_path + ".tmp")
+        except OSError:
+            pass
+        self._arquivo_hashes = None
+
+    def summary(self, delta: dict | None) -> str:
+        if delta is None:
+            return "Delta: nada mudou desde a versão anterior (arquivo mantido)"
+        if self.anteriores is None:
+            return f"Delta: primeira versão ({self.total} turmas)"
+        return (
+            f"Delta: {len(delta['added'])} turmas novas, {len(delta['removed'])} removidas, {len(delta['changed'].keys() | delta['removed_fields'].keys())} alteradas "
+            f"({', '.join(f'{campo} {n}' for campo, n in self.contagem.items())})"
+        )
+
+def diff(anterior: dict | None, novo: dict) -> dict | None:
+    """
+    Delta entre dois documentos completos (o formato de output/matricula_data.json).
+    """
+    builder = DeltaBuilder.do_documento(anterior)
+    for _, course in chaves(novo["courses"]):
+        builder.add(course)
+    return builder.finish(novo["metadata"], novo["user"], novo["prerequisites"])
+
+def aplicar(documento: dict, delta: dict) -> dict:
+    """
+    Aplica `delta` ao `documento` (a versão "base" do delta) e retorna a nova versão. As turmas
+    alteradas ficam na mesma posição; as novas vão para o fim da lista.
+    """
+    removidas = set(delta["removed"])
+    removed_fields = delta.get("removed_fields", {})
+    courses = []
+    for chave, course in chaves(documento["courses"]):
+        if chave in removidas:
+            continue
+        if chave in delta["changed"]:
+            course = {**course, **delta["changed"][chave]}
+        if chave in removed_fields:
+            course = {campo: valor for campo, valor in course.items() if campo not in removed_fields[chave]}
+        courses.append(course)
+    courses.extend(delta["added"].values())
+    novo = {**documento, "courses": courses}
+    for nome in ("metadata", "user", "prerequisites"):
+        if nome in delta:
+            novo[nome] = delta[nome]
+    return novo
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("anterior")
+    parser.add_argument("novo")
+    parser.add_argument("--saida", metavar="ARQUIVO", help="Grava o delta em JSON")
+    args = parser.parse_args()
+
+    with open(args.anterior, "r") as f:
+        anterior = json.load(f)
+    with open(args.novo, "r") as f:
+        novo = json.load(f)
+
+    inicio = time.perf_counter()
+    delta = diff(anterior, novo)
+    tempo = time.perf_counter() - inicio
+    if delta is None:
+        print("Nada mudou")
+    else:
+        tamanho = len(json.dumps(delta))
+        print(
+            f"{len(delta['added'])} turmas novas, {len(delta['removed'])} removidas, {len(delta['changed'].keys() | delta['removed_fields'].keys())} alteradas "
+            f"| delta {tamanho / 1024:.1f} KB ({tamanho / max(len(json.dumps(novo)), 1):.1%} do documento) em {tempo * 1000:.1f} ms"
+        )
+        aplicado = aplicar(anterior, delta)
+        confere = dict(chaves(aplicado["courses"])) == dict(chaves(novo["courses"])) and all(
+            aplicado[nome] == novo[nome] for nome in ("user", "prerequisites")
+        )
+        print(f"Aplicar o delta sobre o anterior dá o novo: {'sim' if confere else 'NÃO'}")
+        if args.saida:
+            with open(args.saida, "w") as f:
+                json.dump(delta, f, indent=4)
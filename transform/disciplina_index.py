@@ -0,0 +1,158 @@
+import difflib
+import time
+from scrap.texto import clean_str
+
+# Palavras ignoradas na chave "solta" usada para aliases e correspondência aproximada
+STOPWORDS = {"A", "AS", "O", "OS", "DE", "DA", "DAS", "DO", "DOS", "E", "EM", "NA", "NO", "PARA"}
+ROMANOS = {"I": "1", "II": "2", "III": "3", "IV": "4", "V": "5", "VI": "6", "VII": "7", "VIII": "8", "IX": "9", "X": "10"}
+# Semelhança mínima (difflib) para aceitar uma correspondência aproximada
+FUZZY_CUTOFF = 0.88
+
+def chave_solta(nome_limpo: str) -> str:
+    """
+    Chave para aliases: sem stopwords e com numerais romanos trocados por arábicos
+    (ex.: "ALGEBRA LINEAR II" e "ALGEBRA LINEAR 2" -> "ALGEBRA LINEAR 2").
+    """
+    return " ".join(ROMANOS.get(token, token) for token in nome_limpo.replace("-", " ").split() if token not in STOPWORDS)
+
+def _numerais(chave: str) -> tuple[str, ...]:
+    return tuple(token for token in chave.split() if token.isdigit())
+
+class DisciplinaIndex:
+    """
+    Índice das disciplinas do currículo, montado uma vez por execução.
+
+    Os nomes do currículo são normalizados na criação. A busca por um nome (já limpo com clean_str)
+    tenta, nesta ordem: o nome exato, os aliases explícitos (curriculum/aliases.json), a chave solta
+    ("II" x "2" e "de"/"da"; contada como alias) e, por último, o nome mais parecido (difflib) entre
+    os que têm os mesmos números (para que "CALCULO I" nunca case com "CALCULO II"). O resultado de
+    cada nome é memorizado.
+
+    Pode ser usado no lugar do dicionário de requisitos: `get(nome)` e `nome in index`.
+    """
+
+    def __init__(self, requisitos: list[dict], aliases: dict[str, str] | None = None):
+        inicio = time.perf_counter()
+        self.entradas: dict[str, dict] = {}
+        for disciplina in requisitos:
+            self.entradas[clean_str(disciplina["disciplina"])] = {
+                "pre_requisitos": [clean_str(pre_requisito) for pre_requisito in disciplina["pre_requisitos"]],
+                "periodo": disciplina["periodo"],
+            }
+
+        self._por_chave_solta: dict[str, str] = {}
+        self._por_numerais: dict[tuple[str, ...], list[tuple[str, str]]] = {}
+        for nome in self.entradas:
+            chave = chave_solta(nome)
+            self._por_chave_solta.setdefault(chave, nome)
+            self._por_numerais.setdefault(_numerais(chave), []).append((chave, nome))
+        self._aliases = {
+            clean_str(alias): clean_str(nome) for alias, nome in (aliases or {}).items() if clean_str(nome) in self.entradas
+        }
+
+        self._resolvidos: dict[str, tuple[str | None, str]] = {}
+        self.stats = {"exatas": 0, "aliases": 0, "aproximadas": 0, "sem_correspondencia": 0}
+        self.tempo_montagem = time.perf_counter() - inicio
+        self.tempo_busca = 0.0
+
+    def _resolver(self, nome: str) -> tuple[str | None, str]:
+        if nome in self.entradas:
+            return nome, "exatas"
+        if nome in self._aliases:
+            return self._aliases[nome], "aliases"
+        chave = chave_solta(nome)
+        if chave in self._por_chave_solta:
+            return self._por_chave_solta[chave], "aliases"
+        candidatos = self._por_numerais.get(_numerais(chave), [])
+        melhor, melhor_nota = None, FUZZY_CUTOFF
+        matcher = difflib.SequenceMatcher(b=chave, autojunk=False)
+        for chave_candidato, nome_candidato in candidatos:
+            matcher.set_seq1(chave_candidato)
+            # real_quick_ratio/quick_ratio são limites superiores baratos: descartam a maioria sem o cálculo completo
+            if matcher.real_quick_ratio() < melhor_nota or matcher.quick_ratio() < melhor_nota:
+                continue
+            nota = matcher.ratio()
+            if nota >= melhor_nota:
+                melhor, melhor_nota = nome_candidato, nota
+        if melhor is not None:
+            return melhor, "aproximadas"
+        return None, "sem_correspondencia"
+
+    def resolve(self, nome: str, contar: bool = True) -> str | None:
+        """
+        Nome do currículo correspondente a `nome` (já limpo), ou None.
+        Com contar=False a busca não entra em `stats` nem no tempo de busca (ex.: as buscas
+        internas do grafo de pré-requisitos, que repetiriam os nomes das turmas).
+        """
+        inicio = time.perf_counter()
+        resolvido = self._resolvidos.get(nome)
+        if resolvido is None:
+            resolvido = self._resolver(nome)
+            self._resolvidos[nome] = resolvido
+        if contar:
+            self.stats[resolvido[1]] += 1
+            self.tempo_busca += time.perf_counter() - inicio
+        return resolvido[0]
+
+    def get(self, nome: str, default=None) -> dict | None:
+        encontrado = self.resolve(nome)
+        return self.entradas[encontrado] if encontrado is not None else default
+
+    def __contains__(self, nome: str) -> bool:
+        return self.resolve(nome) is not None
+
+    def aproximadas(self) -> dict[str, str]:
+        """
+        Nomes resolvidos por alias ou por semelhança (nome buscado -> nome do currículo), para conferência.
+        """
+        return {nome: encontrado for nome, (encontrado, tipo) in self._resolvidos.items() if tipo in ("aliases", "aproximadas")}
+
+    def summary(self) -> str:
+        total = sum(self.stats.values())
+        encontradas = total - self.stats["sem_correspondencia"]
+        taxa = 100 * encontradas / total if total else 0.0
+        return (
+            f"Disciplinas: {len(self.entradas)} no currículo, {total} buscas, {taxa:.1f}% encontradas "
+            f"({self.stats['exatas']} exatas, {self.stats['aliases']} por alias, {self.stats['aproximadas']} aproximadas, "
+            f"{self.stats['sem_correspondencia']} sem correspondência) | montagem {self.tempo_montagem * 1000:.2f} ms, "
+            f"buscas {self.tempo_busca * 1000:.2f} ms, {len(self._resolvidos)} nomes distintos"
+        )
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import timeit
+    from scrap.texto import _clean_str_referencia
+
+    # Confere clean_str com a implementação original e mostra como os nomes raspados casam com o currículo
+    with open("curriculum/requisitos.json", "r") as f:
+        requisitos = json.load(f)
+    nomes = [d["disciplina"] for d in requisitos] + [p for d in requisitos for p in d["pre_requisitos"]]
+    turmas_path = sys.argv[1] if len(sys.argv) > 1 else "data/turmas_disponiveis_data.json"
+    try:
+        with open(turmas_path, "r") as f:
+            turmas = json.load(f)
+    except OSError:
+        turmas = {}
+    disciplinas_turmas = [t["Disciplina"] for t in turmas.values()]
+    nomes += disciplinas_turmas + [t["Curso"] for t in turmas.values()]
+
+    divergentes = [n for n in nomes if clean_str(n) != _clean_str_referencia(n)]
+    print(f"clean_str: {len(nomes)} nomes, {len(divergentes)} divergências da implementação original")
+    for nome in divergentes[:10]:
+        print(f"  {nome!r}: {clean_str(nome)!r} != {_clean_str_referencia(nome)!r}")
+
+    n = 5
+    original = timeit.timeit(lambda: [_clean_str_referencia(x) for x in nomes], number=n) / n
+    clean_str.cache_clear()
+    rapida = timeit.timeit(lambda: [clean_str.__wrapped__(x) for x in nomes], number=n) / n
+    memorizada = timeit.timeit(lambda: [clean_str(x) for x in nomes], number=n) / n
+    print(f"  original {original * 1000:.2f} ms | tabela {rapida * 1000:.2f} ms | memorizada {memorizada * 1000:.2f} ms")
+
+    # Como em run_transformation: uma busca por turma, pela disciplina
+    index = DisciplinaIndex(requisitos)
+    for nome in disciplinas_turmas:
+        index.resolve(clean_str(nome))
+    print(index.summary())
+    for nome, encontrado in sorted(index.aproximadas().items()):
+        print(f"  {nome} -> {encontrado}")
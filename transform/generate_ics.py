@@ -2,16 +2,22 @@ import os
 import unicodedata
 import json
 from datetime import datetime, timedelta
-from scrap.get_turmas_matricula_data import get_turmas_matricula_data
 
 OUTPUT_PATH = "output/agenda.ics"
 TURMAS_MATRICULA_DATA_PATH = "data/turmas_matricula_data.json"
 
-def generate_ics(turmas_data = None):
+def generate_ics(turmas_data = None, output_path = OUTPUT_PATH, snapshot_db = None, snapshot_id = None):
     """
     Gera um arquivo .ics (iCalendar) a partir dos dados das turmas matriculadas.
+    Com `snapshot_db`, as turmas vêm de um snapshot do banco SQLite (o mais recente por padrão).
+    Sem `turmas_data` (None; um dicionário vazio é um aluno sem turmas), as turmas vêm do
+    snapshot ou de data/turmas_matricula_data.json.
     """
-    if not turmas_data:
+    if turmas_data is None and snapshot_db is not None:
+        from scrap.snapshot_store import SnapshotStore, MATRICULA
+        with SnapshotStore(snapshot_db) as store:
+            turmas_data = store.load_turmas(store.resolve(snapshot_id), MATRICULA)
+    if turmas_data is None:
         with open(TURMAS_MATRICULA_DATA_PATH, "r") as f:
             turmas_data = json.load(f)
     
@@ -122,14 +128,15 @@ def generate_ics(turmas_data = None):
 
     ics_lines.append("END:VCALENDAR")
 
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
         f.write("\n".join(ics_lines))
     
-    print(f"Arquivo ICS gerado com sucesso em {OUTPUT_PATH}")
+    print(f"Arquivo ICS gerado com sucesso em {output_path}")
 
 if __name__ == "__main__":
     from scrap.login import login
+    from scrap.get_turmas_matricula_data import get_turmas_matricula_data
     
     user_data, session = login()
     turmas_data = get_turmas_matricula_data(session, user_data["matricula"])
@@ -0,0 +1,223 @@
+"""
+Grafo de pré-requisitos do currículo (curriculum/requisitos.json).
+
+Cada disciplina é um vértice e cada pré-requisito uma aresta pré-requisito -> disciplina. O grafo
+é montado uma vez: ordem topológica (que também detecta ciclos), pré-requisitos diretos e o fecho
+transitivo de cada disciplina como bitsets (int, bit i = disciplina i) e a lista de dependentes.
+Com isso:
+- as disciplinas liberadas por um conjunto de aprovadas saem em O(V+E);
+- "se eu passar em X, o que abre?" olha só os dependentes diretos de X (microssegundos);
+- a maior cadeia restante até a formatura (limite inferior de períodos) sai em O(V+E).
+
+Pré-requisitos que não são disciplinas do currículo (ex.: "MINIMO DE 50 CREDITOS CONCLUIDOS" ou
+disciplinas de outros cursos) viram vértices externos: só contam como cumpridos se estiverem
+entre as aprovadas.
+
+Uso:
+    python -m transform.prerequisitos "Estruturas de Dados" --aprovadas data/disciplinas_aprovadas.json
+"""
+from transform.disciplina_index import DisciplinaIndex
+
+class GrafoRequisitos:
+    """
+    DAG de pré-requisitos indexado por bitsets. Os nomes são os do currículo, já limpos (clean_str).
+    """
+
+    def __init__(self, index: DisciplinaIndex):
+        self.nomes: list[str] = list(index.entradas)
+        self.indice: dict[str, int] = {nome: i for i, nome in enumerate(self.nomes)}
+        self.index = index
+        self.externos: set[int] = set()
+
+        arestas = []
+        for nome, entrada in index.entradas.items():
+            for pre_requisito in entrada["pre_requisitos"]:
+                arestas.append((self._vertice(pre_requisito), self.indice[nome]))
+
+        n = len(self.nomes)
+        # pre[i]: pré-requisitos diretos de i (bitset); dependentes[i]: disciplinas que têm i como pré-requisito
+        self.pre = [0] * n
+        self.dependentes: list[list[int]] = [[] for _ in range(n)]
+        for origem, destino in arestas:
+            if not self.pre[destino] >> origem & 1:
+                self.pre[destino] |= 1 << origem
+                self.dependentes[origem].append(destino)
+
+        self.ordem = self._ordem_topologica()
+        # ancestrais[i]: todos os pré-requisitos de i, diretos ou não (fecho transitivo)
+        self.ancestrais = [0] * n
+        for i in self.ordem:
+            fecho = self.pre[i]
+            bits = self.pre[i]
+            while bits:
+                menor = bits & -bits
+                fecho |= self.ancestrais[menor.bit_length() - 1]
+                bits ^= menor
+            self.ancestrais[i] = fecho
+
+    def _vertice(self, nome: str) -> int:
+        """
+        Índice do vértice de `nome`, resolvido pelo índice de disciplinas; cria um vértice externo se não houver.
+        """
+        encontrado = self.index.resolve(nome, contar=False) or nome
+        if encontrado not in self.indice:
+            self.indice[encontrado] = len(self.nomes)
+            self.nomes.append(encontrado)
+            self.externos.add(self.indice[encontrado])
+        return self.indice[encontrado]
+
+    def _ordem_topologica(self) -> list[int]:
+        """
+        Algoritmo de Kahn. Raises ValueError com um ciclo, se houver.
+        """
+        faltando = [pre.bit_count() for pre in self.pre]
+        fila = [i for i, f in enumerate(faltando) if f == 0]
+        for i in fila:
+            for d in self.dependentes[i]:
+                faltando[d] -= 1
+                if faltando[d] == 0:
+                    fila.append(d)
+        if len(fila) < len(self.nomes):
+            ciclo = self._um_ciclo({i for i, f in enumerate(faltando) if f > 0})
+            raise ValueError("Ciclo nos pré-requisitos: " + " -> ".join(self.nomes[i] for i in ciclo))
+        return fila
+
+    def _um_ciclo(self, restantes: set[int]) -> list[int]:
+        # Todo vértice que sobrou no Kahn tem um pré-requisito que também sobrou: andando por eles, algum se repete
+        caminho, posicao = [], {}
+        i = min(restantes)
+        while i not in posicao:
+            posicao[i] = len(caminho)
+            caminho.append(i)
+            i = next(p for p in restantes if self.pre[i] >> p & 1)
+        ciclo = caminho[posicao[i]:] + [i]
+        return ciclo[::-1]
+
+    def mascara(self, nomes) -> int:
+        """
+        Bitset das disciplinas `nomes` (já limpas); nomes fora do grafo são ignorados.
+        """
+        bits = 0
+        for nome in nomes:
+            i = self.indice.get(nome)
+            if i is None:
+                encontrado = self.index.resolve(nome, contar=False)
+                i = self.indice.get(encontrado) if encontrado else None
+            if i is not None:
+                bits |= 1 << i
+        return bits
+
+    def _nomes(self, bits: int) -> list[str]:
+        nomes = []
+        while bits:
+            menor = bits & -bits
+            nomes.append(self.nomes[menor.bit_length() - 1])
+            bits ^= menor
+        return nomes
+
+    def liberadas(self, concluidas: int) -> list[int]:
+        """
+        Disciplinas do currículo ainda não concluídas com todos os pré-requisitos diretos concluídos.
+        Conta os pré-requisitos pendentes aresta por aresta: O(V+E).
+        """
+        pendentes = [0] * len(self.nomes)
+        for i in range(len(self.nomes)):
+            if not concluidas >> i & 1:
+                for d in self.dependentes[i]:
+                    pendentes[d] += 1
+        return [
+            i for i in range(len(self.nomes))
+            if pendentes[i] == 0 and not concluidas >> i & 1 and i not in self.externos
+        ]
+
+    def e_se(self, concluidas: int, nome: str) -> list[str]:
+        """
+        Disciplinas que passam a ser liberadas se, além de `concluidas`, `nome` for concluída.
+        Só os dependentes diretos de `nome` podem mudar, então o custo é o grau de saída dele.
+        """
+        i = self.indice[nome]
+        depois = concluidas | (1 << i)
+        return [
+            self.nomes[d] for d in self.dependentes[i]
+            if not depois >> d & 1 and self.pre[d] & ~depois == 0 and self.pre[d] & ~concluidas
+        ]
+
+    def faltam(self, concluidas: int, nome: str) -> list[str]:
+        """
+        Todos os pré-requisitos (diretos ou não) de `nome` ainda não concluídos.
+        """
+        return self._nomes(self.ancestrais[self.indice[nome]] & ~concluidas)
+
+    def maior_cadeia(self, concluidas: int) -> list[str]:
+        """
+        Maior sequência de disciplinas não concluídas em que cada uma é pré-requisito da seguinte:
+        o mínimo de períodos até concluir o currículo. O(V+E), na ordem topológica inversa.
+        """
+        altura = [0] * len(self.nomes)
+        proxima = [-1] * len(self.nomes)
+        for i in reversed(self.ordem):
+            if concluidas >> i & 1 or i in self.externos:
+                continue
+            altura[i] = 1
+            for d in self.dependentes[i]:
+                if altura[d] + 1 > altura[i]:
+                    altura[i], proxima[i] = altura[d] + 1, d
+        cadeia = []
+        i = max(range(len(self.nomes)), key=altura.__getitem__, default=-1)
+        while i != -1 and altura[i]:
+            cadeia.append(self.nomes[i])
+            i = proxima[i]
+        return cadeia
+
+    def resumo(self, concluidas_nomes: list[str]) -> dict:
+        """
+        Situação do aluno no currículo, no formato do output/matricula_data.json (chave "prerequisites").
+        """
+        concluidas = self.mascara(concluidas_nomes)
+        liberadas = self.liberadas(concluidas)
+        cadeia = self.maior_cadeia(concluidas)
+        curriculo = [i for i in range(len(self.nomes)) if i not in self.externos]
+        return {
+            "eligible_codes": [self.nomes[i] for i in liberadas],
+            "unlocks": {self.nomes[i]: self.e_se(concluidas, self.nomes[i]) for i in liberadas},
+            "missing": {
+                self.nomes[i]: self.faltam(concluidas, self.nomes[i])
+                for i in curriculo if not concluidas >> i & 1 and self.pre[i] & ~concluidas
+            },
+            "remaining_chain": len(cadeia),
+            "critical_path": cadeia,
+            "external_requirements": sorted(self.nomes[i] for i in self.externos),
+        }
+
+if __name__ == "__main__":
+    import argparse
+    import timeit
+    from scrap.texto import clean_str
+    from transform.transform_data import carregar_requisitos, _carregar_json, DISCIPLINAS_APROVADAS_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("disciplinas", nargs="*", help="E se eu passar nestas disciplinas?")
+    parser.add_argument("--aprovadas", default=DISCIPLINAS_APROVADAS_PATH, help="JSON com a lista de disciplinas aprovadas")
+    args = parser.parse_args()
+
+    n = 100
+    montagem = timeit.timeit(lambda: GrafoRequisitos(carregar_requisitos()), number=n) / n
+    grafo = GrafoRequisitos(carregar_requisitos())
+    aprovadas = [clean_str(d) for d in _carregar_json(args.aprovadas, [])]
+    concluidas = grafo.mascara(aprovadas)
+    resumo = grafo.resumo(aprovadas)
+    print(f"{len(grafo.nomes)} vértices ({len(grafo.externos)} externos), montagem {montagem * 1000:.2f} ms")
+    print(f"Liberadas: {', '.join(resumo['eligible_codes']) or '-'}")
+    print(f"Maior cadeia restante ({resumo['remaining_chain']}): {' -> '.join(resumo['critical_path'])}")
+
+    for disciplina in args.disciplinas:
+        nome = grafo.index.resolve(clean_str(disciplina), contar=False)
+        if nome is None:
+            print(f"{disciplina}: não está no currículo")
+            continue
+        tempo = timeit.timeit(lambda: grafo.e_se(concluidas, nome), number=10_000) / 10_000
+        abre = grafo.e_se(concluidas, nome)
+        print(f"E se passar em {nome}? Abre: {', '.join(abre) or 'nada'} ({tempo * 1e6:.1f} µs)")
+        faltam = grafo.faltam(concluidas, nome)
+        if faltam:
+            print(f"   Ainda faltam: {', '.join(faltam)}")
@@ -0,0 +1,255 @@
+"""
+Montagem de grades horárias sem conflito a partir das turmas de output/matricula_data.json.
+
+Os horários de cada turma viram uma máscara de bits sobre a semana (um bit por bloco de
+BLOCO_MINUTOS); duas turmas conflitam se as máscaras se cruzam. A matriz de conflitos entre
+todas as turmas candidatas é calculada uma vez, também como bitsets, e a busca escolhe uma turma
+por disciplina (começando pela disciplina com menos opções) descartando, a cada escolha, as
+disciplinas que ficaram sem nenhuma turma compatível.
+
+Uso:
+    python -m transform.schedule "ESTRUTURAS DE DADOS" "ALGEBRA LINEAR II" "FISICA I" --top 5
+"""
+import heapq
+import json
+from dataclasses import dataclass, field
+
+BLOCO_MINUTOS = 5
+BLOCOS_POR_DIA = 24 * 60 // BLOCO_MINUTOS
+DIAS = ["SEG", "TER", "QUA", "QUI", "SEX", "SAB", "DOM"]
+INDICE_DIA = {dia: i for i, dia in enumerate(DIAS)}
+MATRICULA_DATA_PATH = "output/matricula_data.json"
+# Limite de grades visitadas por busca, para catálogos muito grandes não rodarem sem fim
+MAX_SOLUCOES = 1_000_000
+
+def _minutos(hora: str) -> int:
+    h, m = hora.split(":")
+    return int(h) * 60 + int(m)
+
+def slot_mask(slots: list[dict[str, str]]) -> int:
+    """
+    Máscara de bits dos horários ({"day": "SEG", "start": "14:35", "end": "18:10"}) da turma.
+    O início é arredondado para baixo e o fim para cima, ao bloco de BLOCO_MINUTOS.
+    """
+    mask = 0
+    for slot in slots:
+        base = INDICE_DIA[slot["day"]] * BLOCOS_POR_DIA
+        inicio = _minutos(slot["start"]) // BLOCO_MINUTOS
+        fim = -(-_minutos(slot["end"]) // BLOCO_MINUTOS)
+        if fim > inicio:
+            mask |= ((1 << (fim - inicio)) - 1) << (base + inicio)
+    return mask
+
+def _bits_dos_dias(mask: int) -> int:
+    dia_cheio = (1 << BLOCOS_POR_DIA) - 1
+    bits = 0
+    for d in range(len(DIAS)):
+        if (mask >> (d * BLOCOS_POR_DIA)) & dia_cheio:
+            bits |= 1 << d
+    return bits
+
+def dias_da_mascara(mask: int) -> int:
+    """
+    Número de dias da semana com alguma aula na máscara.
+    """
+    return _bits_dos_dias(mask).bit_count()
+
+def janelas_minutos(mask: int) -> int:
+    """
+    Minutos de "janela" (intervalos vazios entre a primeira e a última aula de cada dia).
+    """
+    dia_cheio = (1 << BLOCOS_POR_DIA) - 1
+    total = 0
+    for d in range(len(DIAS)):
+        dia = (mask >> (d * BLOCOS_POR_DIA)) & dia_cheio
+        if dia:
+            primeiro = (dia & -dia).bit_length() - 1
+            ultimo = dia.bit_length() - 1
+            total += (ultimo - primeiro + 1) - dia.bit_count()
+    return total * BLOCO_MINUTOS
+
+@dataclass(order=True)
+class Grade:
+    """
+    Uma combinação sem conflitos: uma turma por disciplina. Ordena pela nota (menor é melhor).
+    """
+    nota: tuple
+    turma_ids: list[str] = field(compare=False)
+    dias: int = field(compare=False)
+    janelas: int = field(compare=False)
+    vagas_livres: int = field(compare=False)
+
+class ScheduleEngine:
+    """
+    Turmas candidatas indexadas para a montagem de grades. As máscaras e a matriz de conflitos
+    são calculadas na criação.
+    """
+
+    def __init__(self, courses: list[dict]):
+        # Uma turma pode aparecer duas vezes (disponível e matriculada)
+        self.courses = list({course["id"]: course for course in courses}.values())
+        courses = self.courses
+        self.masks = [slot_mask(course["slots"]) for course in courses]
+        self.por_disciplina: dict[str, list[int]] = {}
+        for i, course in enumerate(courses):
+            self.por_disciplina.setdefault(course["code"], []).append(i)
+        # Bit d ligado se a turma tem aula no dia DIAS[d]
+        self.dias = [_bits_dos_dias(mask) for mask in self.masks]
+        self.vagas = [self._vagas_livres(course) for course in courses]
+        self.conflitos = self._matriz_conflitos()
+
+    def _matriz_conflitos(self) -> list[int]:
+        """
+        conflitos[i] tem o bit j ligado se as turmas i e j se cruzam no horário.
+        Turmas com a mesma máscara são comparadas uma vez só.
+        """
+        grupos: dict[int, int] = {}
+        for i, mask in enumerate(self.masks):
+            grupos[mask] = grupos.get(mask, 0) | (1 << i)
+        mascaras = [mask for mask in grupos if mask]
+
+        conflito_por_mascara = {}
+        for a, mask_a in enumerate(mascaras):
+            bits = 0
+            for mask_b in mascaras:
+                if mask_a & mask_b:
+                    bits |= grupos[mask_b]
+            conflito_por_mascara[mask_a] = bits
+        return [conflito_por_mascara.get(mask, 0) for mask in self.masks]
+
+    def conflita(self, i: int, j: int) -> bool:
+        return bool(self.conflitos[i] >> j & 1)
+
+    @staticmethod
+    def _vagas_livres(course: dict) -> int:
+        occupancy = course.get("occupancy") or {}
+        try:
+            return int(occupancy.get("total")) - int(occupancy.get("occupied"))
+        except (TypeError, ValueError):
+            return 0
+
+    def combinacoes(self, disciplinas: list[str], so_com_vagas: bool = False, max_solucoes: int = MAX_SOLUCOES, poda=None):
+        """
+        Gera as combinações sem conflito (listas de índices de turma, uma por disciplina).
+
+        A cada passo, escolhe a disciplina com menos turmas ainda compatíveis e poda o ramo
+        assim que alguma disciplina restante fica sem opção. `poda(mascara, dias)` pode descartar
+        também ramos cuja grade parcial (máscara dos horários e bits dos dias já ocupados) não interessa.
+        """
+        candidatas = {}
+        for disciplina in dict.fromkeys(disciplinas):
+            indices = self.por_disciplina.get(disciplina, [])
+            if so_com_vagas:
+                indices = [i for i in indices if self.vagas[i] > 0]
+            bits = 0
+            for i in indices:
+                bits |= 1 << i
+            if not bits:
+                return
+            candidatas[disciplina] = bits
+        if not candidatas:
+            # Nenhuma disciplina pedida: não há grade para montar
+            return
+
+        visitadas = 0
+        if poda is not None and poda(0, 0):
+            return
+
+        def buscar(restantes: dict[str, int], escolhidas: list[int], proibidas: int, mascara: int, dias: int):
+            nonlocal visitadas
+            disciplina = min(restantes, key=lambda d: restantes[d].bit_count())
+            opcoes = restantes[disciplina]
+            while opcoes and visitadas < max_solucoes:
+                menor = opcoes & -opcoes
+                i = menor.bit_length() - 1
+                opcoes ^= menor
+                nova_mascara, novos_dias = mascara | self.masks[i], dias | self.dias[i]
+                if poda is not None and poda(nova_mascara, novos_dias):
+                    continue
+                novas_proibidas = proibidas | self.conflitos[i]
+                proximas = {}
+                for outra, bits in restantes.items():
+                    if outra != disciplina:
+                        bits &= ~novas_proibidas
+                        if not bits:
+                            break
+                        proximas[outra] = bits
+                else:
+                    escolhidas.append(i)
+                    if proximas:
+                        yield from buscar(proximas, escolhidas, novas_proibidas, nova_mascara, novos_dias)
+                    else:
+                        # Última disciplina: a grade está completa, sem descer mais um nível
+                        visitadas += 1
+                        yield list(escolhidas)
+                    escolhidas.pop()
+
+        yield from buscar(candidatas, [], 0, 0, 0)
+
+    def grade(self, indices: list[int]) -> Grade:
+        mask = dias_bits = 0
+        for i in indices:
+            mask |= self.masks[i]
+            dias_bits |= self.dias[i]
+        dias = dias_bits.bit_count()
+        janelas = janelas_minutos(mask)
+        vagas = sum(self.vagas[i] for i in indices)
+        return Grade((dias, janelas, -vagas), [self.courses[i]["id"] for i in indices], dias, janelas, vagas)
+
+    def ranquear(self, disciplinas: list[str], top: int = 10, so_com_vagas: bool = False) -> list[Grade]:
+        """
+        As `top` melhores grades: menos dias com aula, depois menos tempo de janela, depois mais vagas livres.
+
+        Branch and bound: os dias de uma grade parcial só aumentam, então com `top` grades já
+        guardadas, um ramo que já usa mais dias que a pior delas é descartado.
+        """
+        # Heap com as notas negadas: melhores[0] é a pior das `top` melhores até agora
+        melhores: list[tuple] = []
+
+        def poda(mascara: int, dias: int) -> bool:
+            return len(melhores) >= top and dias.bit_count() > -melhores[0][0][0]
+
+        for indices in self.combinacoes(disciplinas, so_com_vagas, poda=poda):
+            grade = self.grade(indices)
+            item = (tuple(-x for x in grade.nota), grade.turma_ids, grade)
+            if len(melhores) < top:
+                heapq.heappush(melhores, item)
+            elif item > melhores[0]:
+                heapq.heapreplace(melhores, item)
+        return sorted(item[2] for item in melhores)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from scrap.texto import clean_str
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("disciplinas", nargs="+", help="Disciplinas (nomes como no portal; acentos e caixa são ignorados)")
+    parser.add_argument("--arquivo", default=MATRICULA_DATA_PATH)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--com-vagas", action="store_true", help="Só turmas com vagas livres")
+    args = parser.parse_args()
+
+    with open(args.arquivo, "r") as f:
+        courses = json.load(f)["courses"]
+    inicio = time.perf_counter()
+    engine = ScheduleEngine(courses)
+    montagem = time.perf_counter() - inicio
+    disciplinas = [clean_str(d) for d in args.disciplinas]
+    for disciplina in disciplinas:
+        if disciplina not in engine.por_disciplina:
+            print(f"Nenhuma turma de {disciplina}")
+
+    inicio = time.perf_counter()
+    grades = engine.ranquear(disciplinas, top=args.top, so_com_vagas=args.com_vagas)
+    busca = time.perf_counter() - inicio
+    print(f"{len(courses)} turmas indexadas em {montagem * 1000:.1f} ms; busca em {busca * 1000:.1f} ms")
+    if not grades:
+        print("Nenhuma combinação sem conflito")
+    por_id = {course["id"]: course for course in courses}
+    for posicao, grade in enumerate(grades, 1):
+        print(f"\n{posicao}. {grade.dias} dias, {grade.janelas} min de janela, {grade.vagas_livres} vagas livres")
+        for turma_id in grade.turma_ids:
+            course = por_id[turma_id]
+            horarios = ", ".join(f"{s['day']} {s['start']}-{s['end']}" for s in course["slots"])
+            print(f"   {turma_id}  {course['code']}  {horarios}")
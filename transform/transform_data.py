@@ -1,13 +1,22 @@
 import json
-import unicodedata
-import re
 import os
+import itertools
+import textwrap
 from datetime import date
+from functools import lru_cache
+from typing import Iterable, Iterator
+from scrap.texto import clean_str
+from transform.disciplina_index import DisciplinaIndex
+from transform.prerequisitos import GrafoRequisitos
+from scrap.turma_model import Turma
+from transform.delta import DeltaBuilder
 
 OUTPUT_PATH = "output/matricula_data.json"
+VERSION = "1.0"
 
 DISCIPLINAS_APROVADAS_PATH = "data/disciplinas_aprovadas.json"
 REQUISITOS_PATH = "curriculum/requisitos.json"
+ALIASES_PATH = "curriculum/aliases.json"
 TURMAS_DISPONIVEIS_DATA_PATH = "data/turmas_disponiveis_data.json"
 TURMAS_MATRICULA_DATA_PATH = "data/turmas_matricula_data.json"
 
@@ -22,27 +31,18 @@ DIAS_SEMANA = {
 }
 
 
-def clean_str(text: str) -> str:
-    """
-    Remove múltiplos espaços, acentos, parênteses (e conteúdo após),
-    e converte para caixa alta.
-    """
-    """
-    Exemplo:
-    Equações Diferenciais Parciais e Séries (EDPS) -> EQUACOES DIFERENCIAIS PARCIAIS E SERIES
-    """
-    # Remove conteúdo entre parênteses e o que vem depois
-    text = text.split("(")[0]
-
-    # Normaliza e remove acentos
-    text = unicodedata.normalize("NFD", text)
-    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
-
-    # Remove múltiplos espaços e strip
-    text = re.sub(r"\s+", " ", text).strip()
-
-    return text.upper()
+@lru_cache(maxsize=None)
+def _degree(curso: str) -> str:
+    degree = clean_str(curso)
+    if "CURSO DE " in degree:
+        degree = degree.split("CURSO DE ")[1]
+    if "- " in degree:
+        degree = degree.split("- ")[1]
+    return degree
 
+def _texto(valor):
+    # Campos numéricos dos registros voltam a texto, como no JSON do portal
+    return str(valor) if type(valor) is int else valor
 
 def transform_data(id, data, requisitos):
     """
@@ -51,22 +51,19 @@ def transform_data(id, data, requisitos):
 
     code = clean_str(data["Disciplina"])
     name = clean_str(data["Nome"])
-    degree = clean_str(data['Curso'])
+    degree = _degree(data['Curso'])
 
-    if "CURSO DE " in degree:
-        degree = degree.split("CURSO DE ")[1]
-    if "- " in degree:
-        degree = degree.split("- ")[1]
-        
     if data['Docentes']:
         professors = [docente['Nome do Docente'] for docente in data['Docentes']]
     else:
         professors = []
 
+    requisito = requisitos.get(code)
+
     if 'Período' in data:
         period = data['Período']
-    elif code in requisitos and 'periodo' in requisitos[code]:
-        period = requisitos[code]['periodo']
+    elif requisito and 'periodo' in requisito:
+        period = requisito['periodo']
     else:
         period = ""
 
@@ -84,8 +81,8 @@ def transform_data(id, data, requisitos):
             start = horario['Hora Início']
             end = horario['Hora Fim']
             slots.append({"day": day, "start": start, "end": end})
-    if code in requisitos and 'pre_requisitos' in requisitos[code]:
-        pre_requisits = requisitos[code]['pre_requisitos']
+    if requisito and 'pre_requisitos' in requisito:
+        pre_requisits = requisito['pre_requisitos']
     else:
         pre_requisits = []
 
@@ -103,7 +100,71 @@ def transform_data(id, data, requisitos):
     }
     return course_dict
 
-def run_transformation():
+def transform_turma(id, turma: Turma, requisitos):
+    """
+    transform_data para um registro (scrap.turma_model.Turma), com o mesmo resultado: lê os
+    atributos direto, sem procurar as chaves longas, e a carga horária já vem como número.
+    """
+    code = clean_str(turma.disciplina)
+    requisito = requisitos.get(code)
+
+    if turma.periodo is not None:
+        period = turma.periodo
+    elif requisito and 'periodo' in requisito:
+        period = requisito['periodo']
+    else:
+        period = ""
+
+    carga = turma.carga_horaria
+    return {
+        "id": id,
+        "code": code,
+        "name": clean_str(turma.nome),
+        "degree": _degree(turma.curso),
+        "professors": [docente.nome for docente in turma.docentes] if turma.docentes else [],
+        "period": period,
+        "credits": int(carga)//18 if carga else 0,
+        "occupancy": {"total": _texto(turma.vagas_totais), "occupied": _texto(turma.total_matriculas), "requested": _texto(turma.total_solicitacoes)},
+        "slots": [
+            {"day": DIAS_SEMANA[horario.dia_semana[0]], "start": horario.hora_inicio, "end": horario.hora_fim}
+            for horario in turma.horarios
+        ] if turma.horarios else [],
+        "pre_requisits": requisito['pre_requisitos'] if requisito and 'pre_requisitos' in requisito else [],
+    }
+
+def _carregar_json(path: str, default):
+    if os.path.exists(path):
+        with open (path, "r") as f:
+            return json.load(f)
+    return default
+
+def ler_turmas_jsonl(path: str) -> Iterator[tuple[str, dict]]:
+    """
+    Lê um arquivo JSONL de turmas ({"id": ..., "data": ...} por linha) uma turma por vez.
+    Linhas sem "id" (o cabeçalho do checkpoint, ver scrap.checkpoint) são ignoradas.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                registro = json.loads(linha)
+                if "id" in registro:
+                    yield registro["id"], registro["data"]
+
+def carregar_requisitos(path: str = REQUISITOS_PATH, aliases_path: str = ALIASES_PATH) -> DisciplinaIndex:
+    """
+    Carrega o currículo (e os aliases opcionais de curriculum/aliases.json, {"nome no portal": "nome no currículo"})
+    no índice de disciplinas, com os nomes já limpos.
+    """
+    return DisciplinaIndex(_carregar_json(path, []), aliases=_carregar_json(aliases_path, {}))
+
+def run_transformation(
+    disciplinas_aprovadas_path: str = DISCIPLINAS_APROVADAS_PATH,
+    turmas_disponiveis_path: str = TURMAS_DISPONIVEIS_DATA_PATH,
+    turmas_matricula_path: str = TURMAS_MATRICULA_DATA_PATH,
+    output_path: str = OUTPUT_PATH,
+    snapshot_db: str | None = None,
+    snapshot_id: int | str | None = None,
+):
     """
     Orquestra o fluxo de carregamento, limpeza e consolidação dos dados raspados.
     Este processo realiza as seguintes etapas:
@@ -113,84 +174,150 @@ def run_transformation():
     4. Identifica o status de matrícula do usuário (confirmada vs. solicitada).
     5. Adiciona metadados de versão e data de atualização.
     6. Exporta o resultado consolidado para o arquivo 'matricula_data_clean.json'.
+    Os caminhos de entrada e saída podem ser trocados (ex.: um aluno por pasta no modo batch).
+    Se `turmas_disponiveis_path` for um .jsonl (saída do modo streaming), as turmas são lidas uma a uma.
+    Com `snapshot_db`, as entradas vêm de um snapshot do banco SQLite (ver scrap.snapshot_store),
+    o `snapshot_id` informado ou o mais recente, em vez dos arquivos de data/.
     Raises:
         FileNotFoundError: Se algum dos arquivos de entrada obrigatórios não for encontrado.
         json.JSONDecodeError: Se houver erro na formatação dos arquivos JSON de origem.
     """
-    if os.path.exists(DISCIPLINAS_APROVADAS_PATH):
-        with open (DISCIPLINAS_APROVADAS_PATH, "r") as f:
-            disciplinas_aprovadas = json.load(f)
-    else:
-        disciplinas_aprovadas = []
+    if snapshot_db is not None:
+        from scrap.snapshot_store import SnapshotStore, DISPONIVEL, MATRICULA
+        with SnapshotStore(snapshot_db) as store:
+            snapshot_id = store.resolve(snapshot_id)
+            print(f"Lendo snapshot {snapshot_id} de {snapshot_db}")
+            run_transformation_stream(
+                store.iter_turmas(snapshot_id, DISPONIVEL),
+                turmas_matricula_data=store.load_turmas(snapshot_id, MATRICULA),
+                disciplinas_aprovadas=store.load_disciplinas_aprovadas(snapshot_id),
+                output_path=output_path,
+            )
+        return
 
-    if os.path.exists(REQUISITOS_PATH):
-        with open (REQUISITOS_PATH, "r") as f:
-            requisitos = json.load(f)
+    if turmas_disponiveis_path.endswith(".jsonl") and os.path.exists(turmas_disponiveis_path):
+        turmas_disponiveis = ler_turmas_jsonl(turmas_disponiveis_path)
     else:
-        requisitos = []
+        turmas_disponiveis = _carregar_json(turmas_disponiveis_path, {}).items()
 
-    if os.path.exists(TURMAS_DISPONIVEIS_DATA_PATH):
-        with open (TURMAS_DISPONIVEIS_DATA_PATH, "r") as f:
-            turmas_disponiveis_data = json.load(f)
-    else:
-        turmas_disponiveis_data = []
+    run_transformation_stream(
+        turmas_disponiveis,
+        turmas_matricula_data=_carregar_json(turmas_matricula_path, {}),
+        disciplinas_aprovadas=_carregar_json(disciplinas_aprovadas_path, []),
+        output_path=output_path,
+    )
 
-    if os.path.exists(TURMAS_MATRICULA_DATA_PATH):
-        with open (TURMAS_MATRICULA_DATA_PATH, "r") as f:
-            turmas_matricula_data = json.load(f)
-    else:
-        turmas_matricula_data = []
-
-    # Limpando as entradas
-    requisitos_clean = {}
-    for disciplina in requisitos:
-        disciplina_nome = clean_str(disciplina["disciplina"])
-        pre_requisito_list = []
-        for pre_requisito in disciplina['pre_requisitos']:
-            pre_requisito_clean = clean_str(pre_requisito)
-            pre_requisito_list.append(pre_requisito_clean)
-
-        requisitos_clean[disciplina_nome] = {"pre_requisitos":pre_requisito_list, "periodo": disciplina["periodo"]}
-    
-    confirmed_course_ids = []
-    planned_course_ids = []
-    courses = []
+def run_transformation_stream(
+    turmas_disponiveis: Iterable[tuple[str, dict]],
+    turmas_matricula_data: dict[str:dict] | None = None,
+    disciplinas_aprovadas: list[str] | None = None,
+    output_path: str = OUTPUT_PATH,
+    delta: bool = True,
+) -> int:
+    """
+    Versão em streaming de run_transformation: consome as turmas disponíveis (pares id, dados,
+    com os dados em dicionário ou já como scrap.turma_model.Turma) uma por vez, à medida que chegam (ex.: de scrap.get_turmas_disponiveis_data.iter_turmas_disponiveis_data),
+    e escreve cada turma tratada no arquivo de saída na hora, sem montar a lista `courses` em memória.
 
-    for id, data in turmas_disponiveis_data.items():
-        courses.append(transform_data(id, data, requisitos_clean))
+    A saída tem o mesmo formato de run_transformation. Ela é escrita em um arquivo temporário
+    e só substitui `output_path` no final, para que uma execução interrompida não deixe um JSON
+    pela metade. O semestre dos metadados vem da primeira turma. Retorna o número de turmas escritas.
 
+    A chave "prerequisites" traz a situação do aluno no grafo de pré-requisitos (ver transform.prerequisitos):
+    disciplinas liberadas, o que cada uma delas liberaria, pré-requisitos que faltam e a maior cadeia restante.
+
+    Com `delta`, as turmas são comparadas com as do `output_path` anterior (ver transform.delta): o delta e os
+    hashes são gravados ao lado da saída e, se nada mudou além da data, `output_path` não é reescrito (a hora
+    da checagem fica no arquivo de hashes). A versão anterior não é carregada inteira: a comparação usa os
+    hashes salvos e só relê as turmas que mudaram; das novas, só as que entram no delta ficam em memória.
+    """
+    turmas_matricula_data = turmas_matricula_data or {}
+    disciplinas_aprovadas = disciplinas_aprovadas or []
+    requisitos_clean = carregar_requisitos()
+    # Monta antes das turmas para que um ciclo no currículo falhe logo
+    grafo = GrafoRequisitos(requisitos_clean)
+
+    confirmed_course_ids = []
+    planned_course_ids = []
     for id, data in turmas_matricula_data.items():
-        courses.append(transform_data(id, data, requisitos_clean))
         status = data["Matrícula"]
         if status == "Aceita/Matriculada":
             confirmed_course_ids.append(id)
         elif status == "Solicitada":
             planned_course_ids.append(id)
 
-    # Metadados
-    semester = f"{data['Ano']}.{data['Semestre']}"
-    version = "1.0"
-    last_update = date.today().isoformat()
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    total = 0
+    semester = ""
+    builder = DeltaBuilder.do_arquivo(output_path) if delta else None
+    try:
+        with open(tmp_path, "w") as f:
+            for id, data in itertools.chain(turmas_disponiveis, turmas_matricula_data.items()):
+                registro = type(data) is Turma
+                if total == 0:
+                    semester = f"{data.ano}.{data.semestre}" if registro else f"{data['Ano']}.{data['Semestre']}"
+                    _escrever_cabecalho(f, semester=semester)
+                f.write(",\n" if total else "\n")
+                course = transform_turma(id, data, requisitos_clean) if registro else transform_data(id, data, requisitos_clean)
+                texto = json.dumps(course, indent=4)
+                if builder is not None:
+                    builder.add(course, texto)
+                # Mesma indentação que json.dump(..., indent=4) daria dentro de "courses"
+                f.write(textwrap.indent(texto, " " * 8))
+                total += 1
 
-    full_package = {
-        "version": version,
+            if total == 0:
+                _escrever_cabecalho(f, semester="")
+                f.write("],\n")
+            else:
+                f.write("\n    ],\n")
+            user = {
+                "confirmed_course_ids": confirmed_course_ids,
+                "planned_course_ids": planned_course_ids,
+                "completed_courses_codes": [clean_str(disciplina) for disciplina in disciplinas_aprovadas]
+            }
+            prerequisites = grafo.resumo(user["completed_courses_codes"])
+            f.write('    "user": ' + textwrap.indent(json.dumps(user, indent=4), " " * 4).lstrip() + ",\n")
+            f.write('    "prerequisites": ' + textwrap.indent(json.dumps(prerequisites, indent=4), " " * 4).lstrip() + "\n}")
+        print(requisitos_clean.summary())
+        if builder is not None:
+            metadata = {"semester": semester, "last_update": date.today().isoformat()}
+            documento = builder.finish(metadata, user, prerequisites)
+            print(builder.summary(documento))
+            if documento is None:
+                os.remove(tmp_path)
+                # Só a hora da checagem avança, no arquivo de hashes
+                builder.salvar(output_path, None)
+                return total
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        # Uma falha no meio (raspagem, parse) não deixa a saída pela metade no disco
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        if builder is not None:
+            builder.descartar()
+        raise
+    if builder is not None:
+        builder.salvar(output_path, documento)
+    print("Dados salvos em ", output_path)
+    return total
+
+def _escrever_cabecalho(f, semester: str):
+    """
+    Escreve o início do pacote (versão e metadados) até a abertura da lista "courses".
+    """
+    cabecalho = json.dumps({
+        "version": VERSION,
         "metadata":{
             "semester": semester,
-            "last_update": last_update,
+            "last_update": date.today().isoformat(),
         },
-        "courses": courses,
-        "user":{
-            "confirmed_course_ids": confirmed_course_ids,
-            "planned_course_ids": planned_course_ids,
-            "completed_courses_codes": [clean_str(disciplina) for disciplina in disciplinas_aprovadas]
-        }
-    }
-
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(full_package, f, indent= 4)
-    print("Dados salvos em ", OUTPUT_PATH)
-
+    }, indent= 4)
+    # Tira o "\n}" final para continuar o mesmo objeto
+    f.write(cabecalho[:-2] + ',\n    "courses": [')
 
 if __name__ == "__main__":
     run_transformation()
\ No newline at end of file